@@ -1,50 +1,78 @@
+import os
 import streamlit as st
 from pathlib import Path
-from codiculum.doxygen_parser import parse_doxygen_xml_file
+from codiculum.doxygen_parser import PARSED_KINDS, RefidOffsetIndex, parse_doxygen_xml_file
 from codiculum.chunker import CodeChunker
-
-# Define the directory containing Doxygen XML files
-SOURCE_BASE_DIR = Path("data/llvm-project")
-DOXYGEN_XML_DIR = SOURCE_BASE_DIR / "output/xml"
+from codiculum.explorer import SymbolIndex, get_source_window
+from codiculum.indexing import CorpusVersion, load_corpora
+from codiculum.service import stream_query
+
+# Served corpus versions: a JSON list (see codiculum.indexing.load_corpora) named by
+# CODICULUM_CORPORA, or the single local LLVM checkout.
+CORPORA_CONFIG = os.environ.get("CODICULUM_CORPORA")
+DEFAULT_CORPUS = CorpusVersion(
+    corpus="llvm-project",
+    version="default",
+    src_base=Path("data/llvm-project"),
+    xml_dir=Path("data/llvm-project/output/xml"),
+)
+# Query service started with `python -m codiculum serve <chunks file>`
+QUERY_SERVICE_URL = os.environ.get("CODICULUM_SERVICE_URL", "http://127.0.0.1:8080")
 
 st.set_page_config(layout="wide")
 st.title("Codiculum: Doxygen Parser & Chunker Test UI")
 
 
+# Per-corpus refid -> byte offset indexes for loading single elements.
+OFFSET_INDEX_DIR = Path(".codiculum")
+SEARCH_RESULT_LIMIT = 25
+SOURCE_PAGE_SIZE = 200
+
+
+@st.cache_resource
+def get_symbol_index(directory: Path) -> SymbolIndex | None:
+    """
+    Builds the corpus-wide symbol index from Doxygen's index.xml (once per process).
+
+    Only the compound kinds the parser extracts are offered: files,
+    namespaces and members would open an empty (or their enclosing) compound.
+    """
+    index_xml = directory / "index.xml"
+    if not index_xml.is_file():
+        return None
+    return SymbolIndex.from_doxygen_index(index_xml, kinds=set(PARSED_KINDS))
+
+
+@st.cache_resource
+def get_offset_index(directory: Path, corpus_key: str) -> RefidOffsetIndex:
+    """Opens the refid offset index of a corpus version, scanning new or changed XML files (once per process)."""
+    index = RefidOffsetIndex(OFFSET_INDEX_DIR / f"offsets-{corpus_key.replace('/', '_')}.db")
+    index.build(sorted(directory.glob("*.xml")))
+    return index
+
+
 @st.cache_data
-def get_xml_files(directory: Path) -> list[str]:
-    """Finds all XML files in the specified directory."""
-    if not directory.is_dir():
-        return []
-
-    return sorted(
-        [
-            f.name
-            for f in directory.glob("*.xml")
-            if f.is_file()
-            and not f.name.endswith("_8cpp.xml")
-            and not f.name.endswith("_8h.xml")
-            and not f.name.endswith("_8td.xml")
-            and not f.name.endswith("_8py.xml")
-            and not f.name.endswith("_8inc.xml")
-            and not f.name == "Doxyfile.xml"
-        ]
-    )
+def load_and_chunk_element(refid: str, source_base_dir: Path, corpus: str, version: str, corpus_key: str):
+    """Parses and chunks only the XML fragment of one element; (None, None, None) if it is not indexed."""
+    element = get_offset_index(DOXYGEN_XML_DIR, corpus_key).load_element(refid, corpus=corpus, version=version)
+    if element is None:
+        return None, None, None
+    chunks = CodeChunker(source_base_dir, corpus=corpus, version=version).chunk([element])
+    return [element], chunks, None
 
 
 @st.cache_data
-def load_and_chunk(xml_file_path: Path):
-    """Loads Doxygen XML, parses it, and generates chunks."""
+def load_and_chunk(xml_file_path: Path, source_base_dir: Path, corpus: str, version: str):
+    """Loads Doxygen XML, parses it, and generates chunks tagged with their corpus version."""
     if not xml_file_path.is_file():
         return None, None, f"Error: File not found - {xml_file_path}"
 
     try:
-        parsed_data = parse_doxygen_xml_file(xml_file_path)
+        parsed_data = parse_doxygen_xml_file(xml_file_path, corpus=corpus, version=version)
         if parsed_data is None:
             return None, None, f"Error parsing file {xml_file_path.name}"
 
-        # Instantiate CodeChunker with the repo_dir from config
-        chunker = CodeChunker(SOURCE_BASE_DIR)
+        chunker = CodeChunker(source_base_dir, corpus=corpus, version=version)
         chunks = chunker.chunk(parsed_data)
         return parsed_data, chunks, None
     except Exception as e:
@@ -53,25 +81,71 @@ def load_and_chunk(xml_file_path: Path):
 
 # --- UI ---
 
-xml_files = get_xml_files(DOXYGEN_XML_DIR)
-
-if not xml_files:
-    st.error(f"No XML files found in the specified directory: {DOXYGEN_XML_DIR}")
+corpora = load_corpora(CORPORA_CONFIG) if CORPORA_CONFIG else [DEFAULT_CORPUS]
+selected_corpus = st.sidebar.selectbox("Corpus version:", options=corpora, format_func=lambda c: c.key)
+SOURCE_BASE_DIR = selected_corpus.src_base
+DOXYGEN_XML_DIR = selected_corpus.xml_dir
+
+with st.expander("Ask the codebase"):
+    question = st.text_input("Question:", key="rag_question")
+    if st.button("Ask", disabled=not question):
+        sources = []
+
+        def answer_tokens():
+            # Render tokens as the service streams them instead of waiting for the full answer.
+            # With a corpora config the service holds several corpus versions; ask the selected one.
+            scope = {"corpus": selected_corpus.corpus, "version": selected_corpus.version} if CORPORA_CONFIG else {}
+            for event in stream_query(QUERY_SERVICE_URL, question, **scope):
+                if "sources" in event:
+                    sources.extend(event["sources"])
+                elif "token" in event:
+                    yield event["token"]
+                elif "error" in event:
+                    st.error(event["error"])
+
+        try:
+            st.write_stream(answer_tokens())
+            st.markdown("##### Sources")
+            for source in sources:
+                st.markdown(f"- `{source['file_path']}:{source['start_line']}-{source['end_line']}` ({', '.join(source['ids'])})")
+        except (OSError, RuntimeError) as e:
+            st.error(f"Query service unavailable at {QUERY_SERVICE_URL}: {e}")
+
+symbol_index = get_symbol_index(DOXYGEN_XML_DIR)
+
+if symbol_index is None:
+    st.error(f"No Doxygen index.xml found in the specified directory: {DOXYGEN_XML_DIR}")
     st.stop()
 
-selected_xml_file_name = st.sidebar.selectbox(
-    "Select Doxygen XML File:",
-    options=xml_files,
-    index=0,  # Default to the first file in the list
-    key="xml_selector",
+# Only the top matches are sent to the browser; the full symbol list stays server-side.
+query = st.sidebar.text_input("Search symbol:", key="symbol_query", placeholder="e.g. llvm::Function")
+matches = symbol_index.search(query, limit=SEARCH_RESULT_LIMIT) if query else []
+st.sidebar.caption(f"{len(symbol_index)} symbols indexed ({', '.join(sorted(PARSED_KINDS))} only).")
+
+selected_symbol = st.sidebar.selectbox(
+    "Matching symbols:",
+    options=matches,
+    format_func=lambda symbol: f"{symbol.kind.capitalize()}: {symbol.name}",
+    key="symbol_selector",
 )
+selected_xml_file_name = selected_symbol.xml_file_name if selected_symbol else None
 
 if selected_xml_file_name:
     selected_xml_path = DOXYGEN_XML_DIR / selected_xml_file_name
     st.sidebar.info(f"Selected: `{selected_xml_path}`")
 
-    # Load, parse, and chunk the data
-    parsed_elements, chunks, error_message = load_and_chunk(selected_xml_path)
+    # Seek to the selected compound's fragment; fall back to parsing the whole file.
+    parsed_elements, chunks, error_message = load_and_chunk_element(
+        selected_symbol.compound_refid,
+        SOURCE_BASE_DIR,
+        selected_corpus.corpus,
+        selected_corpus.version,
+        selected_corpus.key,
+    )
+    if parsed_elements is None:
+        parsed_elements, chunks, error_message = load_and_chunk(
+            selected_xml_path, SOURCE_BASE_DIR, selected_corpus.corpus, selected_corpus.version
+        )
 
     if error_message:
         st.error(error_message)
@@ -93,8 +167,15 @@ if selected_xml_file_name:
         f"{elem.kind.capitalize()}: {elem.name} ({elem.id})": elem.id
         for elem in parsed_elements
     }
+    element_ids = list(element_options.values())
+    # Preselect the searched symbol, or the compound that contains it.
+    default_index = 0
+    for candidate_id in (selected_symbol.refid, selected_symbol.compound_refid):
+        if candidate_id in element_ids:
+            default_index = element_ids.index(candidate_id)
+            break
     selected_element_display_name = st.selectbox(
-        "Select Code Element to View Chunk:", options=list(element_options.keys())
+        "Select Code Element to View Chunk:", options=list(element_options.keys()), index=default_index
     )
 
     # --- Display Chunk ---
@@ -121,19 +202,37 @@ if selected_xml_file_name:
 
                 if file_path_str:
                     source_file_path = Path(SOURCE_BASE_DIR) / file_path_str
-                    st.caption(f"File: `{source_file_path}` (Chunk starts ~line {start_line})")
+                    end_line = selected_chunk.metadata.get("end_line") or start_line
+                    # Page offset relative to the window centered on the chunk, per element.
+                    page_key = f"source_page_{selected_corpus.key}_{selected_element_id}"
+                    page_offset = st.session_state.get(page_key, 0)
                     try:
-                        # Read the source file content
-                        source_content = source_file_path.read_text(encoding="utf-8", errors="ignore")
-
-                        # Display the source code using st.code with line numbers
+                        # Only the visible window is read, via a cached line-offset index.
+                        window = get_source_window(
+                            source_file_path,
+                            start_line,
+                            end_line,
+                            page_offset=page_offset,
+                            page_size=SOURCE_PAGE_SIZE,
+                        )
+                        st.caption(
+                            f"File: `{source_file_path}` (chunk lines {start_line}-{end_line}, "
+                            f"showing {window.start_line}-{window.end_line} of {window.total_lines})"
+                        )
+                        prev_col, next_col = st.columns(2)
+                        if prev_col.button("Previous lines", disabled=not window.has_previous):
+                            st.session_state[page_key] = page_offset - 1
+                            st.rerun()
+                        if next_col.button("Next lines", disabled=not window.has_next):
+                            st.session_state[page_key] = page_offset + 1
+                            st.rerun()
+
+                        # Line numbers are rendered into the text since st.code always counts from 1.
                         st.code(
-                            source_content,
+                            window.numbered_text(),
                             language="cpp",  # Adjust based on file type if possible/needed
-                            line_numbers=True,
+                            line_numbers=False,
                         )
-                        # Note: Directly jumping to start_line in st.code isn't natively supported.
-                        # Users will need to scroll manually. Advanced components might offer this.
 
                     except FileNotFoundError:
                         st.error(f"Source file not found: {source_file_path}")
@@ -148,7 +247,7 @@ if selected_xml_file_name:
             )
 
 else:
-    st.info("Please select an XML file from the sidebar.")
+    st.info("Search for a symbol in the sidebar.")
 
 # Add a way to clear the cache for debugging/development
 if st.sidebar.button("Clear Cache"):
@@ -0,0 +1,35 @@
+# src/codiculum/_lazy.py
+"""Helpers for importing heavy or optional backends on first use.
+
+Modules that wrap llama_index, chromadb, openai, pyarrow, etc. must not import
+them at module level: `import codiculum.<anything>` has to stay cheap because
+codiculum runs as many short-lived worker processes. Import them inside the
+function or method that needs them, through `import_backend`.
+"""
+
+import importlib
+from types import ModuleType
+
+
+def import_backend(module_name: str, feature: str, package: str | None = None) -> ModuleType:
+    """
+    Imports a heavy/optional backend module, with an actionable error if it is missing.
+
+    Args:
+        module_name: The module to import, e.g. 'pyarrow.parquet'.
+        feature: Human-readable name of the feature needing it, used in the error.
+        package: The distribution to install, if it differs from the top-level module name.
+
+    Returns:
+        The imported module (cached by Python after the first call).
+
+    Raises:
+        ImportError: If the module is not installed.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        package = package or module_name.split(".", 1)[0]
+        raise ImportError(
+            f"{feature} requires the '{package}' package. Install it with `uv add {package}`."
+        ) from e
@@ -1,5 +1,19 @@
 # Initialize chunker module
 from .code_chunker import CodeChunker
+from .doc_store import CompressedChunkStore
+from .export import ChunkWriter, open_chunk_table, read_chunk_batches
 from .models import Chunk
+from .summary import SUMMARY_KINDS, SummaryBuilder, build_summary_chunks, expand_summary_hits
 
-__all__ = ["CodeChunker", "Chunk"] 
\ No newline at end of file
+__all__ = [
+    "CodeChunker",
+    "Chunk",
+    "ChunkWriter",
+    "CompressedChunkStore",
+    "SUMMARY_KINDS",
+    "SummaryBuilder",
+    "build_summary_chunks",
+    "expand_summary_hits",
+    "open_chunk_table",
+    "read_chunk_batches",
+]
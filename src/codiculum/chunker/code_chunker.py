@@ -3,17 +3,21 @@
 import logging
 from pathlib import Path
 # Use List directly if Python >= 3.9
-from typing import List # , Dict, Any Removed unused imports
+from typing import TYPE_CHECKING, List, Optional, Sequence # , Dict, Any Removed unused imports
 from .models import Chunk
 from .source_retriever import retrieve_source_snippet
+from .summary import SummaryBuilder, build_summary_chunks
 from ..doxygen_parser.models import CodeElement # , CodeLocation Removed unused import
 
-# Configure basic logging - Reset to INFO
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+if TYPE_CHECKING:
+    from ..indexing.includes import IncludeGraph
+
+# Logging is configured by applications (see codiculum.cli), never at import time.
 logger = logging.getLogger(__name__)
-# logger.setLevel(logging.DEBUG) # Remove forced level
 
-def format_element_to_chunk(element: CodeElement, source_snippet: str) -> Chunk:
+def format_element_to_chunk(
+    element: CodeElement, source_snippet: str, includes: Optional[Sequence[str]] = None
+) -> Chunk:
     """
     Formats a parsed code element and its source snippet into a Chunk object
     suitable for LlamaIndex Nodes (text + metadata).
@@ -21,6 +25,7 @@ def format_element_to_chunk(element: CodeElement, source_snippet: str) -> Chunk:
     Args:
         element: The parsed CodeElement from Doxygen data.
         source_snippet: The corresponding source code snippet.
+        includes: Optional headers needed to use the snippet (see IncludeGraph.minimal_includes).
 
     Returns:
         A Chunk object populated with data from the element and snippet.
@@ -36,6 +41,8 @@ def format_element_to_chunk(element: CodeElement, source_snippet: str) -> Chunk:
     # A more robust solution might inspect the file extension.
     text_parts = []
     text_parts.append(f"File: {element.location.file}")
+    if includes:
+        text_parts.append(f"Includes: {', '.join(includes)}")
 
     # Use Kind/Name or Brief/Detailed depending on preference or available info
     # Let's prioritize Brief/Detailed for now as per previous test structure
@@ -71,6 +78,15 @@ def format_element_to_chunk(element: CodeElement, source_snippet: str) -> Chunk:
         "template_params": element.template_params or "",
         # Note: source_snippet is now part of the main 'text' field
     }
+    if includes is not None:
+        metadata["includes"] = list(includes)
+
+    # Namespace keys are metadata only: the text stays identical across versions,
+    # so unchanged elements share a content hash (see vector_store.namespaces).
+    if element.corpus:
+        metadata["corpus"] = element.corpus
+    if element.version:
+        metadata["version"] = element.version
 
     return Chunk(
         text=chunk_text,
@@ -83,26 +99,42 @@ class CodeChunker:
     Responsible for chunking code elements based on parsed Doxygen data
     and retrieving corresponding source code snippets.
     """
-    def __init__(self, src_base_path: str | Path):
+    def __init__(
+        self,
+        src_base_path: str | Path,
+        corpus: Optional[str] = None,
+        version: Optional[str] = None,
+        include_graph: Optional["IncludeGraph"] = None,
+    ):
         """
         Initializes the CodeChunker.
 
         Args:
-            src_base_path: The root path of the source code directory.
+            src_base_path: The root path of the source code directory (of this corpus version).
+            corpus: Default corpus name for chunks whose element does not carry one.
+            version: Default corpus version for chunks whose element does not carry one.
+            include_graph: If given, each chunk lists the minimal includes of its file
+                           (cached per file by the graph).
         """
         self.src_base_path = Path(src_base_path)
+        self.include_graph = include_graph
+        self.corpus = corpus
+        self.version = version
         if not self.src_base_path.is_dir():
             logger.warning(f"Source base path not found or not a directory: {self.src_base_path}")
             # Or raise an error depending on desired strictness
             # raise ValueError(f"Source base path not found or not a directory: {self.src_base_path}")
 
-    def chunk(self, parsed_data: List[CodeElement]) -> List[Chunk]:
+    def chunk(self, parsed_data: List[CodeElement], include_summaries: bool = False) -> List[Chunk]:
         """
         Orchestrates the creation of code chunks from parsed Doxygen data.
 
         Args:
             parsed_data: A list of CodeElement objects representing parsed code elements
                          (functions, classes, etc.) from Doxygen XML.
+            include_summaries: If True, file-level and namespace-level summary chunks
+                               (see `summary.build_summary_chunks`) are appended after
+                               the element chunks.
 
         Returns:
             A list of Chunk objects ready for embedding.
@@ -140,7 +172,10 @@ class CodeChunker:
                 )
 
                 # Call the standalone formatting function
-                chunk = format_element_to_chunk(element, snippet)
+                includes = None
+                if self.include_graph is not None:
+                    includes = self.include_graph.minimal_includes(element.location.file)
+                chunk = format_element_to_chunk(element, snippet, includes=includes)
                 chunks.append(chunk)
                 processed_count += 1
 
@@ -154,9 +189,27 @@ class CodeChunker:
                 logger.error(f"Failed to create chunk for element '{element.name}': {e}", exc_info=True)
                 error_count += 1
 
+        if include_summaries:
+            chunked_ids = {chunk.metadata["id"] for chunk in chunks}
+            chunks.extend(build_summary_chunks(parsed_data, chunked_ids=chunked_ids))
+
+        self._tag_corpus(chunks)
+
         logger.info(f"Chunk creation finished. Processed: {processed_count}, Errors/Skipped: {error_count}, Total Chunks: {len(chunks)}")
         return chunks
 
+    def summary_chunks(self, summaries: SummaryBuilder) -> List[Chunk]:
+        """The summary chunks of a whole parse (see `SummaryBuilder`), tagged with this chunker's corpus version."""
+        chunks = summaries.chunks()
+        self._tag_corpus(chunks)
+        return chunks
+
+    def _tag_corpus(self, chunks: List[Chunk]) -> None:
+        for key, default in (("corpus", self.corpus), ("version", self.version)):
+            if default:
+                for chunk in chunks:
+                    chunk.metadata.setdefault(key, default)
+
 
 # # Original function moved into the class method above
 # def create_chunks_from_doxygen(
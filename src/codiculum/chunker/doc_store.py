@@ -0,0 +1,316 @@
+# src/codiculum/chunker/doc_store.py
+"""Dictionary-compressed, randomly readable chunk store.
+
+Chunk texts repeat a lot across a corpus (`File: ` headers, license banners,
+`template <typename ...>` lines, metadata keys), but each one is too small
+to compress well on its own. A shared dictionary trained on a sample of the
+corpus gives per-chunk compression most of the ratio of whole-file
+compression while every chunk stays independently readable.
+
+Codecs:
+- "zlib" (default, stdlib): raw deflate with a preset dictionary of up to
+  32 KiB built from the most frequent lines/fragments of the sample.
+- "zstd": Zstandard with a trained dictionary; needs the optional
+  `zstandard` package, imported on first use.
+"""
+
+import json
+import logging
+import sqlite3
+import struct
+import zlib
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .._lazy import import_backend
+from .models import Chunk
+
+logger = logging.getLogger(__name__)
+
+CODECS = ("zlib", "zstd")
+ZLIB_MAX_DICT_SIZE = 32 * 1024  # Deflate window size; longer dictionaries are truncated.
+DEFAULT_ZSTD_DICT_SIZE = 112 * 1024
+_TEXT_LENGTH = struct.Struct("<I")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key         TEXT PRIMARY KEY NOT NULL,
+    value       BLOB
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id          TEXT PRIMARY KEY NOT NULL,
+    raw_size    INTEGER NOT NULL,
+    data        BLOB NOT NULL
+);
+"""
+
+
+def _encode_record(chunk: Chunk) -> bytes:
+    # Length-prefixed text (it may contain any byte), then the JSON metadata.
+    # Text first: it dominates the size and starts with the most repetitive parts.
+    text = chunk.text.encode("utf-8")
+    metadata = json.dumps(chunk.metadata, separators=(", ", ": "))
+    return _TEXT_LENGTH.pack(len(text)) + text + metadata.encode("utf-8")
+
+
+def _decode_record(data: bytes) -> Chunk:
+    (text_size,) = _TEXT_LENGTH.unpack_from(data)
+    text_end = _TEXT_LENGTH.size + text_size
+    return Chunk(text=data[_TEXT_LENGTH.size:text_end].decode("utf-8"), metadata=json.loads(data[text_end:]))
+
+
+def build_zlib_dictionary(samples: Iterable[bytes], dict_size: int = ZLIB_MAX_DICT_SIZE) -> bytes:
+    """
+    Builds a deflate preset dictionary from sample records.
+
+    Lines and ", "-separated fragments (metadata key/value pairs) that occur
+    in several samples are scored by how many bytes they would save and
+    packed up to `dict_size`; the most valuable ones go last, where deflate
+    reaches them with the shortest distances.
+    """
+    dict_size = min(dict_size, ZLIB_MAX_DICT_SIZE)
+    counts: Counter = Counter()
+    for sample in samples:
+        fragments = set()
+        for line in sample.split(b"\n"):
+            fragments.add(line + b"\n")
+            if b", " in line:
+                fragments.update(part + b", " for part in line.split(b", "))
+        counts.update(fragment for fragment in fragments if len(fragment) > 3)
+
+    scored = sorted(((count - 1) * len(fragment), fragment) for fragment, count in counts.items() if count > 1)
+    chosen: List[bytes] = []
+    size = 0
+    for _, fragment in reversed(scored):
+        if size + len(fragment) > dict_size:
+            continue
+        chosen.append(fragment)
+        size += len(fragment)
+    return b"".join(reversed(chosen))
+
+
+class _ZlibCodec:
+    def __init__(self, dictionary: bytes, level: int):
+        self.dictionary = dictionary
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.dictionary:
+            decompressor = zlib.decompressobj(-15, zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class _ZstdCodec:
+    def __init__(self, dictionary: bytes, level: int):
+        zstd = import_backend("zstandard", "zstd chunk compression")
+        self.dictionary = dictionary
+        dict_data = zstd.ZstdCompressionDict(dictionary) if dictionary else None
+        self._compressor = zstd.ZstdCompressor(level=level, dict_data=dict_data)
+        self._decompressor = zstd.ZstdDecompressor(dict_data=dict_data)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class CompressedChunkStore:
+    """
+    Persistent chunk store (SQLite) compressing each chunk individually with a shared dictionary.
+
+    Records are keyed by `chunk.metadata["id"]`; `get` decompresses one
+    record, and an LRU keeps the `cache_size` most recently read chunks
+    decompressed. Cached chunks are shared objects: treat them as read-only.
+
+    Usage:
+        with CompressedChunkStore("chunks.db") as store:
+            store.train(chunks[:2000])  # once, before the first put
+            store.put_many(chunks)
+            chunk = store.get("classllvm_1_1Function")
+    """
+
+    def __init__(
+        self, path: str | Path, codec: str = "zlib", level: Optional[int] = None, cache_size: int = 4096
+    ):
+        """
+        Args:
+            path: SQLite file of the store (created if missing).
+            codec: "zlib" or "zstd" for a new store; an existing store keeps its codec.
+            level: Compression level (default: 9 for zlib, 19 for zstd).
+            cache_size: Number of decompressed chunks kept in the LRU.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        stored_codec = meta.get("codec")
+        self.codec = stored_codec.decode() if stored_codec else codec
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown codec '{self.codec}', expected one of {CODECS}")
+        if stored_codec is None:
+            self._set_meta("codec", self.codec.encode())
+        self.level = level if level is not None else (9 if self.codec == "zlib" else 19)
+        self._codec = self._make_codec(meta.get("dictionary") or b"")
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Chunk]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _make_codec(self, dictionary: bytes):
+        if self.codec == "zstd":
+            return _ZstdCodec(dictionary, self.level)
+        return _ZlibCodec(dictionary, self.level)
+
+    def _set_meta(self, key: str, value: bytes) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def dictionary(self) -> bytes:
+        return self._codec.dictionary
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def __contains__(self, chunk_id: str) -> bool:
+        if chunk_id in self._cache:
+            return True
+        return self._conn.execute("SELECT 1 FROM chunks WHERE id = ?", (chunk_id,)).fetchone() is not None
+
+    def train(self, samples: Iterable[Chunk], dict_size: Optional[int] = None) -> int:
+        """
+        Trains the compression dictionary on sample chunks (a few thousand is plenty).
+
+        Must run before the first chunk is stored: existing records can only
+        be read with the dictionary they were written with.
+
+        Returns:
+            The dictionary size in bytes.
+
+        Raises:
+            ValueError: If the store already holds chunks.
+        """
+        if len(self):
+            raise ValueError("Cannot retrain the dictionary of a non-empty chunk store.")
+        records = [_encode_record(chunk) for chunk in samples]
+        if self.codec == "zstd":
+            zstd = import_backend("zstandard", "zstd chunk compression")
+            dictionary = zstd.train_dictionary(dict_size or DEFAULT_ZSTD_DICT_SIZE, records).as_bytes()
+        else:
+            dictionary = build_zlib_dictionary(records, dict_size or ZLIB_MAX_DICT_SIZE)
+        self._set_meta("dictionary", dictionary)
+        self._codec = self._make_codec(dictionary)
+        logger.info(f"Trained a {len(dictionary)}-byte {self.codec} dictionary on {len(records)} chunks.")
+        return len(dictionary)
+
+    def put_many(self, chunks: Sequence[Chunk]) -> None:
+        """Inserts or replaces chunks (one transaction)."""
+        rows = []
+        for chunk in chunks:
+            record = _encode_record(chunk)
+            rows.append((chunk.metadata["id"], len(record), self._codec.compress(record)))
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("INSERT OR REPLACE INTO chunks (id, raw_size, data) VALUES (?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        for chunk_id, _, _ in rows:
+            self._cache.pop(chunk_id, None)
+
+    def get(self, chunk_id: str) -> Optional[Chunk]:
+        """Returns one chunk, or None if it is not stored."""
+        chunk = self._cache.get(chunk_id)
+        if chunk is not None:
+            self._cache.move_to_end(chunk_id)
+            self.cache_hits += 1
+            return chunk
+        self.cache_misses += 1
+        row = self._conn.execute("SELECT data FROM chunks WHERE id = ?", (chunk_id,)).fetchone()
+        if row is None:
+            return None
+        chunk = _decode_record(self._codec.decompress(row[0]))
+        if self.cache_size > 0:
+            self._cache[chunk_id] = chunk
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return chunk
+
+    def __getitem__(self, chunk_id: str) -> Chunk:
+        chunk = self.get(chunk_id)
+        if chunk is None:
+            raise KeyError(chunk_id)
+        return chunk
+
+    def get_many(self, chunk_ids: Iterable[str]) -> Dict[str, Chunk]:
+        """Returns the stored chunks among `chunk_ids`, keyed by id."""
+        found = {}
+        for chunk_id in chunk_ids:
+            chunk = self.get(chunk_id)
+            if chunk is not None:
+                found[chunk_id] = chunk
+        return found
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        """Removes chunks by id. Returns the number removed."""
+        ids = [(chunk_id,) for chunk_id in chunk_ids]
+        before = self._conn.total_changes
+        self._conn.executemany("DELETE FROM chunks WHERE id = ?", ids)
+        for (chunk_id,) in ids:
+            self._cache.pop(chunk_id, None)
+        return self._conn.total_changes - before
+
+    def ids(self) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT id FROM chunks")]
+
+    def compact(self) -> int:
+        """Returns the file space of deleted records to the filesystem (VACUUM). Returns the bytes reclaimed."""
+        before = self._file_bytes()
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._conn.execute("VACUUM")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return before - self._file_bytes()
+
+    def _file_bytes(self) -> int:
+        paths = [self.path, self.path.with_name(self.path.name + "-wal")]
+        return sum(path.stat().st_size for path in paths if path.exists())
+
+    def stats(self) -> Dict[str, float]:
+        """Raw vs. stored bytes of all records, and LRU hit counts."""
+        raw, stored = self._conn.execute(
+            "SELECT COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM chunks"
+        ).fetchone()
+        return {
+            "chunks": len(self),
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "dictionary_bytes": len(self.dictionary),
+            "compression_ratio": raw / stored if stored else 0.0,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "CompressedChunkStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
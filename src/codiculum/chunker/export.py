@@ -0,0 +1,251 @@
+# src/codiculum/chunker/export.py
+"""Streaming columnar export/import of chunk batches.
+
+Formats are picked from the file suffix:
+- `.arrow` / `.feather` / `.ipc`: Apache Arrow IPC file (memory-mappable, zero-copy reads)
+- `.parquet`: Parquet
+- `.jsonl`: JSON Lines fallback that needs no extra dependency
+
+Arrow and Parquet need the optional `pyarrow` package, which is imported on first use.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .._lazy import import_backend
+from .models import Chunk
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys written by format_element_to_chunk get their own columns;
+# anything else (e.g. summary 'children') goes to the JSON 'extra_metadata' column.
+STRING_COLUMNS = [
+    "id",
+    "name",
+    "kind",
+    "file_path",
+    "brief_description",
+    "detailed_description",
+    "template_params",
+    "corpus",
+    "version",
+]
+INT_COLUMNS = ["start_line", "end_line"]
+_METADATA_COLUMNS = STRING_COLUMNS + INT_COLUMNS
+
+_FORMATS = {
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".parquet": "parquet",
+    ".jsonl": "jsonl",
+}
+
+# (chunks, embeddings); embeddings is None when the batch has none.
+ChunkBatch = Tuple[List[Chunk], Optional[List[Optional[List[float]]]]]
+
+
+def _detect_format(path: Path, format: Optional[str]) -> str:
+    if format:
+        if format not in set(_FORMATS.values()):
+            raise ValueError(f"Unsupported chunk export format: {format}")
+        return format
+    try:
+        return _FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Cannot infer chunk export format from file name: {path}") from None
+
+
+def _pyarrow():
+    return import_backend("pyarrow", "Arrow/Parquet chunk export")
+
+
+def _arrow_schema(pa, embedding_dim: Optional[int]):
+    fields = [pa.field(name, pa.string()) for name in STRING_COLUMNS]
+    fields += [pa.field(name, pa.int64()) for name in INT_COLUMNS]
+    fields += [pa.field("extra_metadata", pa.string()), pa.field("text", pa.string())]
+    if embedding_dim:
+        fields.append(pa.field("embedding", pa.list_(pa.float32(), embedding_dim)))
+    return pa.schema(fields)
+
+
+def _extra_metadata(metadata: Dict[str, Any]) -> Optional[str]:
+    extra = {k: v for k, v in metadata.items() if k not in _METADATA_COLUMNS}
+    return json.dumps(extra) if extra else None
+
+
+def _chunk_from_row(row: Dict[str, Any]) -> Chunk:
+    metadata = {name: row[name] for name in _METADATA_COLUMNS if row.get(name) is not None}
+    if row.get("extra_metadata"):
+        metadata.update(json.loads(row["extra_metadata"]))
+    return Chunk(text=row["text"], metadata=metadata)
+
+
+class ChunkWriter:
+    """
+    Streams batches of chunks (and optionally their embeddings) to a file.
+
+    Embeddings are stored as a fixed-size float32 list column; the dimension
+    is taken from `embedding_dim` or inferred from the first batch.
+
+    Usage:
+        with ChunkWriter("chunks.arrow") as writer:
+            writer.write_batch(chunks, embeddings)
+    """
+
+    def __init__(self, path: str | Path, format: Optional[str] = None, embedding_dim: Optional[int] = None):
+        self.path = Path(path)
+        self.format = _detect_format(self.path, format)
+        self.embedding_dim = embedding_dim
+        self.rows_written = 0
+        self._writer = None
+        self._sink = None
+        self._schema = None
+        if self.format == "jsonl":
+            self._sink = open(self.path, "w", encoding="utf-8")
+        else:
+            _pyarrow()  # Fail fast if pyarrow is missing.
+
+    def _open_arrow(self) -> None:
+        pa = _pyarrow()
+        self._schema = _arrow_schema(pa, self.embedding_dim)
+        if self.format == "arrow":
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+        else:
+            pq = import_backend("pyarrow.parquet", "Parquet chunk export", package="pyarrow")
+            self._writer = pq.ParquetWriter(str(self.path), self._schema)
+
+    def write_batch(self, chunks: Sequence[Chunk], embeddings: Optional[Sequence[Optional[Sequence[float]]]] = None) -> None:
+        """
+        Appends a batch of chunks.
+
+        Args:
+            chunks: The chunks to write.
+            embeddings: Optional embeddings, aligned with `chunks`.
+
+        Raises:
+            ValueError: If embeddings are misaligned or do not match the embedding dimension.
+        """
+        if embeddings is not None and len(embeddings) != len(chunks):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(chunks)} chunks.")
+        if embeddings is not None and self.embedding_dim is None and self._writer is None:
+            self.embedding_dim = next((len(e) for e in embeddings if e is not None), None)
+        if embeddings is not None and self.embedding_dim:
+            for embedding in embeddings:
+                if embedding is not None and len(embedding) != self.embedding_dim:
+                    raise ValueError(f"Expected embeddings of size {self.embedding_dim}, got {len(embedding)}.")
+
+        if self.format == "jsonl":
+            for i, chunk in enumerate(chunks):
+                record = {"text": chunk.text, "metadata": chunk.metadata}
+                if embeddings is not None and embeddings[i] is not None:
+                    record["embedding"] = list(embeddings[i])
+                self._sink.write(json.dumps(record) + "\n")
+            self.rows_written += len(chunks)
+            return
+
+        if self._writer is None:
+            self._open_arrow()
+        pa = _pyarrow()
+        columns: Dict[str, Any] = {}
+        for name in _METADATA_COLUMNS:
+            columns[name] = [chunk.metadata.get(name) for chunk in chunks]
+        columns["extra_metadata"] = [_extra_metadata(chunk.metadata) for chunk in chunks]
+        columns["text"] = [chunk.text for chunk in chunks]
+        if self.embedding_dim:
+            columns["embedding"] = list(embeddings) if embeddings is not None else [None] * len(chunks)
+        elif embeddings is not None and any(e is not None for e in embeddings):
+            raise ValueError("This file was opened without an embedding column.")
+        batch = pa.RecordBatch.from_pydict(columns, schema=self._schema)
+        self._writer.write_batch(batch)
+        self.rows_written += len(chunks)
+
+    def close(self) -> None:
+        if self.format != "jsonl" and self._writer is None:
+            # Still write a valid (empty) file.
+            self._open_arrow()
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        logger.info(f"Wrote {self.rows_written} chunks to {self.path}")
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_chunk_table(path: str | Path):
+    """
+    Opens an Arrow IPC or Parquet chunk file as a `pyarrow.Table`.
+
+    Arrow IPC files are memory-mapped, so the returned table references the
+    file pages directly (zero-copy); columns are only paged in when touched.
+
+    Args:
+        path: Path to a `.arrow`/`.feather`/`.ipc` or `.parquet` file.
+
+    Returns:
+        A pyarrow.Table with the chunk columns.
+    """
+    path = Path(path)
+    format = _detect_format(path, None)
+    pa = _pyarrow()
+    if format == "arrow":
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if format == "parquet":
+        pq = import_backend("pyarrow.parquet", "Parquet chunk export", package="pyarrow")
+        return pq.read_table(str(path), memory_map=True)
+    raise ValueError(f"open_chunk_table does not support {format} files; use read_chunk_batches.")
+
+
+def read_chunk_batches(path: str | Path, batch_size: int = 1024, format: Optional[str] = None) -> Iterator[ChunkBatch]:
+    """
+    Streams chunks (and embeddings, if stored) back from an exported file.
+
+    Args:
+        path: Path to the exported file.
+        batch_size: Maximum number of chunks per yielded batch.
+        format: Overrides the format inferred from the file suffix.
+
+    Yields:
+        (chunks, embeddings) tuples; embeddings is None if the file has none.
+    """
+    path = Path(path)
+    format = _detect_format(path, format)
+
+    if format == "jsonl":
+        chunks: List[Chunk] = []
+        embeddings: List[Optional[List[float]]] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                chunks.append(Chunk(text=record["text"], metadata=record.get("metadata", {})))
+                embeddings.append(record.get("embedding"))
+                if len(chunks) >= batch_size:
+                    yield chunks, (embeddings if any(e is not None for e in embeddings) else None)
+                    chunks, embeddings = [], []
+        if chunks:
+            yield chunks, (embeddings if any(e is not None for e in embeddings) else None)
+        return
+
+    if format == "arrow":
+        batches = open_chunk_table(path).to_batches(max_chunksize=batch_size)
+    else:
+        pq = import_backend("pyarrow.parquet", "Parquet chunk export", package="pyarrow")
+        batches = pq.ParquetFile(str(path), memory_map=True).iter_batches(batch_size=batch_size)
+
+    for batch in batches:
+        rows = batch.to_pylist()
+        has_embeddings = "embedding" in batch.schema.names
+        yield (
+            [_chunk_from_row(row) for row in rows],
+            [row["embedding"] for row in rows] if has_embeddings else None,
+        )
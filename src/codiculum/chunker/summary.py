@@ -0,0 +1,211 @@
+# Builds coarse summary chunks (file / namespace / class level) on top of element chunks.
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from .models import Chunk
+from ..doxygen_parser.models import CodeElement
+
+logger = logging.getLogger(__name__)
+
+FILE_SUMMARY_KIND = "file_summary"
+NAMESPACE_SUMMARY_KIND = "namespace_summary"
+CLASS_SUMMARY_KIND = "class_summary"
+SUMMARY_KINDS = (FILE_SUMMARY_KIND, NAMESPACE_SUMMARY_KIND, CLASS_SUMMARY_KIND)
+# Compound kinds whose members are summarized as a class rather than a namespace.
+_CLASS_KINDS = ("class", "struct", "union")
+
+# Roughly 6k tokens, which keeps a summary under the embedding model limit
+# described in docs/ChunkingStrategy.md.
+DEFAULT_MAX_SUMMARY_CHARS = 24000
+
+
+def _enclosing_scope(qualified_name: str) -> Optional[str]:
+    """Returns the enclosing scope of a C++ qualified name, e.g. 'llvm::detail' for 'llvm::detail::Foo'."""
+    if "::" not in qualified_name:
+        return None
+    return qualified_name.rsplit("::", 1)[0]
+
+
+def _summary_line(element: CodeElement) -> str:
+    line = f"- {element.kind} {element.name}"
+    if element.brief_description:
+        line += f": {element.brief_description}"
+    return line
+
+
+def _format_summary_chunk(
+    summary_id: str,
+    kind: str,
+    name: str,
+    header: str,
+    children: List[CodeElement],
+    file_path: Optional[str],
+    max_chars: int,
+) -> Chunk:
+    text_parts = [header, f"Contains {len(children)} elements:"]
+    length = sum(len(part) + 1 for part in text_parts)
+    listed = 0
+    for child in children:
+        line = _summary_line(child)
+        if length + len(line) + 1 > max_chars:
+            break
+        text_parts.append(line)
+        length += len(line) + 1
+        listed += 1
+    if listed < len(children):
+        text_parts.append(f"... and {len(children) - listed} more")
+
+    metadata = {
+        "id": summary_id,
+        "name": name,
+        "kind": kind,
+        "file_path": file_path or "",
+        "children": [child.id for child in children],
+    }
+    return Chunk(text="\n".join(text_parts), metadata=metadata)
+
+
+class SummaryBuilder:
+    """
+    Accumulates summary entries over a whole parse and builds the summary chunks once.
+
+    The index pipeline chunks one XML file at a time, but a namespace (or a
+    header) spans many files: feeding every file's elements to one builder
+    and calling `chunks` at the end gives each scope a single summary listing
+    all of its children. Only the fields a summary lists are kept per element.
+
+    Enclosing scopes are labelled by their actual compound kind: a scope that
+    is itself a parsed class/struct/union gets a class summary, any other
+    scope a namespace summary.
+
+    Args:
+        max_chars: Upper bound on each summary's text length.
+        id_suffix: Appended to every summary id, e.g. a shard tag so the
+                   partial summaries of several shards do not collide.
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_SUMMARY_CHARS, id_suffix: str = ""):
+        self.max_chars = max_chars
+        self.id_suffix = id_suffix
+        self._by_file: Dict[str, List[CodeElement]] = defaultdict(list)
+        self._by_scope: Dict[str, List[CodeElement]] = defaultdict(list)
+        self._scope_files: Dict[str, Set[str]] = defaultdict(set)
+        self._compound_kinds: Dict[str, str] = {}
+        self._seen: Set[str] = set()
+
+    def add(self, elements: Iterable[CodeElement], chunked_ids: Optional[Set[str]] = None) -> None:
+        """
+        Records elements (e.g. one XML file's) for the summaries.
+
+        Args:
+            elements: Parsed CodeElement objects.
+            chunked_ids: If given, only elements whose id is in this set are
+                         summarized (e.g. the ids that actually produced a chunk).
+        """
+        for element in elements:
+            self._compound_kinds.setdefault(element.name, element.kind)
+            if (chunked_ids is not None and element.id not in chunked_ids) or element.id in self._seen:
+                continue
+            self._seen.add(element.id)
+            entry = CodeElement(
+                id=element.id, name=element.name, kind=element.kind, language=element.language,
+                brief_description=element.brief_description,
+            )
+            file_path = element.location.file if element.location else None
+            if file_path:
+                self._by_file[file_path].append(entry)
+            scope = _enclosing_scope(element.name)
+            if scope:
+                self._by_scope[scope].append(entry)
+                if file_path:
+                    self._scope_files[scope].add(file_path)
+
+    def chunks(self) -> List[Chunk]:
+        """Returns the summary chunks of everything added so far, file summaries first."""
+        summaries: List[Chunk] = []
+        for file_path in sorted(self._by_file):
+            summaries.append(
+                _format_summary_chunk(
+                    summary_id=f"file:{file_path}{self.id_suffix}",
+                    kind=FILE_SUMMARY_KIND,
+                    name=file_path,
+                    header=f"File: {file_path}",
+                    children=self._by_file[file_path],
+                    file_path=file_path,
+                    max_chars=self.max_chars,
+                )
+            )
+        scopes = {"namespace": 0, "class": 0}
+        for scope in sorted(self._by_scope):
+            compound_kind = self._compound_kinds.get(scope, "namespace")
+            is_class = compound_kind in _CLASS_KINDS
+            scopes["class" if is_class else "namespace"] += 1
+            files = self._scope_files.get(scope, set())
+            summaries.append(
+                _format_summary_chunk(
+                    summary_id=f"{'class' if is_class else 'namespace'}:{scope}{self.id_suffix}",
+                    kind=CLASS_SUMMARY_KIND if is_class else NAMESPACE_SUMMARY_KIND,
+                    name=scope,
+                    header=f"{compound_kind.capitalize() if is_class else 'Namespace'}: {scope}",
+                    children=self._by_scope[scope],
+                    file_path=next(iter(files)) if len(files) == 1 else None,
+                    max_chars=self.max_chars,
+                )
+            )
+
+        logger.info(
+            f"Built {len(self._by_file)} file summaries, {scopes['namespace']} namespace summaries "
+            f"and {scopes['class']} class summaries."
+        )
+        return summaries
+
+
+def build_summary_chunks(
+    elements: List[CodeElement],
+    chunked_ids: Optional[Set[str]] = None,
+    max_chars: int = DEFAULT_MAX_SUMMARY_CHARS,
+) -> List[Chunk]:
+    """
+    Builds file-level and scope-level (namespace or class) summary chunks from parsed elements.
+
+    Each summary chunk lists the names and brief descriptions of the elements
+    it contains, and stores their ids in ``metadata["children"]`` so a
+    retriever can search the (small) summary index first and then restrict
+    the fine-grained search to the children of the top hits. To summarize a
+    parse that is processed file by file, feed a `SummaryBuilder` instead.
+
+    Args:
+        elements: The parsed CodeElement objects.
+        chunked_ids: If given, only elements whose id is in this set are
+                     summarized (e.g. the ids that actually produced a chunk).
+        max_chars: Upper bound on the summary text length. Children beyond
+                   the bound are still linked in metadata but not listed.
+
+    Returns:
+        A list of summary Chunk objects, file summaries first.
+    """
+    builder = SummaryBuilder(max_chars=max_chars)
+    builder.add(elements, chunked_ids=chunked_ids)
+    return builder.chunks()
+
+
+def expand_summary_hits(summary_chunks: Iterable[Chunk], hit_ids: Iterable[str]) -> Set[str]:
+    """
+    Resolves summary chunk ids returned by a first-stage search to the ids of
+    their child chunks, for the second (fine-grained) search stage.
+
+    Args:
+        summary_chunks: The summary chunks produced by build_summary_chunks.
+        hit_ids: Ids of the summary chunks that matched the query.
+
+    Returns:
+        The union of the children ids of all matching summaries.
+    """
+    wanted = set(hit_ids)
+    children: Set[str] = set()
+    for chunk in summary_chunks:
+        if chunk.metadata.get("id") in wanted:
+            children.update(chunk.metadata.get("children", []))
+    return children
@@ -0,0 +1,604 @@
+# src/codiculum/cli.py
+"""Command line entry point: `codiculum <command> ...` (or `python -m codiculum`).
+
+Subcommand handlers import what they need inside the handler, so
+`codiculum --help` and light commands never pay for heavy backends.
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_logging(verbose: int) -> None:
+    level = logging.WARNING - 10 * min(verbose, 2)
+    logging.basicConfig(level=level, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+
+
+def _cmd_parse(args: argparse.Namespace) -> int:
+    from .doxygen_parser import parse_doxygen_xml_file
+
+    elements = parse_doxygen_xml_file(args.xml_file)
+    if args.src_base:
+        from .chunker import CodeChunker
+
+        for chunk in CodeChunker(args.src_base).chunk(elements):
+            print(chunk.text)
+            print("-" * 80)
+        return 0
+
+    for element in elements:
+        location = ""
+        if element.location:
+            location = f" {element.location.file}:{element.location.start_line}-{element.location.end_line}"
+        print(f"{element.kind} {element.name} ({element.id}){location}")
+    return 0
+
+
+def _expand_xml_inputs(paths: List[str]) -> List[str]:
+    from pathlib import Path
+
+    files: List[str] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(str(p) for p in sorted(path.glob("*.xml")))
+        else:
+            files.append(str(path))
+    return files
+
+
+def _make_embedder(args: argparse.Namespace):
+    from .embedding import HashingEmbedder, OpenAIEmbedder
+
+    if args.embedder == "openai":
+        return OpenAIEmbedder(model=args.embedding_model)
+    return HashingEmbedder(dim=args.dim)
+
+
+def _make_store(args: argparse.Namespace):
+    from .vector_store import QuantizedVectorStore
+
+    return QuantizedVectorStore(
+        quantization=args.quantization,
+        truncate_dim=args.truncate_dim,
+        rescore_path=args.rescore_path,
+        keep_full_precision=args.rescore_in_memory,
+    )
+
+
+async def _embedding_dim(embed_fn) -> int:
+    """The output size of an embedder (embeds a probe text unless it declares `dim`)."""
+    import inspect
+
+    dim = getattr(embed_fn, "dim", None)
+    if dim:
+        return dim
+    probe = embed_fn(["codiculum"])
+    if inspect.isawaitable(probe):
+        probe = await probe
+    return len(probe[0])
+
+
+def _dim_mismatch(path: str, stored_dim: int, args: argparse.Namespace, embedder_dim: int) -> str:
+    return (
+        f"{path} holds {stored_dim}-dim embeddings but the '{args.embedder}' embedder produces "
+        f"{embedder_dim}-dim vectors; pass the --embedder/--embedding-model (or --dim) the chunks were embedded with."
+    )
+
+
+async def _serve(args: argparse.Namespace) -> int:
+    import inspect
+
+    from .chunker.export import read_chunk_batches
+    from .rag import EchoLLM, OpenAIChatLLM
+    from .service import QueryService, ServiceConfig
+    from .vector_store import NamespacedIndex
+
+    embed_fn = _make_embedder(args)
+    llm = {"echo": EchoLLM, "openai": OpenAIChatLLM}.get(args.llm, lambda: None)()
+    store = _make_store(args)
+    # Chunks are namespaced by their corpus/version metadata; content shared by versions is stored once.
+    index = NamespacedIndex(store)
+    config = ServiceConfig(
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        request_timeout=args.timeout,
+        summary_first=args.summary_first,
+    )
+    service = QueryService(index, {}, embed_fn, llm=llm, config=config)
+    try:
+        # Queries are embedded with embed_fn, so stored vectors must come from the same embedder.
+        dim = await _embedding_dim(embed_fn)
+        for path in args.chunks:
+            for batch_chunks, embeddings in read_chunk_batches(path):
+                if embeddings is None or any(e is None for e in embeddings):
+                    # Re-embed the whole batch rather than mixing stored and new vectors.
+                    embeddings = embed_fn([chunk.text for chunk in batch_chunks])
+                    if inspect.isawaitable(embeddings):
+                        embeddings = await embeddings
+                stored_dim = next((len(e) for e in embeddings if len(e) != dim), None)
+                if stored_dim is not None:
+                    print(_dim_mismatch(path, stored_dim, args, dim), file=sys.stderr)
+                    return 1
+                service.add(batch_chunks, embeddings)
+        logger.warning(
+            f"Loaded {len(index)} chunks of {', '.join(map(str, index.namespaces()))} as {len(store)} vectors: "
+            f"{store.memory_bytes() / 2**20:.1f} MiB in RAM, "
+            f"{store.disk_bytes() / 2**20:.1f} MiB on disk (re-scoring {'on' if store.can_rescore else 'off'})."
+        )
+        await service.serve_forever()
+    finally:
+        await service.close()
+        store.close()
+    return 0
+
+
+async def _watch(args: argparse.Namespace) -> None:
+    import asyncio
+    import inspect
+    import threading
+
+    from .chunker import CodeChunker
+    from .indexing import IncrementalIndexer, create_watcher, watch
+    from .rag import EchoLLM, OpenAIChatLLM
+    from .service import QueryService, ServiceConfig
+    from .vector_store import NamespacedIndex
+
+    loop = asyncio.get_running_loop()
+    embedder = _make_embedder(args)
+
+    def embed_fn(texts):
+        # Called from the indexing thread; async backends run on the service loop and its shared client.
+        result = embedder(texts)
+        return asyncio.run_coroutine_threadsafe(result, loop).result() if inspect.isawaitable(result) else result
+
+    llm = {"echo": EchoLLM, "openai": OpenAIChatLLM}.get(args.llm, lambda: None)()
+    store = _make_store(args)
+    config = ServiceConfig(
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        request_timeout=args.timeout,
+    )
+    service = QueryService(NamespacedIndex(store), {}, embedder, llm=llm, config=config)
+    chunker = CodeChunker(args.src_base, corpus=args.corpus, version=args.corpus_version)
+    namespace = f"{args.corpus or ''}@{args.corpus_version or ''}"
+    indexer = IncrementalIndexer(args.xml_dir, chunker, embed_fn, service, namespace=namespace)
+
+    stats = await asyncio.to_thread(indexer.index_all)
+    logger.warning(f"Indexed {stats.chunks_embedded} chunks from {stats.xml_files} XML files in {stats.seconds:.1f}s.")
+    watcher = create_watcher([args.xml_dir, args.src_base], use_inotify=not args.poll, poll_interval=args.poll_interval)
+    stop = threading.Event()
+    watch_loop = asyncio.to_thread(watch, indexer, watcher, args.quiet_period, args.max_delay, stop)
+    try:
+        await asyncio.gather(service.serve_forever(), watch_loop)
+    finally:
+        stop.set()
+        watcher.close()
+        await service.close()
+        store.close()
+
+
+def _cmd_watch(args: argparse.Namespace) -> int:
+    import asyncio
+
+    try:
+        asyncio.run(_watch(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    import asyncio
+
+    try:
+        return asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+def _cmd_show(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from .doxygen_parser import RefidOffsetIndex
+
+    with RefidOffsetIndex(args.offsets) as index:
+        index.build(sorted(Path(args.xml_dir).glob("*.xml")))
+        if args.src_base:
+            element = index.load_element(args.refid)
+            if element is None:
+                print(f"No chunkable element with refid '{args.refid}'.", file=sys.stderr)
+                return 1
+            from .chunker import CodeChunker
+
+            for chunk in CodeChunker(args.src_base).chunk([element]):
+                print(chunk.text)
+            return 0
+        fragment = index.read_fragment(args.refid)
+    if fragment is None:
+        print(f"Unknown refid '{args.refid}'.", file=sys.stderr)
+        return 1
+    print(fragment.decode("utf-8"))
+    return 0
+
+
+def _cmd_index(args: argparse.Namespace) -> int:
+    import asyncio
+    import inspect
+
+    from .chunker import CodeChunker
+    from .doxygen_parser import BulkParser, Quarantine, parse_doxygen_xml_file
+    from .indexing import (
+        IncludeGraph,
+        IndexCheckpoint,
+        MemoryGovernor,
+        build_shard,
+        order_by_importance,
+        parse_shard_spec,
+        parse_size,
+        reference_counts_from_sqlite,
+        reference_counts_from_xml,
+    )
+
+    shard_index, num_shards = parse_shard_spec(args.shard)
+    xml_files = _expand_xml_inputs(args.xml)
+    if args.order == "importance":
+        if args.doxygen_db:
+            counts = reference_counts_from_sqlite(args.doxygen_db)
+        else:
+            counts = reference_counts_from_xml(xml_files)
+        xml_files = order_by_importance(xml_files, counts)
+    include_graph = None
+    if args.doxygen_db:
+        include_graph = IncludeGraph.from_sqlite(args.doxygen_db, include_roots=args.include_root)
+    elif args.includes_from_xml:
+        include_graph = IncludeGraph.from_xml(xml_files)
+    embedder = _make_embedder(args)
+    loop = asyncio.new_event_loop() if inspect.iscoroutinefunction(type(embedder).__call__) else None
+
+    def embed_fn(texts):
+        return loop.run_until_complete(embedder(texts)) if loop else embedder(texts)
+
+    chunker = CodeChunker(args.src_base, corpus=args.corpus, version=args.corpus_version, include_graph=include_graph)
+    governor = None
+    if args.memory_budget:
+        governor = MemoryGovernor(
+            parse_size(args.memory_budget),
+            batch_size=args.batch_size,
+            max_workers=args.parse_workers,
+            embedding_dim=args.dim if args.embedder == "hashing" else None,
+        )
+    parse_fn = parse_doxygen_xml_file
+    if args.quarantine:
+        parse_fn = BulkParser(
+            workers=args.parse_workers,
+            timeout=args.parse_timeout,
+            memory_limit=parse_size(args.parse_memory_limit) if args.parse_memory_limit else None,
+            quarantine=Quarantine(args.quarantine),
+        )
+    checkpoint = IndexCheckpoint(args.checkpoint) if args.checkpoint else None
+    try:
+        manifest = build_shard(
+            xml_files,
+            shard_index,
+            num_shards,
+            args.output_dir,
+            chunker,
+            embed_fn,
+            format=args.format,
+            batch_size=args.batch_size,
+            parse_fn=parse_fn,
+            governor=governor,
+            parse_workers=parse_fn.workers if isinstance(parse_fn, BulkParser) else args.parse_workers or 1,
+            checkpoint=checkpoint,
+            include_summaries=args.summaries,
+        )
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        if isinstance(parse_fn, BulkParser):
+            parse_fn.close()
+        if loop:
+            loop.run_until_complete(embedder.close())
+            loop.close()
+    print(f"Shard {shard_index}/{num_shards}: {manifest.files} files, {manifest.chunks} chunks -> {manifest.chunk_file}")
+    if governor:
+        print(governor.report())
+    if isinstance(parse_fn, BulkParser) and parse_fn.stats.failed:
+        print(f"{sum(parse_fn.stats.failed.values())} XML files failed and were quarantined in {args.quarantine}.")
+    return 0
+
+
+def _cmd_quarantine(args: argparse.Namespace) -> int:
+    from .doxygen_parser import BulkParser, Quarantine
+    from .indexing import parse_size
+
+    quarantine = Quarantine(args.quarantine)
+    if args.retry:
+        memory_limit = parse_size(args.parse_memory_limit) if args.parse_memory_limit else None
+        parser = BulkParser(workers=1, timeout=args.parse_timeout, memory_limit=memory_limit, quarantine=quarantine)
+        with parser:
+            for xml_file, elements in parser.retry_quarantined(max_attempts=args.max_attempts):
+                print(f"OK      {xml_file}: {len(elements)} elements")
+    for failure in quarantine.entries():
+        print(f"{failure.kind:<8}{failure.xml_file} (attempts: {failure.attempts}): {failure.error}")
+    return 1 if len(quarantine) else 0
+
+
+def _cmd_merge(args: argparse.Namespace) -> int:
+    from .indexing import merge_shards
+
+    merged = merge_shards(args.shard_dir, args.output)
+    print(f"Merged {merged['num_shards']} shards: {merged['chunks']} chunks -> {args.output}")
+    return 0
+
+
+def _cmd_compact(args: argparse.Namespace) -> int:
+    from .chunker import CodeChunker, CompressedChunkStore, read_chunk_batches
+    from .indexing import compact_chunk_file, find_stale_ids, live_chunk_ids
+
+    live_ids = live_chunk_ids(_expand_xml_inputs(args.xml), CodeChunker(args.src_base))
+    chunk_ids = [chunk.metadata["id"] for chunks, _ in read_chunk_batches(args.chunks) for chunk in chunks]
+    chunk_store = CompressedChunkStore(args.chunk_store) if args.chunk_store else None
+    try:
+        # Check every stale fraction before anything is purged.
+        try:
+            find_stale_ids(chunk_ids, live_ids, args.max_stale_fraction, f"chunks of {args.chunks}")
+            store_stale = find_stale_ids(
+                chunk_store.ids() if chunk_store else [], live_ids, args.max_stale_fraction,
+                f"chunks of {args.chunk_store}",
+            )
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        dropped = compact_chunk_file(args.chunks, live_ids, args.output)
+        print(f"Purged {dropped}/{len(chunk_ids)} stale chunks from {args.chunks}.")
+        if chunk_store is not None:
+            chunk_store.delete(store_stale)
+            reclaimed = chunk_store.compact()
+            print(f"Purged {len(store_stale)} stale chunks from {args.chunk_store}; reclaimed {reclaimed} bytes.")
+    finally:
+        if chunk_store is not None:
+            chunk_store.close()
+    return 0
+
+
+def _cmd_pack(args: argparse.Namespace) -> int:
+    from .chunker import CompressedChunkStore, read_chunk_batches
+
+    with CompressedChunkStore(args.output, codec=args.codec) as store:
+        for batch_chunks, _ in read_chunk_batches(args.chunks):
+            if not store.dictionary and not len(store):
+                store.train(batch_chunks[: args.train_samples])
+            store.put_many(batch_chunks)
+        stats = store.stats()
+    print(
+        f"Packed {stats['chunks']} chunks: {stats['raw_bytes']} -> {stats['stored_bytes']} bytes "
+        f"({stats['compression_ratio']:.1f}x, {stats['dictionary_bytes']}-byte dictionary) -> {args.output}"
+    )
+    return 0
+
+
+def _cmd_evaluate(args: argparse.Namespace) -> int:
+    import asyncio
+    import inspect
+
+    from .chunker.export import read_chunk_batches
+    from .evaluation import VectorRetriever, evaluate, format_report, generate_questions, load_questions
+    from .vector_store import QuantizedVectorStore
+
+    embedder = _make_embedder(args)
+    loop = asyncio.new_event_loop() if inspect.iscoroutinefunction(type(embedder).__call__) else None
+
+    def embed_fn(texts):
+        return loop.run_until_complete(embedder(texts)) if loop else embedder(texts)
+
+    try:
+        # Questions are embedded with embed_fn, so stored vectors must come from the same embedder.
+        dim = getattr(embedder, "dim", None) or len(embed_fn(["codiculum"])[0])
+        chunks, embeddings = [], []
+        for batch_chunks, batch_embeddings in read_chunk_batches(args.chunks):
+            chunks.extend(batch_chunks)
+            if batch_embeddings is None or any(e is None for e in batch_embeddings):
+                # Re-embed the whole batch rather than mixing stored and new vectors.
+                batch_embeddings = embed_fn([chunk.text for chunk in batch_chunks])
+            stored_dim = next((len(e) for e in batch_embeddings if len(e) != dim), None)
+            if stored_dim is not None:
+                print(_dim_mismatch(args.chunks, stored_dim, args, dim), file=sys.stderr)
+                return 1
+            embeddings.extend(batch_embeddings)
+        questions = load_questions(args.questions) if args.questions else generate_questions(chunks)
+        if args.limit:
+            questions = questions[: args.limit]
+
+        retrievers = {}
+        for quantization in args.quantization:
+            for truncate_dim in args.truncate_dim or [None]:
+                # Re-scoring keeps the full vectors in RAM, so it gets its own store and index size.
+                compact = QuantizedVectorStore(quantization=quantization, truncate_dim=truncate_dim)
+                compact.add(chunks, embeddings)
+                name = f"{quantization}" + (f"/dim{truncate_dim}" if truncate_dim else "")
+                if quantization == "none":
+                    retrievers[name] = VectorRetriever(compact, embed_fn, rescore=False)
+                    continue
+                store = QuantizedVectorStore(quantization=quantization, truncate_dim=truncate_dim,
+                                             keep_full_precision=True)
+                store.add(chunks, embeddings)
+                retrievers[name] = VectorRetriever(store, embed_fn)
+                retrievers[f"{name}/no-rescore"] = VectorRetriever(compact, embed_fn, rescore=False)
+
+        print(f"{len(questions)} questions over {len(chunks)} chunks")
+        print(format_report(evaluate(retrievers, questions, k=args.k)))
+    finally:
+        if loop:
+            loop.run_until_complete(embedder.close())
+            loop.close()
+    return 0
+
+
+def _add_service_arguments(cmd: argparse.ArgumentParser) -> None:
+    cmd.add_argument("--host", default="127.0.0.1")
+    cmd.add_argument("--port", type=int, default=8080)
+    cmd.add_argument("--embedder", choices=["hashing", "openai"], default="hashing",
+                     help="'hashing' is an offline stand-in; 'openai' needs OPENAI_API_KEY.")
+    cmd.add_argument("--embedding-model", default="text-embedding-3-small")
+    cmd.add_argument("--dim", type=int, default=256, help="Dimension of the hashing embedder.")
+    cmd.add_argument("--llm", choices=["none", "echo", "openai"], default="echo")
+    cmd.add_argument("--quantization", choices=["none", "int8", "binary"], default="int8")
+    cmd.add_argument("--truncate-dim", type=int, default=None)
+    rescore = cmd.add_mutually_exclusive_group()
+    rescore.add_argument("--rescore-path",
+                         help="Keep full-precision vectors in this file to re-score compact search results.")
+    rescore.add_argument("--rescore-in-memory", action="store_true",
+                         help="Keep full-precision vectors in RAM to re-score (default: compact codes only).")
+    cmd.add_argument("--max-concurrency", type=int, default=32)
+    cmd.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds.")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="codiculum", description="Codiculum: a coding RAG framework.")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Increase log verbosity (-v, -vv).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parse_cmd = subparsers.add_parser("parse", help="Parse a Doxygen XML file and list (or chunk) its elements.")
+    parse_cmd.add_argument("xml_file", help="Path to the Doxygen XML file.")
+    parse_cmd.add_argument("--src-base", help="Source root; if given, print the generated chunks instead.")
+    parse_cmd.set_defaults(handler=_cmd_parse)
+
+    serve_cmd = subparsers.add_parser("serve", help="Serve /search and /query over an exported chunk file.")
+    serve_cmd.add_argument("chunks", nargs="+",
+                           help="Chunk export files (.jsonl/.arrow/.parquet), with or without embeddings; "
+                                "chunks of several corpus versions are served side by side.")
+    serve_cmd.add_argument("--summary-first", action="store_true",
+                           help="Search summary chunks first, then only their children (needs 'index --summaries').")
+    _add_service_arguments(serve_cmd)
+    serve_cmd.set_defaults(handler=_cmd_serve)
+
+    watch_cmd = subparsers.add_parser(
+        "watch", help="Index an XML directory, serve it, and re-index changed XML/source files continuously."
+    )
+    watch_cmd.add_argument("xml_dir", help="Doxygen XML output directory.")
+    watch_cmd.add_argument("--src-base", required=True, help="Source root the XML locations are relative to.")
+    watch_cmd.add_argument("--corpus", help="Corpus name recorded on every chunk.")
+    watch_cmd.add_argument("--corpus-version", help="Corpus version recorded on every chunk, e.g. 18.x.")
+    watch_cmd.add_argument("--quiet-period", type=float, default=0.5,
+                           help="Seconds without changes that end a burst.")
+    watch_cmd.add_argument("--max-delay", type=float, default=5.0,
+                           help="Maximum seconds between the first change of a burst and its update.")
+    watch_cmd.add_argument("--poll", action="store_true", help="Use stat polling instead of inotify.")
+    watch_cmd.add_argument("--poll-interval", type=float, default=1.0)
+    _add_service_arguments(watch_cmd)
+    watch_cmd.set_defaults(handler=_cmd_watch)
+
+    show_cmd = subparsers.add_parser("show", help="Print one element's XML (or chunk) by refid via the offset index.")
+    show_cmd.add_argument("refid", help="Doxygen refid, e.g. classllvm_1_1Function.")
+    show_cmd.add_argument("--xml-dir", required=True, help="Doxygen XML output directory.")
+    show_cmd.add_argument("--offsets", default=".codiculum/offsets.db",
+                          help="Offset index database (created or refreshed as needed).")
+    show_cmd.add_argument("--src-base", help="Source root; if given, print the element's chunk instead of its XML.")
+    show_cmd.set_defaults(handler=_cmd_show)
+
+    index_cmd = subparsers.add_parser("index", help="Parse, chunk and embed XML files into a (shard) chunk file.")
+    index_cmd.add_argument("xml", nargs="+", help="Doxygen XML files or directories of them.")
+    index_cmd.add_argument("--src-base", required=True, help="Source root the XML locations are relative to.")
+    index_cmd.add_argument("--output-dir", required=True, help="Directory for the shard file and its manifest.")
+    index_cmd.add_argument("--corpus", help="Corpus name recorded on every chunk (multi-repo indexes).")
+    index_cmd.add_argument("--corpus-version", help="Corpus version recorded on every chunk, e.g. 18.x.")
+    index_cmd.add_argument("--doxygen-db",
+                           help="Doxygen SQLite output: includes for each chunk, reference counts for --order.")
+    index_cmd.add_argument("--include-root", action="append", default=[],
+                           help="Include directory as prefixed in --doxygen-db paths; includes are spelled "
+                                "relative to it (repeatable).")
+    index_cmd.add_argument("--includes-from-xml", action="store_true",
+                           help="List each chunk's includes, reading <includes> from the XML file compounds.")
+    index_cmd.add_argument("--order", choices=["input", "importance"], default="input",
+                           help="Processing order: as given, or most-referenced compounds first "
+                                "(reference counts from --doxygen-db, else from the XML).")
+    index_cmd.add_argument("--shard", default="0/1", help="This worker's shard as INDEX/COUNT, e.g. 2/8.")
+    index_cmd.add_argument("--format", choices=["jsonl", "arrow", "parquet"], default="jsonl")
+    index_cmd.add_argument("--batch-size", type=int, default=64, help="(Initial) number of chunks per batch.")
+    index_cmd.add_argument("--summaries", action="store_true",
+                           help="Also index file/namespace/class summary chunks (for 'serve --summary-first').")
+    index_cmd.add_argument("--checkpoint",
+                           help="SQLite progress file of this shard; rerunning an interrupted build with it resumes.")
+    index_cmd.add_argument("--memory-budget",
+                           help="Memory budget (start-up RSS plus in-flight objects), e.g. 2G; adapts batch "
+                                "sizes and parse workers to stay under it.")
+    index_cmd.add_argument("--parse-workers", type=int,
+                           help="Maximum concurrent XML parses (worker processes with --quarantine; "
+                                "default: CPU count with --quarantine or --memory-budget, else 1).")
+    index_cmd.add_argument("--quarantine",
+                           help="Parse in worker processes and record failing XML files in this JSONL file.")
+    index_cmd.add_argument("--parse-timeout", type=float, default=60.0, help="Seconds allowed per XML file.")
+    index_cmd.add_argument("--parse-memory-limit", help="Address-space cap per parse worker, e.g. 4G.")
+    index_cmd.add_argument("--embedder", choices=["hashing", "openai"], default="hashing")
+    index_cmd.add_argument("--embedding-model", default="text-embedding-3-small")
+    index_cmd.add_argument("--dim", type=int, default=256, help="Dimension of the hashing embedder.")
+    index_cmd.set_defaults(handler=_cmd_index)
+
+    quarantine_cmd = subparsers.add_parser(
+        "quarantine", help="List (or retry) the XML files quarantined by `index --quarantine`."
+    )
+    quarantine_cmd.add_argument("quarantine", help="Quarantine JSONL file.")
+    quarantine_cmd.add_argument("--retry", action="store_true", help="Re-parse the quarantined files.")
+    quarantine_cmd.add_argument("--parse-timeout", type=float, default=600.0, help="Seconds allowed per file on retry.")
+    quarantine_cmd.add_argument("--parse-memory-limit", help="Address-space cap of the retry worker, e.g. 8G.")
+    quarantine_cmd.add_argument("--max-attempts", type=int, help="Skip files that already failed this many times.")
+    quarantine_cmd.set_defaults(handler=_cmd_quarantine)
+
+    merge_cmd = subparsers.add_parser("merge", help="Merge the shard outputs of `index --shard` into one chunk file.")
+    merge_cmd.add_argument("shard_dir", help="Directory with all shard files and manifests.")
+    merge_cmd.add_argument("output", help="Merged chunk file (.jsonl/.arrow/.parquet).")
+    merge_cmd.set_defaults(handler=_cmd_merge)
+
+    compact_cmd = subparsers.add_parser(
+        "compact", help="Purge chunks whose elements no longer exist from a chunk file (and chunk store)."
+    )
+    compact_cmd.add_argument("chunks", help="Chunk export file (.jsonl/.arrow/.parquet) to compact.")
+    compact_cmd.add_argument("xml", nargs="+", help="Current Doxygen XML files or directories of them.")
+    compact_cmd.add_argument("--src-base", required=True, help="Source root the XML locations are relative to.")
+    compact_cmd.add_argument("--chunk-store", help="Compressed chunk store (see `pack`) to purge as well.")
+    compact_cmd.add_argument("--output", help="Write the compacted chunk file here instead of in place.")
+    compact_cmd.add_argument("--max-stale-fraction", type=float, default=0.5,
+                             help="Refuse to purge more than this fraction of the stored chunks.")
+    compact_cmd.set_defaults(handler=_cmd_compact)
+
+    pack_cmd = subparsers.add_parser("pack", help="Pack a chunk file into a dictionary-compressed chunk store.")
+    pack_cmd.add_argument("chunks", help="Chunk export file (.jsonl/.arrow/.parquet).")
+    pack_cmd.add_argument("output", help="Chunk store (SQLite) to create or update.")
+    pack_cmd.add_argument("--codec", choices=["zlib", "zstd"], default="zlib")
+    pack_cmd.add_argument("--train-samples", type=int, default=1024,
+                          help="Chunks of the first batch used to train the dictionary of a new store.")
+    pack_cmd.set_defaults(handler=_cmd_pack)
+
+    eval_cmd = subparsers.add_parser("evaluate", help="Compare retrieval configs: recall@k, MRR, latency, index size.")
+    eval_cmd.add_argument("chunks", help="Chunk export file (.jsonl/.arrow/.parquet).")
+    eval_cmd.add_argument("--questions", help="JSONL question set; generated from chunk metadata if omitted.")
+    eval_cmd.add_argument("--limit", type=int, help="Only use the first N questions.")
+    eval_cmd.add_argument("--k", type=int, default=10)
+    eval_cmd.add_argument("--embedder", choices=["hashing", "openai"], default="hashing",
+                          help="Embeds the questions (and chunks stored without embeddings); "
+                               "must match the embedder of the stored embeddings.")
+    eval_cmd.add_argument("--embedding-model", default="text-embedding-3-small")
+    eval_cmd.add_argument("--dim", type=int, default=256, help="Dimension of the hashing embedder.")
+    eval_cmd.add_argument("--quantization", nargs="+", default=["none", "int8", "binary"],
+                          choices=["none", "int8", "binary"])
+    eval_cmd.add_argument("--truncate-dim", type=int, nargs="*", help="Matryoshka truncation sizes to compare.")
+    eval_cmd.set_defaults(handler=_cmd_evaluate)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    _configure_logging(args.verbose)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
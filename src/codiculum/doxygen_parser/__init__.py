@@ -1,3 +1,25 @@
-from .doxygen_parser import parse_doxygen_xml_file
+from .bulk import BulkParser, BulkParseStats, ParseFailure, Quarantine
+from .doxygen_parser import (
+    PARSED_KINDS,
+    make_xml_parser,
+    parse_doxygen_fragment,
+    parse_doxygen_xml_file,
+    read_doxygen_xml_file,
+)
+from .offset_index import ElementSpan, RefidOffsetIndex, scan_element_spans, scan_refids
 
-__all__ = ['parse_doxygen_xml_file']
\ No newline at end of file
+__all__ = [
+    'parse_doxygen_xml_file',
+    'parse_doxygen_fragment',
+    'PARSED_KINDS',
+    'read_doxygen_xml_file',
+    'make_xml_parser',
+    'BulkParser',
+    'BulkParseStats',
+    'ParseFailure',
+    'Quarantine',
+    'ElementSpan',
+    'RefidOffsetIndex',
+    'scan_element_spans',
+    'scan_refids',
+]
@@ -0,0 +1,348 @@
+# src/codiculum/doxygen_parser/bulk.py
+"""Fault-tolerant parsing of large Doxygen XML outputs.
+
+`BulkParser` parses each file in a separate worker process with a
+per-file timeout and an optional address-space cap, so a pathological file
+cannot stall or exhaust the indexing process. Malformed files are retried
+in lxml's recovery mode; files that still fail (syntax errors beyond
+recovery, timeouts, memory errors, crashed workers) are recorded in a
+`Quarantine` file with their error and can be retried separately.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+from .doxygen_parser import read_doxygen_xml_file
+from .models import CodeElement
+
+logger = logging.getLogger(__name__)
+
+# Worker reply statuses.
+OK = "ok"
+RECOVERED = "recovered"
+SYNTAX = "syntax"
+MEMORY = "memory"
+IO = "io"
+ERROR = "error"
+TIMEOUT = "timeout"
+CRASH = "crash"
+
+
+@dataclass
+class ParseFailure:
+    xml_file: str
+    kind: str  # syntax, memory, io, error, timeout or crash
+    error: str
+    attempts: int = 1
+    last_attempt: float = field(default_factory=time.time)
+
+
+class Quarantine:
+    """
+    JSONL list of XML files that could not be parsed, with their last error.
+
+    Every change is written through (atomically), so the list survives a
+    crashed run; a file leaves the quarantine when a later parse succeeds.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ParseFailure] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        failure = ParseFailure(**json.loads(line))
+                        self._entries[failure.xml_file] = failure
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, xml_file: str) -> bool:
+        return str(xml_file) in self._entries
+
+    def get(self, xml_file: str) -> Optional[ParseFailure]:
+        return self._entries.get(str(xml_file))
+
+    def entries(self) -> List[ParseFailure]:
+        return sorted(self._entries.values(), key=lambda failure: failure.xml_file)
+
+    def record(self, xml_file: str, kind: str, error: str) -> ParseFailure:
+        """Adds a failure, or bumps the attempt count of a quarantined file."""
+        with self._lock:
+            previous = self._entries.get(xml_file)
+            failure = ParseFailure(xml_file, kind, error, attempts=previous.attempts + 1 if previous else 1)
+            self._entries[xml_file] = failure
+            self._save()
+        return failure
+
+    def resolve(self, xml_file: str) -> bool:
+        """Removes a file that parsed successfully. Returns whether it was quarantined."""
+        with self._lock:
+            if self._entries.pop(str(xml_file), None) is None:
+                return False
+            self._save()
+        return True
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for failure in self._entries.values():
+                f.write(json.dumps(asdict(failure)) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class BulkParseStats:
+    parsed: int = 0
+    recovered: int = 0
+    failed: Dict[str, int] = field(default_factory=dict)  # failure kind -> count
+    resolved: int = 0  # previously quarantined files that parsed this time
+
+
+def _out_of_memory(error: etree.XMLSyntaxError) -> bool:
+    # libxml2 reports failed allocations as parse errors.
+    return error.code == etree.ErrorTypes.ERR_NO_MEMORY
+
+
+def _worker_main(conn, memory_limit: Optional[int], corpus: Optional[str], version: Optional[str]) -> None:
+    """Worker process loop: receives XML paths, replies with (status, elements or error)."""
+    if memory_limit:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    while True:
+        try:
+            xml_file = conn.recv()
+        except EOFError:
+            return
+        if xml_file is None:
+            return
+        try:
+            try:
+                reply = (OK, read_doxygen_xml_file(xml_file, corpus=corpus, version=version))
+            except etree.XMLSyntaxError as e:
+                if _out_of_memory(e):
+                    raise
+                elements = read_doxygen_xml_file(xml_file, corpus=corpus, version=version, recover=True)
+                reply = (RECOVERED, (elements, str(e)))
+        except MemoryError as e:
+            reply = (MEMORY, f"Memory limit exceeded: {e}")
+        except etree.XMLSyntaxError as e:
+            reply = (MEMORY, f"Memory limit exceeded: {e}") if _out_of_memory(e) else (SYNTAX, str(e))
+        except OSError as e:
+            reply = (IO, str(e))
+        except Exception as e:
+            reply = (ERROR, f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except MemoryError:
+            conn.send((MEMORY, "Memory limit exceeded while sending the parsed elements."))
+
+
+class _Worker:
+    def __init__(self, ctx, memory_limit: Optional[int], corpus: Optional[str], version: Optional[str]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, memory_limit, corpus, version), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def parse(self, xml_file: str, timeout: Optional[float]) -> Tuple[str, object]:
+        try:
+            self.conn.send(xml_file)
+            if not self.conn.poll(timeout):
+                return TIMEOUT, f"No result after {timeout}s."
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            return CRASH, f"Worker process died (exit code {self.process.exitcode})."
+
+    def stop(self, kill: bool = False) -> None:
+        if kill or not self.process.is_alive():
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+class BulkParser:
+    """
+    Parses Doxygen XML files in worker processes with a timeout and memory cap per file.
+
+    A BulkParser is a drop-in `parse_fn` for `build_index`/`build_shard`:
+    calling it with one path returns that file's elements, or an empty list
+    after quarantining the file. It is thread-safe; concurrent calls (e.g.
+    from a `MemoryGovernor`'s parse-ahead threads) use separate workers.
+    A worker that times out or dies is replaced, so one pathological file
+    costs at most `timeout` seconds and never the whole run; a file whose
+    worker died is retried once on a fresh worker before it is quarantined.
+
+    Usage:
+        with BulkParser(workers=8, timeout=60, memory_limit=parse_size("2G"),
+                        quarantine=Quarantine("quarantine.jsonl")) as parser:
+            for xml_file, elements in parser.parse_many(xml_files):
+                ...
+            retried = dict(parser.retry_quarantined(timeout=600))
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = 60.0,
+        memory_limit: Optional[int] = None,
+        quarantine: Optional[Quarantine] = None,
+        corpus: Optional[str] = None,
+        version: Optional[str] = None,
+        mp_context: Optional[str] = None,
+    ):
+        """
+        Args:
+            workers: Maximum number of worker processes (default: CPU count).
+            timeout: Seconds allowed per file (None: unlimited).
+            memory_limit: Address-space cap of each worker in bytes (RLIMIT_AS;
+                          None: unlimited). Leave room for the interpreter itself.
+            quarantine: Where failing files are recorded (None: only logged).
+            corpus: Optional corpus name stamped on every element.
+            version: Optional corpus version stamped on every element.
+            mp_context: multiprocessing start method (default: "forkserver" where
+                        available, else "spawn"; forking a threaded process can deadlock).
+        """
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.quarantine = quarantine
+        self.corpus = corpus
+        self.version = version
+        self.stats = BulkParseStats()
+        if mp_context is None:
+            mp_context = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+
+    def _new_worker(self) -> _Worker:
+        return _Worker(self._ctx, self.memory_limit, self.corpus, self.version)
+
+    def _idle_worker(self) -> _Worker:
+        """A pooled worker that is still alive (idle workers can be OOM-killed), or a new one."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_worker()
+            if worker.process.is_alive():
+                return worker
+            worker.stop(kill=True)
+
+    def __call__(self, xml_file: str | Path) -> List[CodeElement]:
+        return self.parse_file(xml_file)
+
+    def parse_file(self, xml_file: str | Path, timeout: Optional[float] = None) -> List[CodeElement]:
+        """
+        Parses one file in a worker process.
+
+        Returns:
+            The extracted elements; an empty list if the file failed (and was quarantined).
+        """
+        xml_file = str(xml_file)
+        timeout = timeout if timeout is not None else self.timeout
+        with self._slots:
+            worker = self._idle_worker()
+            status, result = worker.parse(xml_file, timeout)
+            if status == CRASH:
+                # The worker may have died before reading this file: give it one fresh worker.
+                worker.stop(kill=True)
+                worker = self._new_worker()
+                status, result = worker.parse(xml_file, timeout)
+            if status in (TIMEOUT, CRASH, MEMORY):
+                # The worker may be stuck or have exhausted its heap: replace it.
+                worker.stop(kill=True)
+            else:
+                self._idle.put(worker)
+
+        if status in (OK, RECOVERED):
+            elements = result
+            if status == RECOVERED:
+                elements, strict_error = result
+                logger.warning(f"Parsed {xml_file} in recovery mode ({len(elements)} elements): {strict_error}")
+            with self._lock:
+                self.stats.parsed += 1
+                self.stats.recovered += status == RECOVERED
+            if self.quarantine is not None and self.quarantine.resolve(xml_file):
+                with self._lock:
+                    self.stats.resolved += 1
+                logger.info(f"{xml_file} parsed successfully and left the quarantine.")
+            return elements
+
+        with self._lock:
+            self.stats.failed[status] = self.stats.failed.get(status, 0) + 1
+        if self.quarantine is not None:
+            failure = self.quarantine.record(xml_file, status, str(result))
+            logger.error(f"Quarantined {xml_file} ({status}, attempt {failure.attempts}): {result}")
+        else:
+            logger.error(f"Could not parse {xml_file} ({status}): {result}")
+        return []
+
+    def parse_many(self, xml_files: Iterable[str | Path]) -> Iterator[Tuple[str, List[CodeElement]]]:
+        """Parses files with all workers in parallel, yielding (xml_file, elements) in input order."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="codiculum-bulk") as pool:
+            files = [str(xml_file) for xml_file in xml_files]
+            yield from zip(files, pool.map(self.parse_file, files))
+
+    def retry_quarantined(
+        self, timeout: Optional[float] = None, max_attempts: Optional[int] = None
+    ) -> Iterator[Tuple[str, List[CodeElement]]]:
+        """
+        Re-parses quarantined files (e.g. with a longer timeout), one at a time.
+
+        Files that succeed leave the quarantine; the others have their
+        attempt count and error updated.
+
+        Args:
+            timeout: Seconds allowed per file (default: the parser's timeout).
+            max_attempts: Skip files that already failed this many times.
+
+        Yields:
+            (xml_file, elements) for every file that now parses.
+        """
+        if self.quarantine is None:
+            return
+        for failure in self.quarantine.entries():
+            if max_attempts is not None and failure.attempts >= max_attempts:
+                continue
+            elements = self.parse_file(failure.xml_file, timeout=timeout)
+            if failure.xml_file not in self.quarantine:
+                yield failure.xml_file, elements
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+    def __enter__(self) -> "BulkParser":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -7,6 +7,9 @@ from .models import CodeElement, CodeLocation
 
 logger = logging.getLogger(__name__)
 
+# Compound kinds turned into CodeElements; other compounds and members are skipped.
+PARSED_KINDS = frozenset({"class"})
+
 
 def _get_text(element, tag: str) -> Optional[str]:
     """Safely gets the text content of a direct child tag."""
@@ -92,15 +95,15 @@ def _parse_class_def(compound_def: etree.Element) -> Optional[CodeElement]:
     location = None
     if location_element is not None:
         file_path = location_element.get("file")
-        bodystart = int(location_element.get("bodystart"))
-        bodyend = int(location_element.get("bodyend"))
+        bodystart = location_element.get("bodystart")
+        bodyend = location_element.get("bodyend")
         try:
             location = CodeLocation(
                 file=file_path,
-                start_line=bodystart,
-                end_line=bodyend,
+                start_line=int(bodystart),
+                end_line=int(bodyend),
             )
-        except ValueError:
+        except (TypeError, ValueError):
             logger.warning(
                 f"Could not parse line numbers for function {name} in {file_path}: bodystart='{bodystart}', bodyend='{bodyend}'"
             )
@@ -119,31 +122,75 @@ def _parse_class_def(compound_def: etree.Element) -> Optional[CodeElement]:
     logger.debug(f"Extracted class element: {name} ({kind}), Template: {template_params}")
     return element
 
-def parse_doxygen_xml_file(xml_file_path: str) -> List[CodeElement]:
+
+def _extract_elements(root, corpus: Optional[str], version: Optional[str]) -> List[CodeElement]:
+    compound_defs = [root] if root.tag == "compounddef" else root.findall(".//compounddef")
+    elements: List[CodeElement] = []
+    for compound_def in compound_defs:
+        kind = compound_def.get("kind")
+        if kind in PARSED_KINDS: # TODO: Add other kinds
+            element = _parse_class_def(compound_def)
+            if element:
+                element.corpus, element.version = corpus, version
+                elements.append(element)
+    return elements
+
+
+def make_xml_parser(recover: bool = False) -> etree.XMLParser:
+    """
+    XML parser for Doxygen output. `huge_tree` lifts libxml2's limits on text
+    node size and tree depth, which huge `detaileddescription`s exceed;
+    `recover` salvages what it can from malformed files.
+    """
+    return etree.XMLParser(huge_tree=True, recover=recover)
+
+
+def read_doxygen_xml_file(
+    xml_file_path: str, corpus: Optional[str] = None, version: Optional[str] = None, recover: bool = False
+) -> List[CodeElement]:
+    """
+    Like `parse_doxygen_xml_file`, but lets errors propagate instead of returning an empty list.
+
+    Args:
+        xml_file_path: Path to the Doxygen XML file.
+        corpus: Optional corpus name stamped on every element.
+        version: Optional corpus version stamped on every element.
+        recover: Parse malformed XML in recovery mode (errors are logged, not raised).
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the file is not well-formed (and `recover` is off).
+        OSError: If the file cannot be read.
+    """
+    parser = make_xml_parser(recover=recover)
+    root = etree.parse(xml_file_path, parser).getroot()
+    if recover and len(parser.error_log):
+        logger.warning(f"Recovered from {len(parser.error_log)} XML errors in {xml_file_path}: {parser.error_log[0]}")
+    if root is None:
+        raise etree.XMLSyntaxError(f"No document element could be recovered from {xml_file_path}", None, 0, 0)
+    return _extract_elements(root, corpus, version)
+
+
+def parse_doxygen_xml_file(
+    xml_file_path: str, corpus: Optional[str] = None, version: Optional[str] = None
+) -> List[CodeElement]:
     """
     Parses a Doxygen XML file and extracts information about code elements,
     including functions and classes.
 
     Args:
         xml_file_path: Path to the Doxygen XML file.
+        corpus: Optional corpus name stamped on every element (multi-repo setups).
+        version: Optional corpus version stamped on every element.
 
     Returns:
-        A list of CodeElement objects representing the extracted information.
+        A list of CodeElement objects representing the extracted information
+        (empty, with the error logged, if the file cannot be parsed; see
+        `doxygen_parser.bulk.BulkParser` for quarantining such files).
     """
     logger.info(f"Parsing Doxygen XML file: {xml_file_path}")
     elements: List[CodeElement] = []
     try:
-        tree = etree.parse(xml_file_path)
-        root = tree.getroot()
-
-        # Find all interesting defintisions
-        for compound_def in root.findall(".//compounddef"):
-            kind = compound_def.get("kind")
-            if kind == "class": # TODO: Add other kinds
-                element = _parse_class_def(compound_def)
-                if element:
-                    elements.append(element)
-
+        elements = read_doxygen_xml_file(xml_file_path, corpus=corpus, version=version)
     except etree.XMLSyntaxError as e:
         logger.error(f"Error parsing XML file {xml_file_path}: {e}")
     except FileNotFoundError:
@@ -157,6 +204,28 @@ def parse_doxygen_xml_file(xml_file_path: str) -> List[CodeElement]:
     return elements
 
 
+def parse_doxygen_fragment(
+    fragment: bytes, corpus: Optional[str] = None, version: Optional[str] = None
+) -> List[CodeElement]:
+    """
+    Parses one `<compounddef>` or `<memberdef>` XML fragment, such as the byte
+    span read by `RefidOffsetIndex.read_fragment`, with the same rules as
+    `parse_doxygen_xml_file`.
+
+    Args:
+        fragment: The element's XML bytes (UTF-8).
+        corpus: Optional corpus name stamped on every element.
+        version: Optional corpus version stamped on every element.
+
+    Returns:
+        The extracted CodeElement objects (empty for unsupported kinds).
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the fragment is not well-formed.
+    """
+    return _extract_elements(etree.fromstring(fragment, make_xml_parser()), corpus, version)
+
+
 # Example Usage (requires a sample Doxygen XML file)
 if __name__ == "__main__":
     import sys
@@ -18,4 +18,6 @@ class CodeElement:
     detailed_description: Optional[str] = None # Can store signatures, parameters, etc. here if needed
     location: Optional[CodeLocation] = None
     template_params: Optional[str] = None # For C++ templates, e.g., "template <typename T>"
+    corpus: Optional[str] = None # Source repository, e.g., "llvm-project" (None for single-corpus setups)
+    version: Optional[str] = None # Release/branch of the corpus, e.g., "release/18.x"
 
@@ -0,0 +1,242 @@
+# src/codiculum/doxygen_parser/offset_index.py
+import logging
+import mmap
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from .doxygen_parser import parse_doxygen_fragment
+from .models import CodeElement
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS xml_files (
+    path        TEXT PRIMARY KEY NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    size        INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS elements (
+    refid       TEXT PRIMARY KEY NOT NULL,
+    xml_file    TEXT NOT NULL,
+    start       INTEGER NOT NULL,  -- Byte offset of the start tag.
+    end         INTEGER NOT NULL,  -- Byte offset just past the end tag.
+    tag         TEXT NOT NULL,     -- 'compounddef' or 'memberdef'
+    kind        TEXT
+);
+CREATE INDEX IF NOT EXISTS elements_by_file ON elements (xml_file);
+"""
+
+# Doxygen escapes '<' in text, so every match is a real tag.
+_TAG_RE = re.compile(rb"<(/?)(compounddef|memberdef)\b([^>]*)>")
+_ID_RE = re.compile(rb'\bid="([^"]*)"')
+_KIND_RE = re.compile(rb'\bkind="([^"]*)"')
+
+
+@dataclass(frozen=True)
+class ElementSpan:
+    refid: str
+    xml_file: str
+    start: int
+    end: int
+    tag: str
+    kind: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+def scan_element_spans(xml_file: str | Path) -> Iterator[ElementSpan]:
+    """
+    Streams the byte spans of every `<compounddef>` and `<memberdef>` in a Doxygen XML file.
+
+    The file is memory-mapped and scanned for start/end tags only (no XML
+    tree is built), so the cost is a single sequential pass at regex speed.
+    Nested elements (members inside a compound) get their own spans.
+    """
+    xml_file = str(xml_file)
+    with open(xml_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            stack: List[Tuple[bytes, int, Optional[str], Optional[str]]] = []
+            for match in _TAG_RE.finditer(data):
+                closing, tag, attrs = match.group(1), match.group(2), match.group(3)
+                if closing:
+                    if not stack or stack[-1][0] != tag:
+                        logger.warning(f"Unbalanced </{tag.decode()}> at byte {match.start()} in {xml_file}")
+                        continue
+                    _, start, refid, kind = stack.pop()
+                    if refid:
+                        yield ElementSpan(refid, xml_file, start, match.end(), tag.decode(), kind)
+                    continue
+                id_match, kind_match = _ID_RE.search(attrs), _KIND_RE.search(attrs)
+                refid = id_match.group(1).decode() if id_match else None
+                kind = kind_match.group(1).decode() if kind_match else None
+                if attrs.endswith(b"/"):
+                    if refid:
+                        yield ElementSpan(refid, xml_file, match.start(), match.end(), tag.decode(), kind)
+                    continue
+                stack.append((tag, match.start(), refid, kind))
+            if stack:
+                logger.warning(f"{len(stack)} unclosed elements in {xml_file}")
+
+
+def scan_refids(xml_file: str | Path) -> Set[str]:
+    """
+    The refids of every `<compounddef>`/`<memberdef>` start tag in a file, closed or not.
+
+    Unlike a parse, this also works on malformed or truncated (half-written) files.
+    """
+    with open(xml_file, "rb") as f:
+        data = f.read()
+    refids = set()
+    for match in _TAG_RE.finditer(data):
+        id_match = None if match.group(1) else _ID_RE.search(match.group(3))
+        if id_match:
+            refids.add(id_match.group(1).decode())
+    return refids
+
+
+class RefidOffsetIndex:
+    """
+    Persistent refid -> (XML file, byte span) index for loading single elements lazily.
+
+    Built once with a streaming scan of the XML output (re-scanning only files
+    whose mtime or size changed), it lets callers seek straight to one
+    `<compounddef>`/`<memberdef>` and parse just that fragment instead of the
+    whole file, so the cost of a lookup does not grow with the file size.
+
+    Usage:
+        with RefidOffsetIndex("offsets.db") as index:
+            index.build(Path("xml").glob("*.xml"))
+            element = index.load_element("classllvm_1_1Function")
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM elements").fetchone()[0]
+
+    def __contains__(self, refid: str) -> bool:
+        return self.lookup(refid) is not None
+
+    def build(self, xml_files: Iterable[str | Path]) -> int:
+        """
+        Indexes (or refreshes) the given XML files.
+
+        Files whose mtime and size match the recorded ones are skipped; each
+        re-scanned file replaces its previous rows in one transaction.
+
+        Returns:
+            The number of files scanned.
+        """
+        known = {path: (mtime, size) for path, mtime, size in self._conn.execute("SELECT * FROM xml_files")}
+        scanned = 0
+        for xml_file in map(str, xml_files):
+            try:
+                st = os.stat(xml_file)
+            except OSError as e:
+                logger.error(f"Cannot index {xml_file}: {e}")
+                continue
+            if known.get(xml_file) == (st.st_mtime_ns, st.st_size):
+                continue
+            rows = [(s.refid, s.xml_file, s.start, s.end, s.tag, s.kind) for s in scan_element_spans(xml_file)]
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM elements WHERE xml_file = ?", (xml_file,))
+                self._conn.executemany("INSERT OR REPLACE INTO elements VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO xml_files VALUES (?, ?, ?)", (xml_file, st.st_mtime_ns, st.st_size)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            scanned += 1
+        logger.info(f"Offset index: scanned {scanned} XML files; {len(self)} elements indexed.")
+        return scanned
+
+    def lookup(self, refid: str) -> Optional[ElementSpan]:
+        row = self._conn.execute(
+            "SELECT refid, xml_file, start, end, tag, kind FROM elements WHERE refid = ?", (refid,)
+        ).fetchone()
+        return ElementSpan(*row) if row else None
+
+    def read_fragment(self, refid: str) -> Optional[bytes]:
+        """
+        Returns the raw XML bytes of one element, or None if the refid is unknown.
+
+        If the XML file changed since it was indexed, it is re-scanned first.
+        """
+        span = self.lookup(refid)
+        if span is None:
+            return None
+        fragment = self._read_span(span)
+        if fragment is None:
+            logger.info(f"{span.xml_file} changed since it was indexed; re-scanning it.")
+            # Forget the recorded mtime/size so build() re-scans even if they still match.
+            self._conn.execute("DELETE FROM xml_files WHERE path = ?", (span.xml_file,))
+            self.build([span.xml_file])
+            span = self.lookup(refid)
+            fragment = self._read_span(span) if span else None
+        return fragment
+
+    def _read_span(self, span: ElementSpan) -> Optional[bytes]:
+        """The span's bytes, or None if the file changed since it was indexed or the span is stale."""
+        row = self._conn.execute("SELECT mtime_ns, size FROM xml_files WHERE path = ?", (span.xml_file,)).fetchone()
+        try:
+            with open(span.xml_file, "rb") as f:
+                st = os.fstat(f.fileno())
+                if row is None or tuple(row) != (st.st_mtime_ns, st.st_size):
+                    return None
+                f.seek(span.start)
+                fragment = f.read(span.size)
+        except OSError:
+            return None
+        # Also check the element itself, in case a rewrite kept the mtime and size.
+        start_tag = _TAG_RE.match(fragment)
+        if start_tag is None or start_tag.group(1) or start_tag.group(2) != span.tag.encode():
+            return None
+        id_match = _ID_RE.search(start_tag.group(3))
+        if id_match is None or id_match.group(1).decode() != span.refid:
+            return None
+        if fragment.endswith((f"</{span.tag}>".encode(), b"/>")):
+            return fragment
+        return None
+
+    def load_element(
+        self, refid: str, corpus: Optional[str] = None, version: Optional[str] = None
+    ) -> Optional[CodeElement]:
+        """
+        Parses only the fragment of `refid` into a CodeElement.
+
+        Returns None if the refid is unknown or its kind is not extracted by
+        the parser (see `parse_doxygen_fragment`).
+        """
+        fragment = self.read_fragment(refid)
+        if fragment is None:
+            return None
+        for element in parse_doxygen_fragment(fragment, corpus=corpus, version=version):
+            if element.id == refid:
+                return element
+        return None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RefidOffsetIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,4 @@
+from .hashing import HashingEmbedder
+from .openai_embedder import OpenAIEmbedder
+
+__all__ = ["HashingEmbedder", "OpenAIEmbedder"]
@@ -0,0 +1,40 @@
+# src/codiculum/embedding/hashing.py
+import math
+import re
+import zlib
+from typing import List
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Za-z][a-z0-9]*|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lower-case identifier parts (snake_case, camelCase and :: aware)."""
+    return [token.lower() for token in _TOKEN_RE.findall(text)]
+
+
+class HashingEmbedder:
+    """
+    Deterministic, dependency-free embedding stand-in using feature hashing.
+
+    Not a semantic model: texts sharing identifier tokens end up close. It lets
+    the indexing pipeline, the query service and the evaluation harness run
+    fully offline (tests, CI, local development) with the same interfaces as
+    the real embedding backend.
+    """
+
+    def __init__(self, dim: int = 256):
+        if dim <= 0:
+            raise ValueError("dim must be positive.")
+        self.dim = dim
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for token in tokenize(text):
+            # crc32 is stable across processes, unlike hash().
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else vector
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
@@ -0,0 +1,48 @@
+# src/codiculum/embedding/openai_embedder.py
+import logging
+from typing import List, Optional
+
+from .._lazy import import_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+class OpenAIEmbedder:
+    """
+    Async batch embedder backed by the OpenAI embeddings API.
+
+    One AsyncOpenAI client (and therefore one pooled HTTP connection pool) is
+    created on first use and shared by every call. The API key is read from
+    the `OPENAI_API_KEY` environment variable by the client.
+    """
+
+    def __init__(self, model: str = DEFAULT_EMBEDDING_MODEL, dimensions: Optional[int] = None, client=None):
+        """
+        Args:
+            model: The embedding model name.
+            dimensions: Optional output size (Matryoshka truncation done server-side).
+            client: An existing AsyncOpenAI client to reuse.
+        """
+        self.model = model
+        self.dimensions = dimensions
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            openai = import_backend("openai", "OpenAI embeddings")
+            self._client = openai.AsyncOpenAI()
+        return self._client
+
+    async def __call__(self, texts: List[str]) -> List[List[float]]:
+        kwargs = {"model": self.model, "input": texts}
+        if self.dimensions:
+            kwargs["dimensions"] = self.dimensions
+        response = await self.client.embeddings.create(**kwargs)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
@@ -0,0 +1,25 @@
+from .harness import (
+    EvalQuestion,
+    EvalReport,
+    Retriever,
+    VectorRetriever,
+    evaluate,
+    evaluate_retriever,
+    format_report,
+    generate_questions,
+    load_questions,
+    save_questions,
+)
+
+__all__ = [
+    "EvalQuestion",
+    "EvalReport",
+    "Retriever",
+    "VectorRetriever",
+    "evaluate",
+    "evaluate_retriever",
+    "format_report",
+    "generate_questions",
+    "load_questions",
+    "save_questions",
+]
@@ -0,0 +1,162 @@
+# src/codiculum/evaluation/harness.py
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Sequence
+
+from ..chunker.models import Chunk
+from ..chunker.summary import SUMMARY_KINDS
+from ..vector_store.store import QuantizedVectorStore
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+@dataclass
+class EvalQuestion:
+    question: str
+    expected_ids: List[str]
+
+
+@dataclass
+class EvalReport:
+    name: str
+    k: int
+    questions: int
+    recall_at_k: float
+    mrr: float
+    p50_ms: float
+    p95_ms: float
+    index_bytes: Optional[int] = None
+
+
+class Retriever(Protocol):
+    def search(self, query: str, k: int) -> List[str]:
+        """Returns the ids of the top-k chunks for the query."""
+        ...
+
+
+class VectorRetriever:
+    """Adapts a QuantizedVectorStore and an embedding function to the Retriever interface."""
+
+    def __init__(self, store: QuantizedVectorStore, embed_fn: EmbedFn, rescore: bool = True):
+        self.store = store
+        self.embed_fn = embed_fn
+        self.rescore = rescore
+
+    def search(self, query: str, k: int) -> List[str]:
+        embedding = self.embed_fn([query])[0]
+        return [result.id for result in self.store.search(embedding, k, rescore=self.rescore)]
+
+    def memory_bytes(self) -> int:
+        return self.store.memory_bytes()
+
+
+def generate_questions(chunks: Iterable[Chunk]) -> List[EvalQuestion]:
+    """
+    Builds (question, expected refids) pairs from chunk metadata.
+
+    For every element chunk this yields "Where is <name> defined?" and, when
+    the element has a brief description, "Which <kind> <brief>?", both
+    expecting the element's refid.
+    """
+    questions: List[EvalQuestion] = []
+    for chunk in chunks:
+        metadata = chunk.metadata
+        if metadata.get("kind") in SUMMARY_KINDS or not metadata.get("id") or not metadata.get("name"):
+            continue
+        expected = [metadata["id"]]
+        questions.append(EvalQuestion(f"Where is {metadata['name']} defined?", expected))
+        brief = (metadata.get("brief_description") or "").strip().rstrip(".")
+        if brief:
+            questions.append(EvalQuestion(f"Which {metadata.get('kind', 'element')} {brief[0].lower()}{brief[1:]}?", expected))
+    return questions
+
+
+def save_questions(questions: Sequence[EvalQuestion], path: str | Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for question in questions:
+            f.write(json.dumps(asdict(question)) + "\n")
+
+
+def load_questions(path: str | Path) -> List[EvalQuestion]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [EvalQuestion(**json.loads(line)) for line in f if line.strip()]
+
+
+def _percentile(sorted_values: Sequence[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def evaluate_retriever(name: str, retriever: Retriever, questions: Sequence[EvalQuestion], k: int = 10) -> EvalReport:
+    """
+    Runs every question through one retriever and scores the results.
+
+    recall@k is the fraction of expected ids found in the top k; MRR uses
+    the rank of the first expected id (0 when none is retrieved).
+    """
+    hits = expected_total = 0
+    reciprocal_ranks = 0.0
+    latencies: List[float] = []
+    for question in questions:
+        start = time.perf_counter()
+        retrieved = retriever.search(question.question, k)
+        latencies.append(time.perf_counter() - start)
+
+        expected = set(question.expected_ids)
+        expected_total += len(expected)
+        hits += len(expected & set(retrieved[:k]))
+        rank = next((i for i, item_id in enumerate(retrieved[:k], start=1) if item_id in expected), None)
+        reciprocal_ranks += 1 / rank if rank else 0.0
+
+    latencies.sort()
+    memory_bytes = getattr(retriever, "memory_bytes", None)
+    return EvalReport(
+        name=name,
+        k=k,
+        questions=len(questions),
+        recall_at_k=hits / expected_total if expected_total else 0.0,
+        mrr=reciprocal_ranks / len(questions) if questions else 0.0,
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p95_ms=_percentile(latencies, 95) * 1000,
+        index_bytes=memory_bytes() if callable(memory_bytes) else None,
+    )
+
+
+def evaluate(retrievers: Dict[str, Retriever], questions: Sequence[EvalQuestion], k: int = 10) -> List[EvalReport]:
+    """Evaluates several retrieval backends/configurations on the same question set."""
+    reports = []
+    for name, retriever in retrievers.items():
+        report = evaluate_retriever(name, retriever, questions, k)
+        logger.info(f"{name}: recall@{k}={report.recall_at_k:.3f} mrr={report.mrr:.3f} p95={report.p95_ms:.2f}ms")
+        reports.append(report)
+    return reports
+
+
+def format_report(reports: Sequence[EvalReport]) -> str:
+    """Renders reports as a side-by-side text table."""
+    if not reports:
+        return "No results."
+    k = reports[0].k
+    header = ["config", f"recall@{k}", "MRR", "p50 ms", "p95 ms", "index MB"]
+    rows = [
+        [
+            r.name,
+            f"{r.recall_at_k:.3f}",
+            f"{r.mrr:.3f}",
+            f"{r.p50_ms:.2f}",
+            f"{r.p95_ms:.2f}",
+            f"{r.index_bytes / 1e6:.2f}" if r.index_bytes is not None else "-",
+        ]
+        for r in reports
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in [header] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
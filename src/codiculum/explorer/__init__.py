@@ -0,0 +1,4 @@
+from .source_view import LineIndex, SourceWindow, get_source_window
+from .symbol_index import Symbol, SymbolIndex
+
+__all__ = ["LineIndex", "SourceWindow", "Symbol", "SymbolIndex", "get_source_window"]
@@ -0,0 +1,149 @@
+# src/codiculum/explorer/source_view.py
+import logging
+import os
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 200
+_READ_BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class SourceWindow:
+    file_path: str
+    start_line: int  # 1-based, inclusive
+    end_line: int  # 1-based, inclusive
+    total_lines: int
+    lines: List[str]
+
+    @property
+    def has_previous(self) -> bool:
+        return self.start_line > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.end_line < self.total_lines
+
+    def numbered_text(self) -> str:
+        """Returns the window text prefixed with the real file line numbers."""
+        width = len(str(self.end_line))
+        return "\n".join(
+            f"{number:>{width}}  {line}" for number, line in enumerate(self.lines, start=self.start_line)
+        )
+
+
+class LineIndex:
+    """Byte offsets of every line start in a file, so any line range can be read with one seek."""
+
+    def __init__(self, file_path: str | Path):
+        self.file_path = Path(file_path)
+        offsets = array("Q", [0])
+        position = 0
+        with open(self.file_path, "rb") as f:
+            while True:
+                block = f.read(_READ_BLOCK_SIZE)
+                if not block:
+                    break
+                newline = block.find(b"\n")
+                while newline != -1:
+                    offsets.append(position + newline + 1)
+                    newline = block.find(b"\n", newline + 1)
+                position += len(block)
+        # Drop the phantom empty line after a trailing newline.
+        if len(offsets) > 1 and offsets[-1] == position:
+            offsets.pop()
+        self._offsets = offsets
+        self._size = position
+
+    @property
+    def line_count(self) -> int:
+        return len(self._offsets) if self._size else 0
+
+    def read_lines(self, start_line: int, end_line: int) -> List[str]:
+        """
+        Reads a range of lines without loading the rest of the file.
+
+        Args:
+            start_line: The 1-based first line (inclusive).
+            end_line: The 1-based last line (inclusive); clamped to the file length.
+
+        Returns:
+            The lines, without trailing newlines.
+        """
+        if start_line <= 0 or end_line < start_line:
+            raise ValueError(f"Invalid line range: {start_line}-{end_line}")
+        end_line = min(end_line, self.line_count)
+        if start_line > end_line:
+            return []
+        start_offset = self._offsets[start_line - 1]
+        end_offset = self._offsets[end_line] if end_line < len(self._offsets) else self._size
+        with open(self.file_path, "rb") as f:
+            f.seek(start_offset)
+            data = f.read(end_offset - start_offset)
+        lines = data.decode("utf-8", errors="ignore").split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+
+@lru_cache(maxsize=64)
+def _cached_line_index(file_path: str, mtime_ns: int, size: int) -> LineIndex:
+    # mtime/size are part of the cache key so edited files are re-indexed.
+    return LineIndex(file_path)
+
+
+def get_line_index(file_path: str | Path) -> LineIndex:
+    """Returns a (cached) LineIndex for the file."""
+    stat = os.stat(file_path)
+    return _cached_line_index(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def get_source_window(
+    file_path: str | Path,
+    start_line: int,
+    end_line: int,
+    page_offset: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> SourceWindow:
+    """
+    Returns a page of source lines around a chunk's line range.
+
+    Page 0 is centered on `start_line`..`end_line` (or starts at
+    `start_line` if the range is longer than a page); each step of
+    `page_offset` moves the window by one page up (-) or down (+).
+
+    Args:
+        file_path: Path to the source file.
+        start_line: 1-based first line of the chunk.
+        end_line: 1-based last line of the chunk.
+        page_offset: Number of pages to move from the centered window.
+        page_size: Number of lines per page.
+
+    Returns:
+        A SourceWindow with the requested lines.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive.")
+    index = get_line_index(file_path)
+    total = index.line_count
+
+    span = max(end_line - start_line + 1, 1)
+    first = start_line - max((page_size - span) // 2, 0) + page_offset * page_size
+    first = max(1, min(first, max(total - page_size + 1, 1)))
+    last = min(first + page_size - 1, total)
+    lines = index.read_lines(first, last) if total else []
+    return SourceWindow(
+        file_path=str(file_path),
+        start_line=first,
+        end_line=max(last, first),
+        total_lines=total,
+        lines=lines,
+    )
@@ -0,0 +1,180 @@
+# src/codiculum/explorer/symbol_index.py
+import logging
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from lxml import etree
+
+from ..doxygen_parser.models import CodeElement
+
+logger = logging.getLogger(__name__)
+
+_GRAM_SIZE = 3
+# Fuzzy matching only scores candidates drawn from the rarest query n-grams,
+# so very common n-grams ("get", "ion") never force a scan of huge posting lists.
+_MAX_FUZZY_CANDIDATES = 5000
+_PREFIX_WINDOW_FACTOR = 8
+
+
+@dataclass(frozen=True)
+class Symbol:
+    name: str  # Qualified name, e.g. 'llvm::Function::getEntryBlock'
+    kind: str
+    refid: str
+    compound_refid: str  # Id of the compound (and XML file stem) that defines the symbol
+
+    @property
+    def xml_file_name(self) -> str:
+        return f"{self.compound_refid}.xml"
+
+
+def _short_name(name: str) -> str:
+    return name.rsplit("::", 1)[-1]
+
+
+def _ngrams(text: str) -> Set[str]:
+    text = text.lower()
+    if len(text) < _GRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + _GRAM_SIZE] for i in range(len(text) - _GRAM_SIZE + 1)}
+
+
+class SymbolIndex:
+    """
+    In-memory typeahead index over code element names.
+
+    Prefix lookups use a sorted key list (binary search), matching both the
+    qualified name and every '::' suffix of it, so 'Function' and
+    'llvm::Func' both find 'llvm::Function'. When prefix matches are not
+    enough, an n-gram index over the unqualified names fills the remaining
+    slots with fuzzy matches.
+    """
+
+    def __init__(self, symbols: Iterable[Symbol]):
+        self._symbols: List[Symbol] = list(symbols)
+
+        keys: List[Tuple[str, int]] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for symbol_id, symbol in enumerate(self._symbols):
+            parts = symbol.name.lower().split("::")
+            for i in range(len(parts)):
+                keys.append(("::".join(parts[i:]), symbol_id))
+            for gram in _ngrams(_short_name(symbol.name)):
+                postings[gram].append(symbol_id)
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._key_ids = array("I", (symbol_id for _, symbol_id in keys))
+        self._postings = {gram: array("I", ids) for gram, ids in postings.items()}
+        logger.info(f"Built symbol index with {len(self._symbols)} symbols and {len(self._postings)} n-grams.")
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    @classmethod
+    def from_elements(cls, elements: Iterable[CodeElement]) -> "SymbolIndex":
+        """Builds an index from parsed CodeElements (each is its own compound)."""
+        return cls(Symbol(e.name, e.kind, e.id, e.id) for e in elements)
+
+    @classmethod
+    def from_doxygen_index(cls, index_xml_path: str | Path, kinds: Optional[Set[str]] = None) -> "SymbolIndex":
+        """
+        Builds an index from Doxygen's `index.xml`, which lists every compound
+        and member of the corpus without having to parse each compound file.
+
+        Args:
+            index_xml_path: Path to the Doxygen `index.xml` file.
+            kinds: If given, only compounds/members of these kinds are indexed.
+
+        Returns:
+            A SymbolIndex over all listed symbols.
+        """
+        symbols: List[Symbol] = []
+        for _, compound in etree.iterparse(str(index_xml_path), events=("end",), tag="compound"):
+            compound_refid = compound.get("refid")
+            compound_name = compound.findtext("name") or ""
+            compound_kind = compound.get("kind") or ""
+            if compound_refid and compound_name and (kinds is None or compound_kind in kinds):
+                symbols.append(Symbol(compound_name, compound_kind, compound_refid, compound_refid))
+            for member in compound.iterfind("member"):
+                member_kind = member.get("kind") or ""
+                member_name = member.findtext("name") or ""
+                if not member_name or (kinds is not None and member_kind not in kinds):
+                    continue
+                # Members of files are not scoped by the file name.
+                if compound_kind in ("class", "struct", "union", "namespace"):
+                    member_name = f"{compound_name}::{member_name}"
+                symbols.append(Symbol(member_name, member_kind, member.get("refid"), compound_refid))
+            compound.clear()
+        return cls(symbols)
+
+    def _prefix_matches(self, query: str, limit: int) -> List[int]:
+        # Scan a bounded window of the sorted keys and rank it by key length,
+        # so exact and short matches beat long member names with the same prefix.
+        window: List[Tuple[int, str, int]] = []
+        position = bisect_left(self._keys, query)
+        while position < len(self._keys) and len(window) < limit * _PREFIX_WINDOW_FACTOR:
+            key = self._keys[position]
+            if not key.startswith(query):
+                break
+            window.append((len(key), key, self._key_ids[position]))
+            position += 1
+        window.sort()
+
+        matches: List[int] = []
+        seen: Set[int] = set()
+        for _, _, symbol_id in window:
+            if symbol_id not in seen:
+                seen.add(symbol_id)
+                matches.append(symbol_id)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def _fuzzy_matches(self, query: str, exclude: Set[int], limit: int) -> List[int]:
+        query_grams = _ngrams(query)
+        known = sorted((g for g in query_grams if g in self._postings), key=lambda g: len(self._postings[g]))
+        if not known:
+            return []
+        candidates: Set[int] = set()
+        for gram in known:
+            posting = self._postings[gram]
+            if candidates and len(candidates) + len(posting) > _MAX_FUZZY_CANDIDATES:
+                break
+            candidates.update(posting[:_MAX_FUZZY_CANDIDATES])
+
+        scored = []
+        for symbol_id in candidates:
+            if symbol_id in exclude:
+                continue
+            grams = _ngrams(_short_name(self._symbols[symbol_id].name))
+            overlap = len(query_grams & grams)
+            scored.append((-overlap / len(query_grams | grams), self._symbols[symbol_id].name, symbol_id))
+        scored.sort()
+        return [symbol_id for _, _, symbol_id in scored[:limit]]
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Symbol]:
+        """
+        Returns up to `limit` symbols matching the query.
+
+        Prefix matches come first (shortest match first), followed by fuzzy
+        n-gram matches ranked by similarity.
+
+        Args:
+            query: The text typed by the user (case-insensitive).
+            limit: Maximum number of results.
+            fuzzy: Whether to fill remaining slots with fuzzy matches.
+
+        Returns:
+            A list of matching Symbol objects.
+        """
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+        matches = self._prefix_matches(query, limit)
+        if fuzzy and len(matches) < limit:
+            matches.extend(self._fuzzy_matches(_short_name(query), set(matches), limit - len(matches)))
+        return [self._symbols[symbol_id] for symbol_id in matches]
@@ -0,0 +1,61 @@
+from .checkpoint import IndexCheckpoint
+from .compaction import (
+    CompactionReport,
+    compact_chunk_file,
+    compact_index,
+    find_stale_ids,
+    live_chunk_ids,
+    random_queries,
+)
+from .corpora import CorpusVersion, load_corpora
+from .includes import IncludeGraph
+from .importance import order_by_importance, reference_counts_from_sqlite, reference_counts_from_xml
+from .memory import MemoryGovernor, ThrottleEvent, approx_size, current_rss, parse_size
+from .pipeline import BuildStats, ChunkSink, build_index
+from .sharding import ShardManifest, build_shard, merge_shards, parse_shard_spec, select_shard, shard_for
+from .watch import (
+    IncrementalIndexer,
+    InotifyWatcher,
+    PollingWatcher,
+    UpdateStats,
+    create_watcher,
+    wait_for_changes,
+    watch,
+)
+
+__all__ = [
+    "IndexCheckpoint",
+    "CompactionReport",
+    "compact_chunk_file",
+    "compact_index",
+    "find_stale_ids",
+    "live_chunk_ids",
+    "random_queries",
+    "CorpusVersion",
+    "load_corpora",
+    "IncludeGraph",
+    "MemoryGovernor",
+    "ThrottleEvent",
+    "approx_size",
+    "current_rss",
+    "parse_size",
+    "BuildStats",
+    "ChunkSink",
+    "build_index",
+    "ShardManifest",
+    "build_shard",
+    "merge_shards",
+    "parse_shard_spec",
+    "select_shard",
+    "shard_for",
+    "order_by_importance",
+    "reference_counts_from_sqlite",
+    "reference_counts_from_xml",
+    "IncrementalIndexer",
+    "InotifyWatcher",
+    "PollingWatcher",
+    "UpdateStats",
+    "create_watcher",
+    "wait_for_changes",
+    "watch",
+]
@@ -0,0 +1,125 @@
+# src/codiculum/indexing/checkpoint.py
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Set, Tuple
+
+from ..chunker.models import Chunk
+
+logger = logging.getLogger(__name__)
+
+# (corpus, version, id): the same refid in two corpus versions is a different chunk.
+ChunkKey = Tuple[str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_files (
+    path        TEXT PRIMARY KEY NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stored_chunks (
+    corpus      TEXT NOT NULL DEFAULT '',
+    version     TEXT NOT NULL DEFAULT '',
+    id          TEXT NOT NULL,
+    xml_file    TEXT NOT NULL,
+    PRIMARY KEY (corpus, version, id)
+);
+"""
+
+# Checkpoints written before chunks were keyed by corpus version held ids only.
+_MIGRATE_UNVERSIONED = """
+ALTER TABLE stored_chunks RENAME TO stored_chunks_unversioned;
+CREATE TABLE stored_chunks (
+    corpus      TEXT NOT NULL DEFAULT '',
+    version     TEXT NOT NULL DEFAULT '',
+    id          TEXT NOT NULL,
+    xml_file    TEXT NOT NULL,
+    PRIMARY KEY (corpus, version, id)
+);
+INSERT INTO stored_chunks (id, xml_file) SELECT id, xml_file FROM stored_chunks_unversioned;
+DROP TABLE stored_chunks_unversioned;
+"""
+
+
+def chunk_key(chunk: Chunk) -> ChunkKey:
+    """The identity of a chunk across corpora and versions."""
+    metadata = chunk.metadata
+    return metadata.get("corpus") or "", metadata.get("version") or "", metadata["id"]
+
+
+class IndexCheckpoint:
+    """
+    Durable progress record for an index build (parse -> chunk -> embed -> store).
+
+    Progress is kept in a small SQLite database: the XML files that were fully
+    processed and the (corpus, version, id) keys of the chunks whose
+    embeddings were stored. Each
+    batch is committed in a single transaction, so after a crash the
+    checkpoint reflects exactly the batches that completed and a restarted
+    build loses at most the batch that was in flight.
+    """
+
+    def __init__(self, db_path: str | Path):
+        """
+        Opens (or creates) a checkpoint database.
+
+        Args:
+            db_path: Path to the SQLite checkpoint file.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; transactions are managed explicitly in commit_batch.
+        self._conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(stored_chunks)")}
+        if "corpus" not in columns:
+            self._conn.executescript(f"BEGIN IMMEDIATE;{_MIGRATE_UNVERSIONED}COMMIT;")
+
+    def processed_files(self) -> Set[str]:
+        """Returns the XML files that were fully processed."""
+        return {row[0] for row in self._conn.execute("SELECT path FROM processed_files")}
+
+    def stored_chunk_ids(self) -> Set[ChunkKey]:
+        """Returns the (corpus, version, id) keys of chunks whose embeddings were stored (see `chunk_key`)."""
+        return {tuple(row) for row in self._conn.execute("SELECT corpus, version, id FROM stored_chunks")}
+
+    def commit_batch(self, chunk_ids: Iterable[Tuple[ChunkKey, str]], completed_files: Iterable[str]) -> None:
+        """
+        Atomically records a finished batch.
+
+        Args:
+            chunk_ids: (chunk key, source XML file) pairs whose embeddings were stored.
+            completed_files: XML files all of whose chunks are now stored.
+        """
+        chunk_rows = list(chunk_ids)
+        file_rows = [(str(path),) for path in completed_files]
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO stored_chunks (corpus, version, id, xml_file) VALUES (?, ?, ?, ?)",
+                [(*key, str(xml_file)) for key, xml_file in chunk_rows],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO processed_files (path) VALUES (?)", file_rows
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        logger.debug(f"Checkpoint committed {len(chunk_rows)} chunks and {len(file_rows)} files.")
+
+    def reset(self) -> None:
+        """Clears all recorded progress."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute("DELETE FROM stored_chunks")
+        self._conn.execute("DELETE FROM processed_files")
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "IndexCheckpoint":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
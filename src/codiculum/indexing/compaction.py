@@ -0,0 +1,210 @@
+# src/codiculum/indexing/compaction.py
+import logging
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set
+
+from ..chunker.code_chunker import CodeChunker
+from ..chunker.doc_store import CompressedChunkStore
+from ..chunker.export import ChunkWriter, read_chunk_batches
+from ..doxygen_parser.doxygen_parser import read_doxygen_xml_file
+from ..doxygen_parser.offset_index import scan_refids
+from ..vector_store.store import QuantizedVectorStore
+from .pipeline import ParseFn
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompactionReport:
+    stored_before: int
+    stale: int
+    stored_after: int
+    slots_reclaimed: int
+    memory_bytes_before: int
+    memory_bytes_after: int
+    disk_bytes_reclaimed: int  # re-scoring file and chunk stores
+    latency_before_ms: Optional[float] = None  # median search latency
+    latency_after_ms: Optional[float] = None
+    chunk_store_stale: int = 0  # records purged from the chunk stores
+
+    def __str__(self) -> str:
+        text = f"Purged {self.stale}/{self.stored_before} stale chunks ({self.stored_after} remain)"
+        if self.chunk_store_stale:
+            text += f" and {self.chunk_store_stale} chunk store records"
+        text += (
+            f"; reclaimed {self.slots_reclaimed} slots, "
+            f"{self.memory_bytes_before - self.memory_bytes_after} index bytes, {self.disk_bytes_reclaimed} disk bytes"
+        )
+        if self.latency_before_ms is not None and self.latency_after_ms is not None:
+            text += f"; search latency {self.latency_before_ms:.2f} ms -> {self.latency_after_ms:.2f} ms"
+        return text
+
+
+def live_chunk_ids(
+    xml_files: Iterable[str | Path], chunker: CodeChunker, parse_fn: ParseFn = read_doxygen_xml_file
+) -> Set[str]:
+    """
+    The ids that must survive a compaction against the current XML output.
+
+    These are the chunk ids the output produces (texts are built but not
+    embedded) and the ids of all parsed elements, so chunks of elements the
+    chunker skips (e.g. an unreadable source file) are kept. A file that
+    fails to parse keeps every refid its start tags still name: a bad
+    or half-written file must not make its chunks look stale. `parse_fn`
+    must raise on failure (unlike `parse_doxygen_xml_file`, which returns []).
+    """
+    ids: Set[str] = set()
+    for xml_file in map(str, xml_files):
+        try:
+            elements = parse_fn(xml_file)
+        except Exception as e:
+            try:
+                kept = scan_refids(xml_file)
+            except OSError:
+                kept = set()
+            logger.warning(f"Cannot parse {xml_file} ({e}); keeping the {len(kept)} refids it mentions.")
+            ids.update(kept)
+            continue
+        ids.update(element.id for element in elements)
+        ids.update(chunk.metadata["id"] for chunk in chunker.chunk(elements))
+    return ids
+
+
+def find_stale_ids(
+    stored_ids: Iterable[str], live_ids: Set[str], max_stale_fraction: float = 0.5, source: str = "stored chunks"
+) -> List[str]:
+    """
+    The ids of `stored_ids` missing from `live_ids`.
+
+    Raises:
+        ValueError: If more than `max_stale_fraction` of `stored_ids` are stale,
+            which usually means the parse failed or covered the wrong files.
+    """
+    stored_ids = list(stored_ids)
+    stale = [item_id for item_id in stored_ids if item_id not in live_ids]
+    if stored_ids and len(stale) > max_stale_fraction * len(stored_ids):
+        raise ValueError(
+            f"{len(stale)} of {len(stored_ids)} {source} are missing from the current parse; "
+            f"refusing to purge more than {max_stale_fraction:.0%} (raise max_stale_fraction to force)."
+        )
+    return stale
+
+
+def random_queries(dim: int, n: int = 20, seed: int = 0) -> List[List[float]]:
+    """Deterministic random query vectors for latency measurements."""
+    rng = random.Random(seed)
+    return [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(n)]
+
+
+def _median_latency_ms(store: QuantizedVectorStore, queries: Sequence[Sequence[float]], k: int) -> Optional[float]:
+    if not queries or not len(store):
+        return None
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        store.search(query, k)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def compact_index(
+    store: QuantizedVectorStore,
+    live_ids: Iterable[str],
+    chunk_stores: Sequence[CompressedChunkStore] = (),
+    queries: Optional[Sequence[Sequence[float]]] = None,
+    k: int = 10,
+    max_stale_fraction: float = 0.5,
+) -> CompactionReport:
+    """
+    Purges every stored id missing from `live_ids` and compacts the store.
+
+    Stale ids are deleted from the vector store and the chunk stores in bulk
+    (tombstoned: searches skip them at once), then the store's slot arrays and
+    re-scoring file are rebuilt and the chunk stores vacuumed. Each chunk
+    store is diffed against `live_ids` on its own ids, so records it holds
+    without a vector are purged too. Search latency is measured before and
+    after on `queries` (random vectors by default).
+
+    Args:
+        store: The vector store to compact.
+        live_ids: Chunk ids of the current parse (see `live_chunk_ids`).
+        chunk_stores: Chunk stores to purge alongside the vectors.
+        queries: Query embeddings for the latency measurement.
+        k: Number of results of the measured searches.
+        max_stale_fraction: Refuse to purge more than this fraction of the
+            store or of any chunk store, which usually means the parse failed
+            or covered the wrong files.
+
+    Returns:
+        A CompactionReport.
+
+    Raises:
+        ValueError: If a stale fraction exceeds `max_stale_fraction` (nothing is purged).
+    """
+    live = set(live_ids)
+    stored_ids = store.ids()
+    stale = find_stale_ids(stored_ids, live, max_stale_fraction, "stored vectors")
+    chunk_store_stale = [
+        find_stale_ids(chunk_store.ids(), live, max_stale_fraction, f"chunks of {chunk_store.path}")
+        for chunk_store in chunk_stores
+    ]
+    if queries is None and store.dim:
+        queries = random_queries(store.dim)
+
+    latency_before = _median_latency_ms(store, queries, k)
+    memory_before = store.memory_bytes()
+
+    store.delete(stale)
+    reclaimed = store.compact()
+    disk_reclaimed = reclaimed["disk_bytes"]
+    for chunk_store, chunk_stale in zip(chunk_stores, chunk_store_stale):
+        chunk_store.delete(chunk_stale)
+        disk_reclaimed += chunk_store.compact()
+
+    report = CompactionReport(
+        stored_before=len(stored_ids),
+        stale=len(stale),
+        stored_after=len(store),
+        slots_reclaimed=reclaimed["slots"],
+        memory_bytes_before=memory_before,
+        memory_bytes_after=store.memory_bytes(),
+        disk_bytes_reclaimed=disk_reclaimed,
+        latency_before_ms=latency_before,
+        latency_after_ms=_median_latency_ms(store, queries, k),
+        chunk_store_stale=sum(map(len, chunk_store_stale)),
+    )
+    logger.info(f"Compaction: {report}")
+    return report
+
+
+def compact_chunk_file(path: str | Path, live_ids: Iterable[str], output: Optional[str | Path] = None) -> int:
+    """
+    Rewrites an exported chunk file without chunks missing from `live_ids`.
+
+    Args:
+        path: The chunk file (.jsonl/.arrow/.parquet).
+        live_ids: Chunk ids of the current parse.
+        output: Destination; the file is replaced in place if omitted.
+
+    Returns:
+        The number of chunks dropped.
+    """
+    path = Path(path)
+    live = set(live_ids)
+    output = Path(output) if output else path
+    tmp_path = output.with_name(f"{output.stem}.compacting{output.suffix}")
+    dropped = 0
+    with ChunkWriter(tmp_path) as writer:
+        for chunks, embeddings in read_chunk_batches(path):
+            keep = [i for i, chunk in enumerate(chunks) if chunk.metadata["id"] in live]
+            dropped += len(chunks) - len(keep)
+            if keep:
+                writer.write_batch(
+                    [chunks[i] for i in keep], [embeddings[i] for i in keep] if embeddings is not None else None
+                )
+    tmp_path.replace(output)
+    return dropped
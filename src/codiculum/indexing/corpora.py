@@ -0,0 +1,55 @@
+# src/codiculum/indexing/corpora.py
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CorpusVersion:
+    """One indexed source tree: a corpus (repository) at a given version, with its Doxygen XML output."""
+
+    corpus: str
+    version: str
+    src_base: Path
+    xml_dir: Path
+
+    @property
+    def key(self) -> str:
+        return f"{self.corpus}@{self.version}"
+
+
+def load_corpora(config_path: str | Path) -> List[CorpusVersion]:
+    """
+    Loads the served corpora from a JSON file.
+
+    The file holds a list of objects with "corpus", "version", "src_base" and
+    optionally "xml_dir" (default: `<src_base>/output/xml`). Relative paths
+    are resolved against the config file's directory:
+
+        [{"corpus": "llvm-project", "version": "18.x", "src_base": "llvm-18"},
+         {"corpus": "llvm-project", "version": "19.x", "src_base": "llvm-19"}]
+
+    Raises:
+        ValueError: If an entry is incomplete or a corpus@version appears twice.
+    """
+    config_path = Path(config_path)
+    root = config_path.parent
+    corpora: List[CorpusVersion] = []
+    for entry in json.loads(config_path.read_text(encoding="utf-8")):
+        missing = [key for key in ("corpus", "version", "src_base") if not entry.get(key)]
+        if missing:
+            raise ValueError(f"Corpus entry {entry} in {config_path} is missing {missing}.")
+        src_base = root / entry["src_base"]
+        xml_dir = root / entry["xml_dir"] if entry.get("xml_dir") else src_base / "output" / "xml"
+        corpora.append(CorpusVersion(entry["corpus"], str(entry["version"]), src_base, xml_dir))
+
+    keys = [corpus.key for corpus in corpora]
+    duplicates = sorted({key for key in keys if keys.count(key) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate corpus versions in {config_path}: {duplicates}")
+    logger.info(f"Loaded {len(corpora)} corpus versions from {config_path}.")
+    return corpora
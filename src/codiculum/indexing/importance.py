@@ -0,0 +1,109 @@
+# src/codiculum/indexing/importance.py
+import logging
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Doxygen member ids are '<compound id>_1' followed by an anchor of 'a' + md5 hex.
+_MEMBER_ID_RE = re.compile(r"^(?P<compound>.+)_1a[0-9a-f]{32}$")
+
+_SQLITE_IN_DEGREE = """
+SELECT refid.refid, SUM(indeg.n)
+FROM (
+    SELECT dst_rowid AS target, COUNT(DISTINCT src_rowid) AS n FROM xrefs GROUP BY dst_rowid
+    UNION ALL
+    SELECT base_rowid AS target, COUNT(*) AS n FROM compoundref GROUP BY base_rowid
+) AS indeg
+JOIN refid ON refid.rowid = indeg.target
+GROUP BY indeg.target
+"""
+
+
+def compound_id(refid: str) -> str:
+    """Maps a member refid to the id of its enclosing compound; compound ids map to themselves."""
+    match = _MEMBER_ID_RE.match(refid)
+    return match.group("compound") if match else refid
+
+
+def reference_counts_from_sqlite(db_path: str | Path) -> Dict[str, int]:
+    """
+    Computes the reference in-degree of every refid from Doxygen's SQLite output.
+
+    Counts distinct referrers in `xrefs` plus the number of derived classes
+    recorded in `compoundref` (see setup/schema_dump.sql).
+
+    Args:
+        db_path: Path to the Doxygen `doxygen_sqlite3.db` file.
+
+    Returns:
+        A mapping of refid to its in-degree. Unreferenced ids are omitted.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        counts = {refid: int(n) for refid, n in conn.execute(_SQLITE_IN_DEGREE)}
+    finally:
+        conn.close()
+    logger.info(f"Loaded reference counts for {len(counts)} refids from {db_path}")
+    return counts
+
+
+def reference_counts_from_xml(xml_files: Iterable[str | Path]) -> Dict[str, int]:
+    """
+    Computes the reference in-degree of every refid from Doxygen XML files.
+
+    Uses `<referencedby>` entries of each `<memberdef>` and
+    `<derivedcompoundref>` entries of each `<compounddef>`. Files are
+    streamed with iterparse so large files are not held in memory.
+
+    Args:
+        xml_files: Doxygen XML files to scan.
+
+    Returns:
+        A mapping of refid to its in-degree. Unreferenced ids are omitted.
+    """
+    counts: Counter = Counter()
+    for xml_file in xml_files:
+        try:
+            for _, element in etree.iterparse(str(xml_file), events=("end",), tag=("memberdef", "compounddef")):
+                element_id = element.get("id")
+                if element_id:
+                    if element.tag == "memberdef":
+                        n = len(element.findall("referencedby"))
+                    else:
+                        n = len(element.findall("derivedcompoundref"))
+                    if n:
+                        counts[element_id] += n
+                element.clear()
+        except (etree.XMLSyntaxError, OSError) as e:
+            logger.error(f"Could not scan references in {xml_file}: {e}")
+    return dict(counts)
+
+
+def order_by_importance(xml_files: Iterable[str | Path], counts: Dict[str, int]) -> List[str]:
+    """
+    Orders Doxygen XML files so the most-referenced compounds come first.
+
+    Doxygen writes one XML file per compound, named after its refid, so a
+    file's score is the in-degree of the compound plus that of its members.
+    Files with equal scores keep their input order.
+
+    Args:
+        xml_files: Doxygen XML files to schedule.
+        counts: Refid in-degrees from reference_counts_from_sqlite or
+                reference_counts_from_xml.
+
+    Returns:
+        The XML file paths sorted by descending score.
+    """
+    compound_scores: Counter = Counter()
+    for refid, n in counts.items():
+        compound_scores[compound_id(refid)] += n
+
+    files = [str(xml_file) for xml_file in xml_files]
+    return sorted(files, key=lambda path: -compound_scores.get(Path(path).stem, 0))
@@ -0,0 +1,193 @@
+# src/codiculum/indexing/includes.py
+import logging
+import sqlite3
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+_SQLITE_INCLUDES = """
+SELECT src.name, dst.name, dst.found
+FROM includes
+JOIN path AS src ON src.rowid = includes.src_id
+JOIN path AS dst ON dst.rowid = includes.dst_id
+ORDER BY includes.rowid
+"""
+
+
+def _sqlite_spelling(path: str, include_roots: Sequence[str]) -> str:
+    """
+    The #include spelling of a resolved file path: relative to the longest
+    matching include root, else to its innermost `include` directory, else
+    its file name.
+    """
+    for root in sorted((root.rstrip("/") + "/" for root in include_roots), key=len, reverse=True):
+        if path.startswith(root):
+            return path[len(root):]
+    parts = PurePosixPath(path).parts
+    if "include" in parts[:-1]:
+        return "/".join(parts[len(parts) - parts[::-1].index("include"):])
+    return PurePosixPath(path).name
+
+
+class IncludeGraph:
+    """
+    File-level #include graph with memoized transitive closures.
+
+    Nodes are file paths as Doxygen records them (the `file` attribute of
+    `<location>`, i.e. the `file_path` chunk metadata); includes that Doxygen
+    could not resolve (system headers) are leaf nodes named as written.
+
+    The graph is built once per index run; `closure` and `minimal_includes`
+    are cached per file (LRU, `cache_size` entries), so attaching includes to
+    every chunk of a file costs one graph walk for the first chunk and a
+    dictionary lookup afterwards. `max_depth` bounds the walk for very deep
+    include chains.
+    """
+
+    def __init__(
+        self,
+        edges: Dict[str, Iterable[str]],
+        spellings: Optional[Dict[str, str]] = None,
+        max_depth: Optional[int] = None,
+        cache_size: int = 65536,
+    ):
+        """
+        Args:
+            edges: Map of including file -> directly included files, in include order.
+            spellings: Map of file -> the spelling used in #include directives
+                       (e.g. "llvm/IR/Value.h"); defaults to the node name.
+            max_depth: Maximum include depth followed by `closure` (None: unbounded).
+            cache_size: Number of files whose closure and minimal include set are cached.
+        """
+        self._edges: Dict[str, Tuple[str, ...]] = {
+            src: tuple(dict.fromkeys(dst for dst in dsts if dst != src)) for src, dsts in edges.items()
+        }
+        self._spellings = spellings or {}
+        self.max_depth = max_depth
+        self.closure = lru_cache(maxsize=cache_size)(self._closure)
+        self.minimal_includes = lru_cache(maxsize=cache_size)(self._minimal_includes)
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._edges
+
+    def direct(self, file_path: str) -> Tuple[str, ...]:
+        """Files directly included by `file_path`, in include order."""
+        return self._edges.get(file_path, ())
+
+    def spelling(self, file_path: str) -> str:
+        return self._spellings.get(file_path, file_path)
+
+    def _closure(self, file_path: str) -> FrozenSet[str]:
+        """All files reachable from `file_path` (excluding itself) within `max_depth` levels."""
+        seen: Set[str] = set()
+        frontier = list(self.direct(file_path))
+        depth = 1
+        while frontier and (self.max_depth is None or depth <= self.max_depth):
+            next_frontier: List[str] = []
+            for included in frontier:
+                if included in seen or included == file_path:
+                    continue
+                seen.add(included)
+                next_frontier.extend(self.direct(included))
+            frontier = next_frontier
+            depth += 1
+        return frozenset(seen)
+
+    def _minimal_includes(self, file_path: str) -> Tuple[str, ...]:
+        """
+        The direct includes of `file_path` that are not already pulled in by
+        another of its direct includes, as #include spellings.
+
+        Mutually including headers (include cycles) are both kept.
+        """
+        direct = self.direct(file_path)
+        minimal = []
+        for included in direct:
+            implied = any(
+                other != included and included in self.closure(other) and other not in self.closure(included)
+                for other in direct
+            )
+            if not implied:
+                minimal.append(self.spelling(included))
+        return tuple(minimal)
+
+    @classmethod
+    def from_sqlite(cls, db_path: str | Path, include_roots: Sequence[str] = (), **kwargs) -> "IncludeGraph":
+        """
+        Builds the graph from the `includes` and `path` tables of Doxygen's SQLite output
+        (see setup/schema_dump.sql).
+
+        The database keeps file paths, not the text of the #include
+        directives, so spellings are derived from the paths to match
+        `from_xml`: a resolved file is spelled relative to its include root
+        (e.g. "include/llvm/IR/Value.h" -> "llvm/IR/Value.h"), an unresolved
+        one as written.
+
+        Args:
+            db_path: Path to the Doxygen `doxygen_sqlite3.db` file.
+            include_roots: Include directories as they prefix the stored paths; without
+                           a matching root, the innermost `include` directory is used,
+                           else the file name.
+            **kwargs: Passed to the constructor (max_depth, cache_size).
+        """
+        edges: Dict[str, List[str]] = defaultdict(list)
+        spellings: Dict[str, str] = {}
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            for src, dst, found in conn.execute(_SQLITE_INCLUDES):
+                edges[src].append(dst)
+                if found and dst not in spellings:
+                    spellings[dst] = _sqlite_spelling(dst, include_roots)
+        finally:
+            conn.close()
+        logger.info(f"Loaded include graph of {len(edges)} files from {db_path}")
+        return cls(edges, spellings=spellings, **kwargs)
+
+    @classmethod
+    def from_xml(cls, xml_files: Iterable[str | Path], **kwargs) -> "IncludeGraph":
+        """
+        Builds the graph from the `<includes>` elements of Doxygen file compounds.
+
+        Includes carrying a `refid` are resolved to the included file's
+        location, so nodes match chunk `file_path` metadata; their text is
+        kept as the spelling. Files are streamed with iterparse.
+
+        Args:
+            xml_files: Doxygen XML files to scan (non-file compounds are skipped).
+            **kwargs: Passed to the constructor (max_depth, cache_size).
+        """
+        raw_edges: Dict[str, List[Tuple[Optional[str], str]]] = defaultdict(list)
+        refid_paths: Dict[str, str] = {}
+        for xml_file in xml_files:
+            try:
+                for _, compound in etree.iterparse(str(xml_file), events=("end",), tag="compounddef"):
+                    if compound.get("kind") == "file":
+                        location = compound.find("location")
+                        path = location.get("file") if location is not None else None
+                        path = path or (compound.findtext("compoundname") or "").strip()
+                        refid_paths[compound.get("id")] = path
+                        for include in compound.findall("includes"):
+                            raw_edges[path].append((include.get("refid"), (include.text or "").strip()))
+                    compound.clear()
+            except (etree.XMLSyntaxError, OSError) as e:
+                logger.error(f"Could not scan includes in {xml_file}: {e}")
+
+        edges: Dict[str, List[str]] = {}
+        spellings: Dict[str, str] = {}
+        for src, includes in raw_edges.items():
+            edges[src] = []
+            for refid, text in includes:
+                dst = refid_paths.get(refid, text) if refid else text
+                if dst:
+                    edges[src].append(dst)
+                    spellings.setdefault(dst, text or dst)
+        logger.info(f"Loaded include graph of {len(edges)} files from XML")
+        return cls(edges, spellings=spellings, **kwargs)
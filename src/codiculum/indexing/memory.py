@@ -0,0 +1,227 @@
+# src/codiculum/indexing/memory.py
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+# Bytes per element of an embedding held as a Python list of floats (float object + list slot).
+EMBEDDING_FLOAT_BYTES = 32
+
+
+def parse_size(value: str) -> int:
+    """Parses a byte size such as '512M', '2G' or '1.5GiB' (binary units)."""
+    match = _SIZE_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid size '{value}', expected e.g. '512M' or '2G'.")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def approx_size(obj) -> int:
+    """
+    Approximate bytes held by a parsed object graph (CodeElement, Chunk, lists/dicts of them).
+
+    Sums `sys.getsizeof` over strings, containers and dataclass fields;
+    shared objects (interned kinds, languages) are counted each time they
+    appear, so the estimate errs on the high side.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(approx_size(key) + approx_size(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(item) for item in obj)
+    if is_dataclass(obj):
+        return size + sum(approx_size(getattr(obj, f.name)) for f in fields(obj))
+    return size
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None if it cannot be measured."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS off Linux (KiB on Linux/BSD, bytes on macOS).
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class ThrottleEvent:
+    timestamp: float
+    rss: int
+    in_flight_bytes: int
+    batch_size: int
+    workers: int
+
+
+class MemoryGovernor:
+    """
+    Adapts indexing batch sizes and parse concurrency to stay under an RSS budget.
+
+    The pipeline reports the approximate bytes of the `CodeElement`/`Chunk`
+    objects it holds (`reserve`/`release`) and calls `adjust` after every
+    stored batch, before the batch's bytes are released. Memory usage is
+    the RSS captured when the governor is created (the baseline) plus the
+    larger of the in-flight bytes and the RSS growth since then, so memory
+    the estimates miss (lxml trees, caches, embedder buffers) still counts.
+    RSS rarely shrinks once the allocator has grown the heap, so the
+    governor only throttles again while usage keeps rising. It
+    - cuts the batch size in half and drops one parse worker when usage
+      exceeds `high_water` of the budget and is still rising (a throttle,
+      recorded; the warning is logged at most every `warn_interval` seconds),
+    - grows the batch size by a quarter and adds a worker while usage stays
+      below `low_water`,
+    - caps the bytes of one batch at half of the headroom left under the
+      high-water mark, so a few huge compounds close a batch early instead
+      of being embedded together with thousands of small ones.
+
+    Usage:
+        governor = MemoryGovernor(parse_size("2G"), max_workers=8)
+        build_index(xml_files, chunker, embed_fn, sink, governor=governor)
+        print(governor.report())
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        batch_size: int = 64,
+        min_batch_size: int = 1,
+        max_batch_size: int = 1024,
+        max_workers: Optional[int] = None,
+        high_water: float = 0.85,
+        low_water: float = 0.6,
+        embedding_dim: Optional[int] = None,
+        rss_fn: Callable[[], Optional[int]] = current_rss,
+        warn_interval: float = 30.0,
+    ):
+        """
+        Args:
+            budget_bytes: RSS budget of the indexing process.
+            batch_size: Initial number of chunks per embedding batch.
+            min_batch_size: Lower bound of the batch size.
+            max_batch_size: Upper bound of the batch size.
+            max_workers: Upper bound of concurrent XML parses (default: CPU count).
+            high_water: Fraction of the budget above which the governor throttles.
+            low_water: Fraction of the budget below which it grows batches and workers.
+            embedding_dim: If known, each chunk also accounts for its embedding list.
+            rss_fn: Returns the current RSS (bytes) or None. Read once for the
+                    baseline (0 if None) and on every adjust; if None, only the
+                    in-flight estimate counts.
+            warn_interval: Minimum seconds between two throttle warnings.
+        """
+        if budget_bytes <= 0:
+            raise ValueError("budget_bytes must be positive.")
+        if not 0 < low_water < high_water <= 1:
+            raise ValueError("Expected 0 < low_water < high_water <= 1.")
+        self.budget_bytes = budget_bytes
+        self.min_batch_size = max(1, min_batch_size)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size)
+        self.batch_size = min(max(batch_size, self.min_batch_size), self.max_batch_size)
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.workers = 1
+        self.high_water = high_water
+        self.low_water = low_water
+        self.chunk_overhead = EMBEDDING_FLOAT_BYTES * embedding_dim if embedding_dim else 0
+        self.rss_fn = rss_fn
+        self.warn_interval = warn_interval
+
+        self.in_flight_bytes = 0
+        self.peak_rss = 0
+        self.peak_in_flight_bytes = 0
+        self.baseline_bytes = self._read_rss() or 0
+        self.batch_bytes = self._batch_bytes(self.baseline_bytes)
+        self.throttle_events: List[ThrottleEvent] = []
+        self._throttled_usage: Optional[int] = None  # usage at the last throttle while above high water
+        self._last_warning = float("-inf")
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes: int) -> int:
+        """Records `nbytes` of newly held objects (thread-safe). Returns `nbytes`."""
+        with self._lock:
+            self.in_flight_bytes += nbytes
+            self.peak_in_flight_bytes = max(self.peak_in_flight_bytes, self.in_flight_bytes)
+        return nbytes
+
+    def release(self, nbytes: int) -> None:
+        with self._lock:
+            self.in_flight_bytes = max(0, self.in_flight_bytes - nbytes)
+
+    def chunk_bytes(self, chunk) -> int:
+        """Approximate bytes one pending chunk will hold until it is stored, embedding included."""
+        return approx_size(chunk) + self.chunk_overhead
+
+    def should_flush(self, pending_chunks: int, pending_bytes: int) -> bool:
+        """True once a batch reaches the current batch size or byte cap."""
+        return pending_chunks >= self.batch_size or (pending_chunks > 0 and pending_bytes >= self.batch_bytes)
+
+    def _read_rss(self) -> Optional[int]:
+        rss = self.rss_fn()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def _usage(self, rss: Optional[int]) -> int:
+        growth = rss - self.baseline_bytes if rss is not None else 0
+        return self.baseline_bytes + max(self.in_flight_bytes, growth)
+
+    def _batch_bytes(self, usage: int) -> int:
+        # Memory not attributable to pending objects stays; half of what is left goes to one batch.
+        held = max(self.baseline_bytes, usage - self.in_flight_bytes)
+        return max(1, int((self.high_water * self.budget_bytes - held) / 2))
+
+    def adjust(self) -> bool:
+        """
+        Re-estimates the memory usage and adapts batch size, workers and batch byte cap.
+
+        Returns:
+            True if the governor throttled.
+        """
+        rss = self._read_rss()
+        usage = self._usage(rss)
+        self.batch_bytes = self._batch_bytes(usage)
+        if usage > self.high_water * self.budget_bytes:
+            if self._throttled_usage is not None and usage <= self._throttled_usage:
+                return False  # The last throttle stopped the growth; hold steady.
+            self._throttled_usage = usage
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            self.workers = max(1, self.workers - 1)
+            event = ThrottleEvent(time.time(), rss or 0, self.in_flight_bytes, self.batch_size, self.workers)
+            self.throttle_events.append(event)
+            now = time.monotonic()
+            log = logger.debug
+            if now - self._last_warning >= self.warn_interval:
+                self._last_warning = now
+                log = logger.warning
+            log(
+                f"Memory governor: usage {usage / 2**20:.0f} MiB exceeds {self.high_water:.0%} of the "
+                f"{self.budget_bytes / 2**20:.0f} MiB budget; batch size -> {self.batch_size}, "
+                f"parse workers -> {self.workers}."
+            )
+            return True
+        self._throttled_usage = None
+        if usage < self.low_water * self.budget_bytes:
+            self.batch_size = min(self.max_batch_size, self.batch_size + max(1, self.batch_size // 4))
+            self.workers = min(self.max_workers, self.workers + 1)
+        return False
+
+    def report(self) -> str:
+        return (
+            f"Memory governor: budget {self.budget_bytes / 2**20:.0f} MiB, peak RSS {self.peak_rss / 2**20:.0f} MiB, "
+            f"peak in-flight {self.peak_in_flight_bytes / 2**20:.1f} MiB; {len(self.throttle_events)} throttles; "
+            f"final batch size {self.batch_size}, parse workers {self.workers}."
+        )
@@ -0,0 +1,224 @@
+# src/codiculum/indexing/pipeline.py
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from ..chunker.code_chunker import CodeChunker
+from ..chunker.models import Chunk
+from ..chunker.summary import SummaryBuilder
+from ..doxygen_parser.doxygen_parser import parse_doxygen_xml_file
+from ..doxygen_parser.models import CodeElement
+from .checkpoint import IndexCheckpoint, chunk_key
+from .memory import MemoryGovernor, approx_size
+
+logger = logging.getLogger(__name__)
+
+# Takes a batch of chunk texts, returns one embedding vector per text.
+EmbedFn = Callable[[List[str]], List[List[float]]]
+ParseFn = Callable[[str], List[CodeElement]]
+
+
+class ChunkSink(Protocol):
+    """Destination for embedded chunks (e.g. a vector store)."""
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        """Stores chunks with their embeddings. Must upsert by `chunk.metadata["id"]`."""
+        ...
+
+    # Optional: `delete(ids) -> int` removes chunks by id; incremental updates
+    # (see indexing.watch) use it for elements that disappeared. Sinks holding
+    # several corpus versions take `delete(ids, namespace="corpus@version")`.
+
+
+@dataclass
+class BuildStats:
+    files_processed: int = 0
+    files_skipped: int = 0
+    chunks_stored: int = 0
+    chunks_skipped: int = 0
+    batches: int = 0
+    throttles: int = 0
+
+
+def _parse_ahead(
+    xml_files: Iterable[str], parse_fn: ParseFn, governor: Optional[MemoryGovernor], workers: int = 1
+) -> Iterator[Tuple[str, List[CodeElement], int]]:
+    """
+    Parses files ahead in a thread pool, yielding in input order.
+
+    Up to `governor.workers` files (or `workers` without a governor) are parsed at once.
+
+    Yields:
+        (xml_file, elements, reserved_bytes); the caller releases the bytes.
+    """
+
+    def parse(xml_file: str) -> Tuple[List[CodeElement], int]:
+        elements = parse_fn(xml_file)
+        return elements, governor.reserve(approx_size(elements)) if governor else 0
+
+    files = iter(xml_files)
+    in_flight: Deque = deque()
+    max_workers = governor.max_workers if governor else workers
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="codiculum-parse") as pool:
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < (governor.workers if governor else workers):
+                xml_file = next(files, None)
+                if xml_file is None:
+                    exhausted = True
+                else:
+                    in_flight.append((xml_file, pool.submit(parse, xml_file)))
+            if not in_flight:
+                return
+            xml_file, future = in_flight.popleft()
+            elements, reserved = future.result()
+            yield xml_file, elements, reserved
+
+
+def build_index(
+    xml_files: Iterable[str | Path],
+    chunker: CodeChunker,
+    embed_fn: EmbedFn,
+    sink: ChunkSink,
+    checkpoint: Optional[IndexCheckpoint] = None,
+    batch_size: int = 64,
+    parse_fn: ParseFn = parse_doxygen_xml_file,
+    governor: Optional[MemoryGovernor] = None,
+    parse_workers: int = 1,
+    summaries: Optional[SummaryBuilder] = None,
+) -> BuildStats:
+    """
+    Runs the parse -> chunk -> embed -> store pipeline over Doxygen XML files.
+
+    Chunks are embedded and stored in batches of `batch_size`. When a
+    checkpoint is given, every stored batch is committed to it together with
+    the XML files it completes, and files/chunks already recorded there are
+    skipped, so re-running an interrupted build resumes where it stopped.
+    Because the checkpoint is committed after `sink.add`, a crash between the
+    two replays one batch; sinks must therefore upsert by chunk id.
+
+    With a memory governor, batch sizes come from the governor and adapt to
+    the RSS budget after every batch, a batch is also closed early once its
+    chunks reach the governor's byte cap, and XML files are parsed ahead in
+    a thread pool by as many workers as the governor currently allows.
+
+    With a SummaryBuilder, every file's elements are recorded in it and the
+    summary chunks of the whole parse are embedded and stored after the last
+    file, so a namespace spanning many XML files gets one summary. Files an
+    earlier run already finished are parsed again (not chunked or embedded)
+    to keep the summaries complete when resuming from a checkpoint.
+
+    Args:
+        xml_files: Doxygen XML files to index, in processing order.
+        chunker: The CodeChunker used to turn parsed elements into chunks.
+        embed_fn: Callable returning one embedding per chunk text.
+        sink: Destination for the embedded chunks.
+        checkpoint: Optional progress checkpoint to resume from and update.
+        batch_size: Number of chunks embedded and stored per batch (ignored with a governor).
+        parse_fn: Parser used for each XML file.
+        governor: Optional MemoryGovernor bounding the memory of in-flight elements and chunks.
+        parse_workers: Number of XML files parsed ahead in parallel without a governor
+                       (e.g. the workers of a `BulkParser`).
+        summaries: Optional SummaryBuilder; file/namespace/class summary chunks are stored too.
+
+    Returns:
+        A BuildStats summary of the run.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    stats = BuildStats()
+    done_files = checkpoint.processed_files() if checkpoint else set()
+    stored_ids = checkpoint.stored_chunk_ids() if checkpoint else set()
+
+    pending: List[Tuple[Chunk, str]] = []
+    pending_bytes = 0
+    # Files whose chunks have all been queued in `pending` (or stored already).
+    completed_files: List[str] = []
+
+    def flush() -> None:
+        nonlocal pending_bytes
+        if not pending and not completed_files:
+            return
+        if pending:
+            batch_chunks = [chunk for chunk, _ in pending]
+            embeddings = embed_fn([chunk.text for chunk in batch_chunks])
+            if len(embeddings) != len(batch_chunks):
+                raise ValueError(
+                    f"embed_fn returned {len(embeddings)} embeddings for {len(batch_chunks)} chunks."
+                )
+            sink.add(batch_chunks, embeddings)
+        if checkpoint:
+            checkpoint.commit_batch(
+                [(chunk_key(chunk), xml_file) for chunk, xml_file in pending],
+                completed_files,
+            )
+        stats.chunks_stored += len(pending)
+        stats.batches += 1
+        pending.clear()
+        completed_files.clear()
+        if governor:
+            # Decide while the batch (and its embeddings) is still held: that is the peak.
+            stats.throttles += governor.adjust()
+            governor.release(pending_bytes)
+            pending_bytes = 0
+
+    def queue(chunk: Chunk, xml_file: str) -> None:
+        nonlocal pending_bytes
+        if chunk_key(chunk) in stored_ids:
+            stats.chunks_skipped += 1
+            return
+        pending.append((chunk, xml_file))
+        if governor:
+            pending_bytes += governor.reserve(governor.chunk_bytes(chunk))
+            if governor.should_flush(len(pending), pending_bytes):
+                flush()
+        elif len(pending) >= batch_size:
+            flush()
+
+    skipped_files: List[str] = []
+
+    def files_to_parse() -> Iterator[str]:
+        for xml_file in map(str, xml_files):
+            if xml_file in done_files:
+                stats.files_skipped += 1
+                skipped_files.append(xml_file)
+                continue
+            yield xml_file
+
+    if governor or parse_workers > 1:
+        parsed = _parse_ahead(files_to_parse(), parse_fn, governor, parse_workers)
+    else:
+        parsed = ((xml_file, parse_fn(xml_file), 0) for xml_file in files_to_parse())
+
+    for xml_file, elements, element_bytes in parsed:
+        chunks = chunker.chunk(elements)
+        if summaries is not None:
+            summaries.add(elements, chunked_ids={chunk.metadata["id"] for chunk in chunks})
+        for chunk in chunks:
+            queue(chunk, xml_file)
+
+        completed_files.append(xml_file)
+        stats.files_processed += 1
+        if governor:
+            governor.release(element_bytes)
+
+    if summaries is not None:
+        stored_refids = {refid for _, _, refid in stored_ids}
+        for xml_file in skipped_files:
+            summaries.add(parse_fn(xml_file), chunked_ids=stored_refids)
+        for chunk in chunker.summary_chunks(summaries):
+            queue(chunk, "")
+
+    flush()
+    if governor:
+        logger.info(governor.report())
+    logger.info(
+        f"Index build finished. Files processed: {stats.files_processed}, skipped: {stats.files_skipped}; "
+        f"chunks stored: {stats.chunks_stored}, skipped: {stats.chunks_skipped}; batches: {stats.batches}; "
+        f"throttles: {stats.throttles}"
+    )
+    return stats
@@ -0,0 +1,347 @@
+# src/codiculum/indexing/sharding.py
+"""Deterministic sharding of index builds across processes or hosts.
+
+Each XML file is assigned to a shard by a stable hash of its file name
+(for Doxygen output, the compound refid), so every worker computes the same
+partition without coordination, whatever its checkout path. Each worker
+writes one chunk file plus a small JSON manifest; `merge_shards` checks that
+all shards of the same partitioning are present and intact and concatenates
+them into one chunk file with a merged manifest.
+
+With an `IndexCheckpoint`, every batch is written to its own part file next
+to the shard file before the checkpoint records it, so a killed worker rerun
+with the same checkpoint keeps the finished parts, skips their files and
+chunks, and assembles the shard file once all of its files are done.
+
+    # on host i of N
+    build_shard(xml_files, i, N, "shards/", chunker, embed_fn)
+    # once all shards are in place
+    merge_shards("shards/", "index.jsonl")
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from ..chunker.code_chunker import CodeChunker
+from ..chunker.export import ChunkWriter, read_chunk_batches
+from ..chunker.models import Chunk
+from ..chunker.summary import SummaryBuilder
+from ..doxygen_parser.doxygen_parser import parse_doxygen_xml_file
+from .checkpoint import IndexCheckpoint, chunk_key
+from .memory import MemoryGovernor
+from .pipeline import EmbedFn, ParseFn, build_index
+
+logger = logging.getLogger(__name__)
+
+PARTITIONING = "blake2b-64(xml file name) mod num_shards"
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def shard_for(key: str, num_shards: int) -> int:
+    """Returns the shard of `key`; stable across processes, hosts and Python versions (unlike hash())."""
+    if num_shards <= 0:
+        raise ValueError("num_shards must be positive.")
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def select_shard(xml_files: Iterable[str | Path], shard_index: int, num_shards: int) -> List[str]:
+    """
+    Returns the XML files belonging to one shard, in their original order.
+
+    Files are keyed by name only, so workers with different checkout paths agree.
+    """
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"shard_index must be in [0, {num_shards}), got {shard_index}.")
+    return [str(f) for f in xml_files if shard_for(Path(f).name, num_shards) == shard_index]
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """Parses 'i/N' (e.g. '0/4') into (shard_index, num_shards)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard spec '{spec}', expected 'INDEX/COUNT' like '0/4'.") from None
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard spec '{spec}': index must be in [0, {count}).")
+    return index, count
+
+
+def shard_file_name(shard_index: int, num_shards: int, format: str = "jsonl") -> str:
+    return f"shard-{shard_index:05d}-of-{num_shards:05d}.{format}"
+
+
+def manifest_path(chunk_file: str | Path) -> Path:
+    chunk_file = Path(chunk_file)
+    return chunk_file.with_name(chunk_file.name + MANIFEST_SUFFIX)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ShardManifest:
+    shard_index: int
+    num_shards: int
+    partitioning: str
+    chunk_file: str  # file name, relative to the manifest
+    sha256: str
+    files: int
+    chunks: int
+    embedding_dim: Optional[int] = None
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(asdict(self), indent=2) + "\n", encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ShardManifest":
+        return cls(**json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+class _WriterSink:
+    """ChunkSink writing every batch to a ChunkWriter (build_index never re-sends a batch without a checkpoint)."""
+
+    def __init__(self, writer: ChunkWriter):
+        self.writer = writer
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        self.writer.write_batch(chunks, embeddings)
+
+
+class _PartFileSink:
+    """
+    ChunkSink writing every batch to its own part file, made visible by an atomic rename.
+
+    A part is complete before the checkpoint records its batch, so a killed
+    build never leaves a truncated part; a batch replayed after a crash lands
+    in a later part and wins over the earlier copy when the parts are assembled.
+    """
+
+    def __init__(self, parts_dir: Path, format: str):
+        self.parts_dir = parts_dir
+        self.format = format
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        self.next_part = len(self.parts())
+
+    def parts(self) -> List[Path]:
+        return sorted(self.parts_dir.glob(f"part-*.{self.format}"))
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        part = self.parts_dir / f"part-{self.next_part:06d}.{self.format}"
+        tmp = part.with_name(part.name + ".tmp")
+        with ChunkWriter(tmp, format=self.format) as writer:
+            writer.write_batch(chunks, embeddings)
+        os.replace(tmp, part)
+        self.next_part += 1
+
+
+def _assemble_parts(parts: List[Path], chunk_file: Path, format: str) -> ChunkWriter:
+    """Concatenates part files into `chunk_file`, keeping the last copy of each chunk (see `chunk_key`)."""
+    last_part = {}
+    for n, part in enumerate(parts):
+        for chunks, _ in read_chunk_batches(part):
+            last_part.update((chunk_key(chunk), n) for chunk in chunks)
+    with ChunkWriter(chunk_file, format=format) as writer:
+        for n, part in enumerate(parts):
+            for chunks, embeddings in read_chunk_batches(part):
+                keep = [i for i, chunk in enumerate(chunks) if last_part[chunk_key(chunk)] == n]
+                writer.write_batch(
+                    [chunks[i] for i in keep],
+                    [embeddings[i] for i in keep] if embeddings is not None else None,
+                )
+    return writer
+
+
+def build_shard(
+    xml_files: Iterable[str | Path],
+    shard_index: int,
+    num_shards: int,
+    output_dir: str | Path,
+    chunker: CodeChunker,
+    embed_fn: EmbedFn,
+    format: str = "jsonl",
+    batch_size: int = 64,
+    parse_fn: ParseFn = parse_doxygen_xml_file,
+    governor: Optional[MemoryGovernor] = None,
+    parse_workers: int = 1,
+    checkpoint: Optional[IndexCheckpoint] = None,
+    include_summaries: bool = False,
+) -> ShardManifest:
+    """
+    Builds one shard: parses, chunks and embeds this shard's XML files and
+    writes `<output_dir>/shard-IIIII-of-NNNNN.<format>` plus its manifest.
+
+    Args:
+        xml_files: The full list of XML files (every worker passes the same list).
+        shard_index: This worker's shard, in [0, num_shards).
+        num_shards: Total number of shards.
+        output_dir: Directory for the shard file and manifest (shared or collected later).
+        chunker: The CodeChunker used to turn parsed elements into chunks.
+        embed_fn: Callable returning one embedding per chunk text.
+        format: Chunk file format: "jsonl", "arrow" or "parquet".
+        batch_size: Number of chunks embedded and written per batch.
+        parse_fn: Parser used for each XML file.
+        governor: Optional MemoryGovernor adapting batch sizes and parse workers (see `build_index`).
+        parse_workers: Number of XML files parsed ahead in parallel without a governor.
+        checkpoint: Optional progress checkpoint of this shard. Batches then go to part
+                    files in `<shard file>.parts/`, and a rerun with the same checkpoint
+                    resumes the build; the parts are assembled into the shard file and the
+                    checkpoint is reset once the shard is complete.
+        include_summaries: Also store file/namespace/class summary chunks of this shard's
+                           files (see `SummaryBuilder`); with several shards their ids carry
+                           the shard, so `merge_shards` keeps every shard's partial summary.
+
+    Returns:
+        The shard's ShardManifest (also written next to the chunk file).
+    """
+    files = select_shard(xml_files, shard_index, num_shards)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chunk_file = output_dir / shard_file_name(shard_index, num_shards, format)
+    summaries = None
+    if include_summaries:
+        summaries = SummaryBuilder(id_suffix=f"@shard-{shard_index}-of-{num_shards}" if num_shards > 1 else "")
+
+    if checkpoint is None:
+        with ChunkWriter(chunk_file, format=format) as writer:
+            stats = build_index(
+                files,
+                chunker,
+                embed_fn,
+                _WriterSink(writer),
+                batch_size=batch_size,
+                parse_fn=parse_fn,
+                governor=governor,
+                parse_workers=parse_workers,
+                summaries=summaries,
+            )
+        chunks = stats.chunks_stored
+    else:
+        parts_dir = chunk_file.with_name(chunk_file.name + ".parts")
+        if parts_dir.exists() and not checkpoint.processed_files() and not checkpoint.stored_chunk_ids():
+            # Leftovers of a build whose checkpoint was reset (or replaced): start over.
+            shutil.rmtree(parts_dir)
+        sink = _PartFileSink(parts_dir, format)
+        if sink.next_part:
+            logger.info(f"Resuming shard {shard_index}/{num_shards} from {sink.next_part} part files in {parts_dir}.")
+        stats = build_index(
+            files,
+            chunker,
+            embed_fn,
+            sink,
+            checkpoint=checkpoint,
+            batch_size=batch_size,
+            parse_fn=parse_fn,
+            governor=governor,
+            parse_workers=parse_workers,
+            summaries=summaries,
+        )
+        writer = _assemble_parts(sink.parts(), chunk_file, format)
+        chunks = writer.rows_written
+
+    manifest = ShardManifest(
+        shard_index=shard_index,
+        num_shards=num_shards,
+        partitioning=PARTITIONING,
+        chunk_file=chunk_file.name,
+        sha256=_sha256(chunk_file),
+        files=stats.files_processed + stats.files_skipped,
+        chunks=chunks,
+        embedding_dim=writer.embedding_dim,
+    )
+    manifest.save(manifest_path(chunk_file))
+    if checkpoint is not None:
+        checkpoint.reset()
+        shutil.rmtree(parts_dir)
+    logger.info(f"Shard {shard_index}/{num_shards}: {manifest.files} files, {manifest.chunks} chunks -> {chunk_file}")
+    return manifest
+
+
+def _load_shard_manifests(shard_dir: Path) -> List[ShardManifest]:
+    manifests = [ShardManifest.load(path) for path in sorted(shard_dir.glob(f"shard-*{MANIFEST_SUFFIX}"))]
+    if not manifests:
+        raise ValueError(f"No shard manifests found in {shard_dir}.")
+    num_shards = {m.num_shards for m in manifests}
+    if len(num_shards) != 1:
+        raise ValueError(f"Shards from different partitionings in {shard_dir}: num_shards {sorted(num_shards)}.")
+    (count,) = num_shards
+    present = {m.shard_index for m in manifests}
+    missing = sorted(set(range(count)) - present)
+    if missing:
+        raise ValueError(f"Missing shards {missing} of {count} in {shard_dir}.")
+    if len(manifests) != count:
+        raise ValueError(f"Duplicate shard manifests in {shard_dir}.")
+    for manifest in manifests:
+        if manifest.partitioning != PARTITIONING:
+            raise ValueError(f"Shard {manifest.shard_index} uses partitioning '{manifest.partitioning}'.")
+        if _sha256(shard_dir / manifest.chunk_file) != manifest.sha256:
+            raise ValueError(f"Checksum mismatch for {manifest.chunk_file}; the shard is incomplete or corrupt.")
+    return sorted(manifests, key=lambda m: m.shard_index)
+
+
+def merge_shards(shard_dir: str | Path, output_path: str | Path, batch_size: int = 1024) -> dict:
+    """
+    Merges the shard outputs of `build_shard` into a single chunk file.
+
+    All shards of the partitioning must be present and match their recorded
+    checksums. Chunks are streamed shard by shard (never all in memory);
+    a chunk whose (corpus, version, id) was seen in an earlier shard is
+    dropped with a warning.
+
+    Args:
+        shard_dir: Directory containing the shard files and manifests.
+        output_path: Merged chunk file; the format follows its suffix.
+        batch_size: Rows per read/write batch.
+
+    Returns:
+        The merged manifest (also written to `<output_path>.manifest.json`).
+
+    Raises:
+        ValueError: If shards are missing, duplicated, inconsistent or corrupt.
+    """
+    shard_dir, output_path = Path(shard_dir), Path(output_path)
+    manifests = _load_shard_manifests(shard_dir)
+    dims = {m.embedding_dim for m in manifests if m.embedding_dim}
+    if len(dims) > 1:
+        raise ValueError(f"Shards have different embedding dimensions: {sorted(dims)}.")
+
+    seen: set = set()
+    duplicates = 0
+    with ChunkWriter(output_path, embedding_dim=next(iter(dims), None)) as writer:
+        for manifest in manifests:
+            for chunks, embeddings in read_chunk_batches(shard_dir / manifest.chunk_file, batch_size=batch_size):
+                keep = [i for i, chunk in enumerate(chunks) if chunk_key(chunk) not in seen]
+                duplicates += len(chunks) - len(keep)
+                seen.update(chunk_key(chunks[i]) for i in keep)
+                writer.write_batch(
+                    [chunks[i] for i in keep],
+                    [embeddings[i] for i in keep] if embeddings is not None else None,
+                )
+    if duplicates:
+        logger.warning(f"Dropped {duplicates} chunks whose corpus version and id already appeared in an earlier shard.")
+
+    merged = {
+        "num_shards": len(manifests),
+        "partitioning": PARTITIONING,
+        "chunk_file": output_path.name,
+        "sha256": _sha256(output_path),
+        "files": sum(m.files for m in manifests),
+        "chunks": len(seen),
+        "duplicates_dropped": duplicates,
+        "embedding_dim": next(iter(dims), None),
+        "shards": [asdict(m) for m in manifests],
+    }
+    manifest_path(output_path).write_text(json.dumps(merged, indent=2) + "\n", encoding="utf-8")
+    logger.info(f"Merged {len(manifests)} shards into {output_path}: {merged['chunks']} chunks.")
+    return merged
@@ -0,0 +1,412 @@
+# src/codiculum/indexing/watch.py
+"""Continuous index updates from file system changes.
+
+A watcher reports changed paths under the Doxygen XML directory and the
+source tree (inotify on Linux, stat polling elsewhere). Bursts of changes are
+debounced into one update, and `IncrementalIndexer` re-parses and re-chunks
+only the affected XML files: changed XML files themselves, plus the XML files
+whose elements point into a changed source file. Only chunks whose text
+changed are re-embedded; elements that disappeared are deleted from the sink.
+
+Source edits refresh snippets at the line ranges recorded in the current XML;
+new or moved declarations show up once Doxygen regenerates the XML.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from ..chunker.code_chunker import CodeChunker
+from ..doxygen_parser.doxygen_parser import read_doxygen_xml_file
+from .pipeline import ChunkSink, EmbedFn, ParseFn
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Portable watcher that compares (mtime_ns, size) snapshots of the watched trees."""
+
+    def __init__(self, roots: Iterable[str | Path], interval: float = 1.0, suffixes: Optional[Iterable[str]] = None):
+        """
+        Args:
+            roots: Directories to watch recursively.
+            interval: Seconds between scans.
+            suffixes: Only watch files with these suffixes (e.g. {".xml", ".h"}); None watches all.
+        """
+        self.roots = [Path(root) for root in roots]
+        self.interval = interval
+        self.suffixes = set(suffixes) if suffixes else None
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for root in self.roots:
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    if self.suffixes and os.path.splitext(name)[1] not in self.suffixes:
+                        continue
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Waits up to `timeout` seconds (None: forever) for changes; returns the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            old = self._snapshot
+            changed = {path for path in snapshot.keys() | old.keys() if snapshot.get(path) != old.get(path)}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux watcher on inotify(7) through ctypes; new subdirectories are watched as they appear."""
+
+    def __init__(self, roots: Iterable[str | Path], suffixes: Optional[Iterable[str]] = None):
+        """
+        Raises:
+            OSError: If inotify is unavailable or a watch cannot be added (e.g. the
+                     fs.inotify.max_user_watches limit is reached).
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.suffixes = set(suffixes) if suffixes else None
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        try:
+            for root in roots:
+                for dirpath, _, _ in os.walk(root):
+                    self._add_watch(Path(dirpath))
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch failed for {directory}: {os.strerror(err)}")
+        self._dirs[wd] = directory
+
+    def _wanted(self, path: Path) -> bool:
+        return not self.suffixes or path.suffix in self.suffixes
+
+    def _read_events(self) -> Set[Path]:
+        changed: Set[Path] = set()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost: report the roots so callers rescan everything.
+                logger.warning("inotify event queue overflowed; rescanning watched trees.")
+                changed.update(self._dirs.values())
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            path = directory / name if name else directory
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    for dirpath, _, filenames in os.walk(path):
+                        self._add_watch(Path(dirpath))
+                        changed.update(p for p in (Path(dirpath) / f for f in filenames) if self._wanted(p))
+                continue
+            if mask & _IN_CREATE:
+                continue  # Reported by the IN_CLOSE_WRITE that follows.
+            if self._wanted(path):
+                changed.add(path)
+        return changed
+
+    def poll(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Waits up to `timeout` seconds (None: forever) for changes; returns the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return set()
+            changed = self._read_events()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(
+    roots: Iterable[str | Path],
+    use_inotify: bool = True,
+    poll_interval: float = 1.0,
+    suffixes: Optional[Iterable[str]] = None,
+):
+    """Returns an InotifyWatcher where available, otherwise a PollingWatcher."""
+    roots = list(roots)
+    if use_inotify:
+        try:
+            return InotifyWatcher(roots, suffixes=suffixes)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}); falling back to polling every {poll_interval}s.")
+    return PollingWatcher(roots, interval=poll_interval, suffixes=suffixes)
+
+
+def wait_for_changes(
+    watcher, quiet_period: float = 0.5, max_delay: float = 5.0, timeout: Optional[float] = None
+) -> Set[Path]:
+    """
+    Debounces a burst of changes into one set.
+
+    Blocks up to `timeout` for the first change, then keeps collecting until
+    no change arrives for `quiet_period` seconds, or `max_delay` seconds
+    after the first change at most (so a constantly busy tree still updates).
+    """
+    changed = watcher.poll(timeout)
+    if not changed:
+        return changed
+    deadline = time.monotonic() + max_delay
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        more = watcher.poll(min(quiet_period, remaining))
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+@dataclass
+class UpdateStats:
+    xml_files: int = 0
+    chunks_embedded: int = 0
+    chunks_unchanged: int = 0
+    chunks_deleted: int = 0
+    xml_files_failed: int = 0  # unreadable or half-written; their chunks are kept
+    seconds: float = 0.0
+
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class IncrementalIndexer:
+    """
+    Keeps a sink in sync with a Doxygen XML directory and its source tree.
+
+    It remembers which chunk ids each XML file produced, which XML files
+    reference each source file, and a hash of every chunk text, so an update
+    touches only the affected files and re-embeds only changed chunks.
+
+    An XML file that fails to parse (e.g. caught while Doxygen is still
+    writing it) is skipped and keeps its chunks; the write that completes it
+    triggers the next update. An element that moves to another XML file is
+    only deleted if no XML file produces its chunk any more.
+
+    A sink holding several corpus versions (e.g. a QueryService over a
+    NamespacedIndex) is told which one to delete from through `namespace`.
+    """
+
+    def __init__(
+        self,
+        xml_dir: str | Path,
+        chunker: CodeChunker,
+        embed_fn: EmbedFn,
+        sink: ChunkSink,
+        parse_fn: ParseFn = read_doxygen_xml_file,
+        namespace: Optional[str] = None,
+    ):
+        self.xml_dir = Path(xml_dir)
+        self.chunker = chunker
+        self.embed_fn = embed_fn
+        self.sink = sink
+        self.parse_fn = parse_fn
+        self.namespace = namespace  # 'corpus@version' passed to `sink.delete`, if set
+        self._xml_ids: Dict[str, Set[str]] = {}
+        self._id_xmls: Dict[str, Set[str]] = {}  # chunk id -> XML files producing it
+        self._source_xmls: Dict[str, Set[str]] = {}
+        self._xml_sources: Dict[str, Set[str]] = {}
+        self._hashes: Dict[str, bytes] = {}
+
+    def index_all(self) -> UpdateStats:
+        """Indexes every XML file in `xml_dir` (the starting point before watching)."""
+        return self.update(str(path) for path in sorted(self.xml_dir.glob("*.xml")))
+
+    def affected_xml_files(self, changed: Iterable[str | Path]) -> Set[str]:
+        """Maps changed paths (files or whole directories) to the XML files to re-process."""
+        xml_dir = self.xml_dir.resolve()
+        src_base = self.chunker.src_base_path.resolve()
+        affected: Set[str] = set()
+        for path in map(Path, changed):
+            resolved = path.resolve()
+            if resolved == xml_dir or xml_dir in resolved.parents:
+                if path.suffix == ".xml":
+                    affected.add(str(self.xml_dir / path.name))
+                elif path.is_dir():
+                    affected.update(str(p) for p in self.xml_dir.glob("*.xml"))
+                    affected.update(self._xml_ids)
+            elif resolved == src_base or src_base in resolved.parents:
+                relative = resolved.relative_to(src_base).as_posix()
+                if path.is_dir():
+                    prefix = "" if relative == "." else relative + "/"
+                    for source, xml_files in self._source_xmls.items():
+                        if source.startswith(prefix):
+                            affected.update(xml_files)
+                else:
+                    affected.update(self._source_xmls.get(relative, ()))
+        return affected
+
+    def update(self, xml_files: Iterable[str]) -> UpdateStats:
+        """
+        Re-parses and re-chunks `xml_files`; pushes changed chunks to the sink
+        and deletes chunks of elements that no longer exist (or whose XML file is gone).
+        """
+        start = time.perf_counter()
+        stats = UpdateStats()
+        to_embed = []
+        removed: Set[str] = set()
+        for xml_file in xml_files:
+            stats.xml_files += 1
+            try:
+                elements = self.parse_fn(xml_file) if os.path.exists(xml_file) else []
+            except FileNotFoundError:
+                elements = []
+            except Exception as e:
+                logger.warning(f"Skipping {xml_file} until its next change; it failed to parse: {e}")
+                stats.xml_files_failed += 1
+                continue
+            chunks = self.chunker.chunk(elements)
+
+            for source in self._xml_sources.pop(xml_file, ()):
+                self._source_xmls[source].discard(xml_file)
+            sources = {element.location.file for element in elements if element.location and element.location.file}
+            for source in sources:
+                self._source_xmls.setdefault(source, set()).add(xml_file)
+            if sources:
+                self._xml_sources[xml_file] = sources
+
+            new_ids = {chunk.metadata["id"] for chunk in chunks}
+            old_ids = self._xml_ids.get(xml_file, set())
+            for item_id in old_ids - new_ids:
+                self._id_xmls[item_id].discard(xml_file)
+                if not self._id_xmls[item_id]:
+                    del self._id_xmls[item_id]
+            for item_id in new_ids - old_ids:
+                self._id_xmls.setdefault(item_id, set()).add(xml_file)
+            removed |= old_ids - new_ids
+            if new_ids:
+                self._xml_ids[xml_file] = new_ids
+            else:
+                self._xml_ids.pop(xml_file, None)
+
+            for chunk in chunks:
+                digest = _text_hash(chunk.text)
+                if self._hashes.get(chunk.metadata["id"]) == digest:
+                    stats.chunks_unchanged += 1
+                else:
+                    to_embed.append((chunk, digest))
+
+        # Ids another XML file still produces (e.g. an element that moved) are not stale.
+        removed = {item_id for item_id in removed if item_id not in self._id_xmls}
+        if to_embed:
+            chunks = [chunk for chunk, _ in to_embed]
+            self.sink.add(chunks, self.embed_fn([chunk.text for chunk in chunks]))
+            self._hashes.update((chunk.metadata["id"], digest) for chunk, digest in to_embed)
+            stats.chunks_embedded = len(to_embed)
+        if removed:
+            delete = getattr(self.sink, "delete", None)
+            if delete is not None and self.namespace is not None:
+                delete(sorted(removed), namespace=self.namespace)
+            elif delete is not None:
+                delete(sorted(removed))
+            else:
+                logger.warning(f"Sink cannot delete; {len(removed)} stale chunks remain until the next full build.")
+            for item_id in removed:
+                self._hashes.pop(item_id, None)
+            stats.chunks_deleted = len(removed)
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def apply(self, changed: Iterable[str | Path]) -> UpdateStats:
+        """Updates the sink for a set of changed paths."""
+        return self.update(sorted(self.affected_xml_files(changed)))
+
+
+def watch(
+    indexer: IncrementalIndexer,
+    watcher,
+    quiet_period: float = 0.5,
+    max_delay: float = 5.0,
+    stop_event: Optional[threading.Event] = None,
+    on_update: Optional[Callable[[Set[Path], UpdateStats], None]] = None,
+) -> None:
+    """
+    Runs the watch loop until `stop_event` is set: wait for a debounced burst
+    of changes, then apply it. Update errors are logged and the loop goes on.
+    """
+    while stop_event is None or not stop_event.is_set():
+        changed = wait_for_changes(watcher, quiet_period, max_delay, timeout=0.5)
+        if not changed:
+            continue
+        try:
+            stats = indexer.apply(changed)
+        except Exception as e:
+            logger.error(f"Index update for {len(changed)} changed paths failed: {e}", exc_info=True)
+            continue
+        logger.info(
+            f"Updated {stats.xml_files} XML files in {stats.seconds * 1000:.0f} ms: {stats.chunks_embedded} chunks "
+            f"re-embedded, {stats.chunks_unchanged} unchanged, {stats.chunks_deleted} deleted."
+        )
+        if on_update is not None:
+            on_update(changed, stats)
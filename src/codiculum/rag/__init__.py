@@ -0,0 +1,15 @@
+from .batching import EmbeddingBatcher
+from .llm import LLM, EchoLLM, OpenAIChatLLM
+from .synthesis import ContextBlock, build_packed_prompt, merge_overlapping, pack_context, stream_answer
+
+__all__ = [
+    "EmbeddingBatcher",
+    "LLM",
+    "EchoLLM",
+    "OpenAIChatLLM",
+    "ContextBlock",
+    "build_packed_prompt",
+    "merge_overlapping",
+    "pack_context",
+    "stream_answer",
+]
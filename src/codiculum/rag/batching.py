@@ -0,0 +1,110 @@
+# src/codiculum/rag/batching.py
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Sync (blocking) or async callable returning one embedding per text.
+BatchEmbedFn = Union[
+    Callable[[List[str]], List[List[float]]],
+    Callable[[List[str]], Awaitable[List[List[float]]]],
+]
+
+DEFAULT_MAX_WAIT_SECONDS = 0.005
+DEFAULT_MAX_BATCH_SIZE = 64
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent query-embedding requests into batched embedding calls.
+
+    The first request opens a collection window of `max_wait` seconds; every
+    request arriving within it joins the same batch, which is sent as one
+    call to `embed_fn` when the window closes (or as soon as it reaches
+    `max_batch_size`). Results are fanned back out to the waiting callers
+    through asyncio futures, so the added latency is bounded by `max_wait`.
+    Identical texts within a batch are embedded once.
+    """
+
+    def __init__(
+        self,
+        embed_fn: BatchEmbedFn,
+        max_wait: float = DEFAULT_MAX_WAIT_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        """
+        Args:
+            embed_fn: Batch embedding function. Blocking functions are run in a worker thread.
+            max_wait: Collection window in seconds.
+            max_batch_size: Flush early once this many requests are pending.
+        """
+        if max_wait < 0 or max_batch_size <= 0:
+            raise ValueError("max_wait must be >= 0 and max_batch_size > 0.")
+        self._embed_fn = embed_fn
+        # Also covers callable objects with an `async def __call__` (e.g. OpenAIEmbedder).
+        self._is_async = inspect.iscoroutinefunction(embed_fn) or inspect.iscoroutinefunction(
+            getattr(embed_fn, "__call__", None)
+        )
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.requests = 0
+        self.batches = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """Returns the embedding of one text, batched with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        # Keep a reference so the task is not garbage collected mid-flight.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        try:
+            if self._is_async:
+                embeddings = await self._embed_fn(unique_texts)
+            else:
+                embeddings = await asyncio.to_thread(self._embed_fn, unique_texts)
+            if len(embeddings) != len(unique_texts):
+                raise ValueError(f"embed_fn returned {len(embeddings)} embeddings for {len(unique_texts)} texts.")
+        except Exception as e:
+            logger.error(f"Batched embedding call for {len(unique_texts)} texts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, embeddings))
+        for text, future in batch:
+            # Callers that timed out / were cancelled have already gone away.
+            if not future.done():
+                future.set_result(by_text[text])
+        logger.debug(f"Embedded batch of {len(unique_texts)} texts for {len(batch)} requests.")
+
+    async def close(self) -> None:
+        """Flushes pending requests and waits for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,75 @@
+# src/codiculum/rag/llm.py
+import logging
+import re
+from typing import AsyncIterator, Optional, Protocol
+
+from .._lazy import import_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+
+
+class LLM(Protocol):
+    """
+    Answer-synthesis backend. Implementations may also provide
+    `stream(prompt) -> AsyncIterator[str]` yielding tokens as they arrive;
+    see rag.synthesis.stream_answer.
+    """
+
+    async def complete(self, prompt: str) -> str:
+        """Returns the full completion for the prompt."""
+        ...
+
+
+class OpenAIChatLLM:
+    """Chat-completion LLM sharing one pooled AsyncOpenAI client across requests."""
+
+    def __init__(self, model: str = DEFAULT_CHAT_MODEL, client=None, max_tokens: Optional[int] = None):
+        self.model = model
+        self.max_tokens = max_tokens
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            openai = import_backend("openai", "OpenAI chat completions")
+            self._client = openai.AsyncOpenAI()
+        return self._client
+
+    async def complete(self, prompt: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.max_tokens,
+        )
+        return response.choices[0].message.content or ""
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.max_tokens,
+            stream=True,
+        )
+        async for event in response:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+
+
+class EchoLLM:
+    """Offline LLM stand-in: answers with the start of the prompt it was given."""
+
+    def __init__(self, max_chars: int = 2000):
+        self.max_chars = max_chars
+
+    async def complete(self, prompt: str) -> str:
+        return prompt[: self.max_chars]
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        for token in re.findall(r"\S+\s*", prompt[: self.max_chars]):
+            yield token
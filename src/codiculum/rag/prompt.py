@@ -0,0 +1,10 @@
+# src/codiculum/rag/prompt.py
+PROMPT_TEMPLATE = """You are answering questions about a C++ codebase.
+Use only the context below. Cite sources as (file_path:start_line-end_line).
+
+Context:
+{context}
+
+Question: {question}
+Answer:"""
+
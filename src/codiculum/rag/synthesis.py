@@ -0,0 +1,233 @@
+# src/codiculum/rag/synthesis.py
+import heapq
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from ..chunker.models import Chunk
+from .llm import LLM
+from .prompt import PROMPT_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 6000
+# Rough chars-per-token ratio for code and English with OpenAI tokenizers.
+_CHARS_PER_TOKEN = 4
+
+ScoredChunk = Tuple[Chunk, float]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency); errs on the high side for code."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class ContextBlock:
+    """One entry of the packed context: a line range of a file and the text that covers it."""
+
+    text: str
+    score: float
+    ids: List[str] = field(default_factory=list)
+    file_path: Optional[str] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    corpus: Optional[str] = None
+    version: Optional[str] = None
+    # The single-chunk blocks a merged block was built from (empty for an unmerged chunk).
+    members: List["ContextBlock"] = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    def covers(self, other: "ContextBlock") -> bool:
+        """Whether this block's line range contains `other`'s, in the same file of the same corpus version."""
+        return (
+            self.file_path is not None
+            and (self.corpus, self.version, self.file_path) == (other.corpus, other.version, other.file_path)
+            and self.start_line <= other.start_line
+            and other.end_line <= self.end_line
+        )
+
+    def source(self) -> Dict[str, object]:
+        source = {"ids": self.ids, "file_path": self.file_path, "start_line": self.start_line, "end_line": self.end_line}
+        for key in ("corpus", "version"):
+            if getattr(self, key) is not None:
+                source[key] = getattr(self, key)
+        return source
+
+
+# (corpus, version, file_path): the same path in two corpora or versions is a different file.
+FileKey = Tuple[Optional[str], Optional[str], str]
+
+
+def _line_range(chunk: Chunk) -> Optional[Tuple[FileKey, int, int]]:
+    metadata = chunk.metadata
+    file_path, start, end = metadata.get("file_path"), metadata.get("start_line"), metadata.get("end_line")
+    if not file_path or start is None or end is None:
+        return None
+    return (metadata.get("corpus"), metadata.get("version"), file_path), start, end
+
+
+def merge_overlapping(scored_chunks: Sequence[ScoredChunk]) -> List[ContextBlock]:
+    """
+    Merges retrieved chunks whose (file_path, start_line, end_line) ranges overlap
+    within the same corpus and version.
+
+    Overlapping chunks become one block spanning the union of their ranges
+    with the best score of the group; the chunks themselves are kept as the
+    block's `members` so `pack_context` can fall back to them. A chunk whose range is contained in
+    another one (e.g. a member inside its class) adds no text, since the
+    enclosing chunk already shows that code; a partially overlapping chunk
+    adds its code block trimmed to the lines not shown yet (or its whole
+    text if the code block does not match its range). Chunks without a line
+    range are kept as-is.
+
+    Args:
+        scored_chunks: (chunk, score) pairs from retrieval.
+
+    Returns:
+        ContextBlock objects, sorted by descending score.
+    """
+    blocks: List[ContextBlock] = []
+    by_file: Dict[FileKey, List[Tuple[int, int, Chunk, float]]] = defaultdict(list)
+    for chunk, score in scored_chunks:
+        line_range = _line_range(chunk)
+        if line_range is None:
+            blocks.append(ContextBlock(text=chunk.text, score=score, ids=[chunk.metadata.get("id")]))
+            continue
+        file_key, start, end = line_range
+        by_file[file_key].append((start, end, chunk, score))
+
+    for file_key, items in by_file.items():
+        # Widest range first among equal starts, so containers precede their members.
+        items.sort(key=lambda item: (item[0], -item[1]))
+        group: List[Tuple[int, int, Chunk, float]] = []
+        group_end = None
+        for item in items + [None]:
+            if item is not None and group and item[0] <= group_end:
+                group.append(item)
+                group_end = max(group_end, item[1])
+                continue
+            if group:
+                blocks.append(_merge_group(file_key, group))
+            if item is not None:
+                group, group_end = [item], item[1]
+
+    blocks.sort(key=lambda block: -block.score)
+    return blocks
+
+
+_CODE_FENCE = "\nCode:\n```"
+
+
+def _trim_code(chunk: Chunk, start: int, end: int, first_line: int) -> Optional[str]:
+    """
+    The chunk's text with its code block cut down to source lines `first_line`..`end`.
+
+    Returns None if the text has no code block spanning exactly `start`..`end`
+    (see `format_element_to_chunk`), so the caller can fall back to the whole text.
+    """
+    head, fence, rest = chunk.text.partition(_CODE_FENCE)
+    if not fence or not rest.endswith("\n```"):
+        return None
+    lang, _, code = rest[: -len("\n```")].partition("\n")
+    lines = code.split("\n")
+    template_params = chunk.metadata.get("template_params")
+    if template_params:
+        lines = lines[template_params.count("\n") + 1:]
+    if len(lines) != end - start + 1:
+        return None
+    kept = "\n".join(lines[first_line - start:])
+    return f"{head}{fence}{lang}\n{kept}\n```"
+
+
+def _merge_group(file_key: FileKey, group: List[Tuple[int, int, Chunk, float]]) -> ContextBlock:
+    # Items are sorted by start and each one starts inside the lines covered so far,
+    # so the covered lines are always group_start..covered_end.
+    texts: List[str] = []
+    covered_end: Optional[int] = None
+    for start, end, chunk, _ in group:
+        if covered_end is None:
+            texts.append(chunk.text)
+        elif end <= covered_end:
+            continue
+        else:
+            texts.append(_trim_code(chunk, start, end, covered_end + 1) or chunk.text)
+        covered_end = end
+    corpus, version, file_path = file_key
+    members = [
+        ContextBlock(chunk.text, score, [chunk.metadata.get("id")], file_path, start, end, corpus, version)
+        for start, end, chunk, score in group
+    ]
+    if len(members) == 1:
+        return members[0]
+    return ContextBlock(
+        text="\n\n".join(texts),
+        score=max(score for *_, score in group),
+        ids=[chunk.metadata.get("id") for _, _, chunk, _ in group],
+        file_path=file_path,
+        start_line=min(start for start, *_ in group),
+        end_line=max(end for _, end, *_ in group),
+        corpus=corpus,
+        version=version,
+        members=members,
+    )
+
+
+def pack_context(blocks: Sequence[ContextBlock], token_budget: int) -> List[ContextBlock]:
+    """
+    Greedily selects the highest-scoring blocks that fit in the token budget.
+
+    Blocks that do not fit are skipped, so a smaller lower-ranked block can
+    still use the remaining budget. A merged block that does not fit is
+    replaced by its member chunks, each competing with its own score; a
+    member whose lines an already packed block shows is dropped.
+    """
+    packed: List[ContextBlock] = []
+    used = 0
+    # (-score, insertion order, block): highest score first, ties in input order.
+    candidates = [(-block.score, n, block) for n, block in enumerate(sorted(blocks, key=lambda b: -b.score))]
+    heapq.heapify(candidates)
+    order = len(candidates)
+    while candidates:
+        _, _, block = heapq.heappop(candidates)
+        if used + block.tokens <= token_budget:
+            if not any(other.covers(block) for other in packed):
+                packed.append(block)
+                used += block.tokens
+        elif block.members:
+            for member in block.members:
+                heapq.heappush(candidates, (-member.score, order, member))
+                order += 1
+    logger.debug(f"Packed {len(packed)}/{len(blocks)} context blocks into ~{used}/{token_budget} tokens.")
+    return packed
+
+
+def build_packed_prompt(
+    question: str,
+    scored_chunks: Sequence[ScoredChunk],
+    token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+) -> Tuple[str, List[ContextBlock]]:
+    """
+    Merges overlapping chunks, packs them under `token_budget` (context only)
+    and builds the synthesis prompt.
+
+    Returns:
+        (prompt, packed blocks in prompt order)
+    """
+    packed = pack_context(merge_overlapping(scored_chunks), token_budget)
+    context = "\n\n".join(block.text for block in packed)
+    return PROMPT_TEMPLATE.format(context=context, question=question), packed
+
+
+async def stream_answer(llm: LLM, prompt: str) -> AsyncIterator[str]:
+    """Yields answer tokens as the LLM produces them (whole answer at once if it cannot stream)."""
+    stream = getattr(llm, "stream", None)
+    if stream is None:
+        yield await llm.complete(prompt)
+        return
+    async for token in stream(prompt):
+        yield token
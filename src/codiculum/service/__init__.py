@@ -0,0 +1,4 @@
+from .client import stream_query
+from .server import LatencyRecorder, QueryService, ServiceConfig
+
+__all__ = ["LatencyRecorder", "QueryService", "ServiceConfig", "stream_query"]
@@ -0,0 +1,48 @@
+# src/codiculum/service/client.py
+import http.client
+import json
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+
+def stream_query(
+    base_url: str,
+    question: str,
+    k: int = 5,
+    timeout: float = 60.0,
+    corpus: Optional[str] = None,
+    version: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Sends a streaming /query request to a QueryService and yields its events.
+
+    Events are {"sources": [...]}, then {"token": str} as the answer is
+    generated, then {"done": true} (or {"error": str}).
+
+    Args:
+        base_url: Service URL, e.g. 'http://127.0.0.1:8080'.
+        question: The user question.
+        k: Number of chunks to retrieve.
+        timeout: Socket timeout in seconds.
+        corpus: Restrict retrieval to this corpus (all served corpora if None).
+        version: Restrict retrieval to this corpus version (all versions if None).
+
+    Raises:
+        RuntimeError: If the service answers with an error status.
+    """
+    url = urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+    try:
+        payload = {"query": question, "k": k, "stream": True}
+        payload.update((key, value) for key, value in (("corpus", corpus), ("version", version)) if value is not None)
+        body = json.dumps(payload)
+        connection.request("POST", "/query", body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"Query service returned {response.status}: {response.read().decode('utf-8', 'replace')}")
+        # http.client decodes the chunked transfer encoding transparently.
+        for line in iter(response.readline, b""):
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        connection.close()
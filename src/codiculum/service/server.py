@@ -0,0 +1,565 @@
+# src/codiculum/service/server.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..chunker.models import Chunk
+from ..chunker.summary import SUMMARY_KINDS, expand_summary_hits
+from ..rag.batching import BatchEmbedFn, EmbeddingBatcher
+from ..rag.llm import LLM
+from ..rag.synthesis import DEFAULT_CONTEXT_TOKEN_BUDGET, build_packed_prompt, stream_answer
+from ..vector_store.namespaces import DEFAULT_NAMESPACE, Namespace, NamespacedIndex
+from ..vector_store.store import QuantizedVectorStore, SearchCancelled
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+# Metadata returned with each search hit (the full metadata may be large).
+_RESULT_FIELDS = ("name", "kind", "file_path", "start_line", "end_line", "corpus", "version")
+_QUERY_PATHS = ("/search", "/query")
+
+
+@dataclass
+class ServiceConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    max_concurrency: int = 32  # requests processed at once
+    max_queue: int = 256  # requests allowed to wait for a slot before 503
+    request_timeout: float = 10.0  # seconds, including time spent queued (also bounds header/body reads)
+    idle_timeout: float = 30.0  # keep-alive connections idle longer than this are closed
+    max_body_bytes: int = 1 << 20
+    default_k: int = 5
+    max_k: int = 50
+    embed_batch_wait: float = 0.005
+    context_token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET
+    compact_dead_ratio: float = 0.5  # compact the store once deleted slots exceed this fraction of live ones
+    summary_first: bool = False  # search summary chunks first, then only the children of the best ones
+    summary_k: int = 3  # summaries whose children are searched in summary-first mode
+
+
+class LatencyRecorder:
+    """Keeps the most recent request latencies and reports percentiles."""
+
+    def __init__(self, window: int = 10000):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50_ms": _ms(self.percentile(50)),
+            "p95_ms": _ms(self.percentile(95)),
+            "p99_ms": _ms(self.percentile(99)),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+@dataclass
+class _Stream:
+    """A streamed (chunked NDJSON) response; `release` runs once the stream ends."""
+
+    events: AsyncIterator[Dict[str, Any]]
+    release: Callable[[], None]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _is_summary(metadata: dict) -> bool:
+    return metadata.get("kind") in SUMMARY_KINDS
+
+
+class QueryService:
+    """
+    Lightweight asyncio HTTP query service over one warm in-memory index.
+
+    The vector store, chunk texts, embedding backend and LLM client are
+    created once and shared by all requests: query embeddings from
+    concurrent requests are coalesced by an EmbeddingBatcher, and backend
+    clients (e.g. OpenAIEmbedder / OpenAIChatLLM) keep one pooled connection
+    pool for the process. Endpoints:
+
+    - POST /search {"query": str, "k": int} -> ranked chunks
+    - POST /query  {"query": str, "k": int, "stream": bool} -> LLM answer with
+      sources; with "stream": true the response is chunked NDJSON:
+      {"sources": [...]}, then {"token": str} events, then {"done": true}
+    - GET  /health, GET /stats (latency percentiles per endpoint)
+
+    Given a NamespacedIndex instead of a plain store, the service holds
+    several corpora and versions at once (the index keeps the chunks, so
+    `chunks` stays empty); /search and /query then accept optional "corpus"
+    and "version" strings scoping retrieval to the matching namespaces,
+    and federate across all of them otherwise.
+
+    With `summary_first`, retrieval is two-staged when the index holds
+    summary chunks (see `chunker.SummaryBuilder`): the best `summary_k`
+    summaries are found first, and the chunks are then searched among
+    their children only (a full search if no summary matches).
+
+    Concurrency is capped at `max_concurrency` with a bounded wait queue
+    (503 when full), and every request is subject to `request_timeout` (504);
+    a timed-out search is cancelled. Reading a request's headers or body
+    longer than `request_timeout` closes the connection with 408.
+    """
+
+    def __init__(
+        self,
+        store: QuantizedVectorStore | NamespacedIndex,
+        chunks: Dict[str, Chunk],
+        embed_fn: BatchEmbedFn,
+        llm: Optional[LLM] = None,
+        config: Optional[ServiceConfig] = None,
+    ):
+        self.index = store if isinstance(store, NamespacedIndex) else None
+        self.store = store.store if self.index is not None else store
+        self.chunks = chunks
+        self.llm = llm
+        self.config = config or ServiceConfig()
+        self._embed_fn = embed_fn
+        self.batcher = EmbeddingBatcher(embed_fn, max_wait=self.config.embed_batch_wait)
+        self.latency: Dict[str, LatencyRecorder] = {
+            "/search": LatencyRecorder(),
+            "/query": LatencyRecorder(),
+            "/query:first_token": LatencyRecorder(),
+        }
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        self._waiting = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Guards the store against index updates (see `add`/`delete`) while a search scans it.
+        self._index_lock = threading.Lock()
+        # Ids of summary chunks, the first stage of summary-first searches.
+        if self.index is not None:
+            self._summary_ids = {refid for _, refid, metadata in self.index.items() if _is_summary(metadata)}
+        else:
+            self._summary_ids = {item_id for item_id, chunk in chunks.items() if _is_summary(chunk.metadata)}
+
+    # --- Index updates (ChunkSink interface; callable from any thread) ---
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        """Upserts chunks into the live index; they are searchable when this returns."""
+        with self._index_lock:
+            self._summary_ids.update(chunk.metadata["id"] for chunk in chunks if _is_summary(chunk.metadata))
+            if self.index is not None:
+                self.index.add(chunks, embeddings)
+                return
+            self.store.add(chunks, embeddings)
+            self.chunks.update((chunk.metadata["id"], chunk) for chunk in chunks)
+
+    def delete(self, ids: List[str], namespace: Optional[Namespace | str] = None) -> int:
+        """
+        Removes chunks from the live index. Returns the number of chunks removed.
+
+        With a NamespacedIndex, the ids are removed from `namespace` (default: the default namespace).
+        """
+        with self._index_lock:
+            if self.index is not None:
+                removed = self.index.delete(ids, namespace or DEFAULT_NAMESPACE)
+            else:
+                for item_id in ids:
+                    self.chunks.pop(item_id, None)
+                    self._summary_ids.discard(item_id)
+                removed = self.store.delete(ids)
+            if self.store.dead_slots > self.config.compact_dead_ratio * max(len(self.store), 1):
+                self.store.compact()
+            return removed
+
+    def compact(
+        self, live_ids: Optional[Iterable[str]] = None, namespace: Optional[Namespace | str] = None
+    ) -> Dict[str, int]:
+        """
+        Drops chunks not in `live_ids` (if given) and compacts the store.
+
+        With a NamespacedIndex, `live_ids` are the live refids of `namespace`
+        (default: the default namespace) and other namespaces are untouched.
+
+        Returns:
+            The number of stale chunks purged and the store's reclaimed counts.
+        """
+        with self._index_lock:
+            if self.index is not None:
+                namespace = namespace or DEFAULT_NAMESPACE
+                stale: List[str] = []
+                if live_ids is not None:
+                    live = set(live_ids)
+                    stale = [refid for refid in self.index.ids(namespace) if refid not in live]
+                purged = self.index.delete(stale, namespace)
+                return {**self.index.compact(), "purged": purged}
+            stale = []
+            if live_ids is not None:
+                live = set(live_ids)
+                stale = [item_id for item_id in self.store.ids() if item_id not in live]
+                for item_id in [item_id for item_id in self.chunks if item_id not in live]:
+                    del self.chunks[item_id]
+                self._summary_ids &= live
+            return {"purged": self.store.delete(stale), **self.store.compact()}
+
+    def _chunk_count(self) -> int:
+        return len(self.index) if self.index is not None else len(self.chunks)
+
+    def _search_index(
+        self,
+        embedding: List[float],
+        k: int,
+        namespaces: Optional[List[Namespace]],
+        cancelled: threading.Event,
+        ids: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float, Optional[Chunk], Optional[List[Namespace]]]]:
+        if self.index is None:
+            return [
+                (hit.id, hit.score, self.chunks.get(hit.id), None)
+                for hit in self.store.search(embedding, k, allowed_ids=ids, cancelled=cancelled)
+            ]
+        return [
+            (hit.id, hit.score, self.index.get_chunk(*hit.members[0]), hit.namespaces)
+            for hit in self.index.search(embedding, k, namespaces=namespaces, ids=ids, cancelled=cancelled)
+        ]
+
+    def _locked_search(
+        self, embedding: List[float], k: int, namespaces: Optional[List[Namespace]], cancelled: threading.Event
+    ) -> List[Tuple[str, float, Optional[Chunk], Optional[List[Namespace]]]]:
+        """
+        (id, score, chunk, namespaces sharing the content) of the best `k` hits.
+
+        Raises:
+            SearchCancelled: If `cancelled` is set while waiting for the lock or scanning.
+        """
+        with self._index_lock:
+            if cancelled.is_set():
+                raise SearchCancelled()
+            if self.config.summary_first and self._summary_ids:
+                summaries = self._search_index(
+                    embedding, self.config.summary_k, namespaces, cancelled, self._summary_ids
+                )
+                children = expand_summary_hits(
+                    [chunk for _, _, chunk, _ in summaries if chunk is not None], [hit[0] for hit in summaries]
+                )
+                if children:
+                    return self._search_index(embedding, k, namespaces, cancelled, children)
+            return self._search_index(embedding, k, namespaces, cancelled)
+
+    def _select_namespaces(self, corpus: Optional[str], version: Optional[str]) -> Optional[List[Namespace]]:
+        """The namespaces matching a request's corpus/version (None: search all of them)."""
+        if corpus is None and version is None:
+            return None
+        if self.index is None:
+            raise HTTPError(400, "'corpus'/'version' need a service over a namespaced index.")
+        selected = [
+            namespace for namespace in self.index.namespaces()
+            if corpus in (None, namespace.corpus) and version in (None, namespace.version)
+        ]
+        if not selected:
+            raise HTTPError(400, f"No indexed corpus version matches corpus={corpus!r}, version={version!r}.")
+        return selected
+
+    # --- Request handlers ---
+
+    async def _retrieve(
+        self, query: str, k: int, namespaces: Optional[List[Namespace]]
+    ) -> List[Tuple[Dict[str, Any], Optional[Chunk]]]:
+        embedding = await self.batcher.embed(query)
+        # The store scan is CPU-bound; keep the event loop responsive. A thread
+        # cannot be cancelled, so a request that times out (504) sets `cancelled`
+        # and the scan stops instead of holding the index lock to the end.
+        cancelled = threading.Event()
+        try:
+            results = await asyncio.to_thread(self._locked_search, embedding, k, namespaces, cancelled)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        hits = []
+        for item_id, score, chunk, shared in results:
+            hit = {"id": item_id, "score": score}
+            if chunk is not None:
+                hit.update({field: chunk.metadata.get(field) for field in _RESULT_FIELDS})
+                hit["text"] = chunk.text
+            if shared is not None:
+                hit["namespaces"] = [str(namespace) for namespace in shared]
+            hits.append((hit, chunk))
+        return hits
+
+    async def search(self, query: str, k: int, namespaces: Optional[List[Namespace]] = None) -> List[Dict[str, Any]]:
+        return [hit for hit, _ in await self._retrieve(query, k, namespaces)]
+
+    async def _prepare_query(
+        self, query: str, k: int, namespaces: Optional[List[Namespace]] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        if self.llm is None:
+            raise HTTPError(501, "No LLM configured for /query.")
+        hits = await self._retrieve(query, k, namespaces)
+        scored = [(chunk, hit["score"]) for hit, chunk in hits if chunk is not None]
+        prompt, packed = build_packed_prompt(query, scored, self.config.context_token_budget)
+        return prompt, [block.source() for block in packed]
+
+    async def query(self, query: str, k: int, namespaces: Optional[List[Namespace]] = None) -> Dict[str, Any]:
+        prompt, sources = await self._prepare_query(query, k, namespaces)
+        answer = await self.llm.complete(prompt)
+        return {"answer": answer, "sources": sources}
+
+    async def _stream_events(self, prompt: str, sources: List[Dict[str, Any]], start: float) -> AsyncIterator[Dict[str, Any]]:
+        yield {"sources": sources}
+        tokens = stream_answer(self.llm, prompt).__aiter__()
+        first = True
+        try:
+            while True:
+                try:
+                    token = await asyncio.wait_for(tokens.__anext__(), self.config.request_timeout)
+                except StopAsyncIteration:
+                    break
+                if first:
+                    self.latency["/query:first_token"].record(time.perf_counter() - start)
+                    first = False
+                yield {"token": token}
+        except asyncio.TimeoutError:
+            yield {"error": f"LLM produced no token for {self.config.request_timeout}s."}
+            return
+        finally:
+            await tokens.aclose()
+        self.latency["/query"].record(time.perf_counter() - start)
+        yield {"done": True}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": self._chunk_count(),
+            "vectors": len(self.store),
+            "namespaces": [str(ns) for ns in self.index.namespaces()] if self.index is not None else None,
+            "index_bytes": self.store.memory_bytes(),
+            "waiting": self._waiting,
+            "embedding_requests": self.batcher.requests,
+            "embedding_batches": self.batcher.batches,
+            "latency": {path: recorder.summary() for path, recorder in self.latency.items()},
+        }
+
+    # --- HTTP plumbing ---
+
+    def _parse_query_body(self, body: bytes) -> Tuple[str, int, bool, Optional[List[Namespace]]]:
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+        query = payload.get("query") if isinstance(payload, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "Body must be a JSON object with a non-empty 'query' string.")
+        k = payload.get("k", self.config.default_k)
+        if not isinstance(k, int) or k <= 0:
+            raise HTTPError(400, "'k' must be a positive integer.")
+        corpus, version = payload.get("corpus"), payload.get("version")
+        if not all(value is None or isinstance(value, str) for value in (corpus, version)):
+            raise HTTPError(400, "'corpus' and 'version' must be strings.")
+        namespaces = self._select_namespaces(corpus, version)
+        return query, min(k, self.config.max_k), bool(payload.get("stream", False)), namespaces
+
+    async def _acquire_slot(self) -> None:
+        if self._semaphore.locked() and self._waiting >= self.config.max_queue:
+            raise HTTPError(503, "Server is overloaded, retry later.")
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+    async def _limited(self, coro):
+        try:
+            await self._acquire_slot()
+        except BaseException:
+            coro.close()
+            raise
+        try:
+            return await coro
+        finally:
+            self._semaphore.release()
+
+    async def _open_stream(self, query: str, k: int, namespaces: Optional[List[Namespace]], start: float) -> _Stream:
+        # Admission and retrieval happen before the 200 header is sent, so
+        # overload and timeouts still map to 503/504.
+        await asyncio.wait_for(self._acquire_slot(), self.config.request_timeout)
+        try:
+            prompt, sources = await asyncio.wait_for(
+                self._prepare_query(query, k, namespaces), self.config.request_timeout
+            )
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return _Stream(self._stream_events(prompt, sources, start), self._semaphore.release)
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """Routes a request and returns (status, JSON-serializable payload)."""
+        try:
+            if path == "/health":
+                return 200, {"status": "ok", "chunks": self._chunk_count()}
+            if path == "/stats":
+                return 200, self.stats()
+            if path not in _QUERY_PATHS:
+                raise HTTPError(404, f"Unknown path: {path}")
+            if method != "POST":
+                raise HTTPError(405, f"{path} only accepts POST.")
+
+            query, k, stream, namespaces = self._parse_query_body(body)
+            start = time.perf_counter()
+            try:
+                if stream and path == "/query":
+                    return 200, await self._open_stream(query, k, namespaces, start)
+                handler = self.search if path == "/search" else self.query
+                result = await asyncio.wait_for(
+                    self._limited(handler(query, k, namespaces)), self.config.request_timeout
+                )
+            except asyncio.TimeoutError:
+                raise HTTPError(504, f"Request timed out after {self.config.request_timeout}s.")
+            self.latency[path].record(time.perf_counter() - start)
+            return 200, {"results": result} if path == "/search" else result
+        except HTTPError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            logger.error(f"Unhandled error serving {method} {path}: {e}", exc_info=True)
+            return 500, {"error": "Internal server error."}
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, stream: _Stream, keep_alive: bool) -> None:
+        try:
+            head = (
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: application/x-ndjson\r\n"
+                "Transfer-Encoding: chunked\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1"))
+            async for event in stream.events:
+                data = (json.dumps(event) + "\n").encode("utf-8")
+                writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+                # Flush every event so tokens reach the client as they are produced.
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await stream.events.aclose()
+            stream.release()
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        if isinstance(payload, _Stream):
+            await self._write_stream(writer, payload, keep_alive)
+            return
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.config.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    await self._write_response(writer, 400, {"error": "Malformed request line."}, False)
+                    break
+                method, target, version = parts
+
+                try:
+                    headers = await asyncio.wait_for(self._read_headers(reader), self.config.request_timeout)
+                except asyncio.TimeoutError:
+                    await self._write_response(writer, 408, {"error": "Timed out reading the headers."}, False)
+                    break
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > self.config.max_body_bytes:
+                    await self._write_response(writer, 413 if length > 0 else 400, {"error": "Bad Content-Length."}, False)
+                    break
+                try:
+                    body = (
+                        await asyncio.wait_for(reader.readexactly(length), self.config.request_timeout)
+                        if length else b""
+                    )
+                except asyncio.TimeoutError:
+                    await self._write_response(writer, 408, {"error": "Timed out reading the body."}, False)
+                    break
+
+                status, payload = await self.dispatch(method.upper(), target.split("?", 1)[0], body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        """Starts listening; the bound port is available as `self.port` (useful with port 0)."""
+        self._server = await asyncio.start_server(self._handle_connection, self.config.host, self.config.port)
+        logger.info(f"Query service listening on {self.config.host}:{self.port} with {self._chunk_count()} chunks")
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1] if self._server else self.config.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.close()
+        # Release pooled backend clients (e.g. OpenAIEmbedder, OpenAIChatLLM).
+        for backend in (self._embed_fn, self.llm):
+            closer = getattr(backend, "close", None)
+            if closer is not None and asyncio.iscoroutinefunction(closer):
+                await closer()
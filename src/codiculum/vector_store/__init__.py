@@ -0,0 +1,13 @@
+from .namespaces import Namespace, NamespacedIndex, NamespacedResult, content_hash
+from .store import QuantizationReport, QuantizedVectorStore, SearchCancelled, SearchResult
+
+__all__ = [
+    "Namespace",
+    "NamespacedIndex",
+    "NamespacedResult",
+    "QuantizationReport",
+    "QuantizedVectorStore",
+    "SearchCancelled",
+    "SearchResult",
+    "content_hash",
+]
@@ -0,0 +1,278 @@
+# src/codiculum/vector_store/namespaces.py
+import hashlib
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ..chunker.models import Chunk
+from .store import QuantizedVectorStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = "default"
+DEFAULT_VERSION = "default"
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+class Namespace(NamedTuple):
+    corpus: str
+    version: str
+
+    def __str__(self) -> str:
+        return f"{self.corpus}@{self.version}"
+
+    @classmethod
+    def parse(cls, value: str) -> "Namespace":
+        """Parses 'corpus@version' (a bare 'corpus' means its default version)."""
+        corpus, _, version = value.partition("@")
+        return cls(corpus or DEFAULT_CORPUS, version or DEFAULT_VERSION)
+
+    @classmethod
+    def of(cls, chunk: Chunk) -> "Namespace":
+        return cls(chunk.metadata.get("corpus") or DEFAULT_CORPUS, chunk.metadata.get("version") or DEFAULT_VERSION)
+
+
+DEFAULT_NAMESPACE = Namespace(DEFAULT_CORPUS, DEFAULT_VERSION)
+
+
+def _as_namespace(value: Namespace | str) -> Namespace:
+    return value if isinstance(value, Namespace) else Namespace.parse(value)
+
+
+def content_hash(text: str) -> str:
+    """Stable 128-bit hash of a chunk text; equal texts share one stored vector."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class NamespacedResult:
+    score: float
+    content_hash: str
+    # (namespace, refid) pairs sharing this content, restricted to the searched namespaces.
+    members: List[Tuple[Namespace, str]] = field(default_factory=list)
+
+    @property
+    def id(self) -> str:
+        return self.members[0][1]
+
+    @property
+    def namespaces(self) -> List[Namespace]:
+        return [namespace for namespace, _ in self.members]
+
+
+class NamespacedIndex:
+    """
+    Serves several corpora and versions from one vector store without duplicating shared chunks.
+
+    Vectors are keyed by the content hash of the chunk text, so an element
+    unchanged between two releases is embedded and stored once; each
+    (corpus, version) namespace only keeps a refid -> content hash map and
+    the per-namespace metadata. Chunks are assigned to a namespace through
+    their "corpus"/"version" metadata (see `CodeChunker(corpus=..., version=...)`).
+
+    Searches are scoped to given namespaces or federated across all of them.
+
+    Usage with the indexing pipeline (only new content reaches the embedder):
+        index = NamespacedIndex()
+        build_index(xml_files, CodeChunker(src, corpus="llvm", version="18"),
+                    index.dedup_embed_fn(embed_fn), index)
+    """
+
+    def __init__(self, store: Optional[QuantizedVectorStore] = None):
+        self.store = store if store is not None else QuantizedVectorStore()
+        self._members: Dict[Namespace, Dict[str, str]] = defaultdict(dict)  # namespace -> refid -> hash
+        self._owners: Dict[str, Set[Tuple[Namespace, str]]] = defaultdict(set)  # hash -> (namespace, refid)
+        self._texts: Dict[str, str] = {}
+        self._metadata: Dict[Tuple[Namespace, str], dict] = {}
+
+    def namespaces(self) -> List[Namespace]:
+        return sorted(namespace for namespace, members in self._members.items() if members)
+
+    def __len__(self) -> int:
+        return sum(len(members) for members in self._members.values())
+
+    def ids(self, namespace: Namespace | str) -> List[str]:
+        """The refids stored in one namespace."""
+        return list(self._members.get(_as_namespace(namespace), {}))
+
+    def items(self) -> Iterator[Tuple[Namespace, str, dict]]:
+        """(namespace, refid, metadata) of every stored chunk."""
+        for (namespace, refid), metadata in self._metadata.items():
+            yield namespace, refid, metadata
+
+    def get_chunk(self, namespace: Namespace, refid: str) -> Optional[Chunk]:
+        digest = self._members.get(namespace, {}).get(refid)
+        if digest is None:
+            return None
+        return Chunk(text=self._texts[digest], metadata=dict(self._metadata[(namespace, refid)]))
+
+    def dedup_embed_fn(self, embed_fn: EmbedFn) -> Callable[[List[str]], List[Optional[List[float]]]]:
+        """
+        Wraps `embed_fn` so only texts whose content is not stored yet are embedded.
+
+        The wrapper returns None in place of already-stored embeddings, which
+        `add` accepts; duplicate texts within one batch are embedded once.
+        """
+
+        def embed(texts: List[str]) -> List[Optional[List[float]]]:
+            digests = [content_hash(text) for text in texts]
+            todo: Dict[str, str] = {}
+            for digest, text in zip(digests, texts):
+                if digest not in self.store and digest not in todo:
+                    todo[digest] = text
+            vectors = dict(zip(todo, embed_fn(list(todo.values())))) if todo else {}
+            logger.debug(f"Embedding {len(todo)}/{len(texts)} chunk texts; the rest are already stored.")
+            return [vectors.get(digest) for digest in digests]
+
+        return embed
+
+    def add(self, chunks: List[Chunk], embeddings: Sequence[Optional[Sequence[float]]]) -> None:
+        """
+        ChunkSink interface: upserts chunks into their namespaces.
+
+        Args:
+            chunks: Chunks carrying "id" (and optionally "corpus"/"version") metadata.
+            embeddings: One embedding per chunk, or None where the content is already stored.
+
+        Raises:
+            ValueError: If an embedding is None for content that is not stored.
+        """
+        if len(chunks) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(chunks)} chunks.")
+        new_vectors: Dict[str, Sequence[float]] = {}
+        for chunk, embedding in zip(chunks, embeddings):
+            digest = content_hash(chunk.text)
+            if digest not in self.store and digest not in new_vectors:
+                if embedding is None:
+                    raise ValueError(f"Missing embedding for new content of chunk '{chunk.metadata.get('id')}'.")
+                new_vectors[digest] = embedding
+            self._assign(Namespace.of(chunk), chunk, digest)
+        if new_vectors:
+            self.store.upsert(list(new_vectors), list(new_vectors.values()))
+
+    def index_chunks(self, chunks: List[Chunk], embed_fn: EmbedFn) -> int:
+        """Adds chunks, embedding only unseen content. Returns the number of texts embedded."""
+        embeddings = self.dedup_embed_fn(embed_fn)([chunk.text for chunk in chunks])
+        self.add(chunks, embeddings)
+        return len({content_hash(c.text) for c, e in zip(chunks, embeddings) if e is not None})
+
+    def _assign(self, namespace: Namespace, chunk: Chunk, digest: str) -> None:
+        refid = chunk.metadata["id"]
+        previous = self._members[namespace].get(refid)
+        if previous is not None and previous != digest:
+            self._release(namespace, refid, previous)
+        self._members[namespace][refid] = digest
+        self._owners[digest].add((namespace, refid))
+        self._texts[digest] = chunk.text
+        self._metadata[(namespace, refid)] = chunk.metadata
+
+    def _release(self, namespace: Namespace, refid: str, digest: str) -> None:
+        owners = self._owners[digest]
+        owners.discard((namespace, refid))
+        if not owners:
+            # The vector stays in the store until `compact`; searches skip unowned content.
+            del self._owners[digest]
+            del self._texts[digest]
+
+    def delete(self, refids: Iterable[str], namespace: Namespace | str = DEFAULT_NAMESPACE) -> int:
+        """
+        Removes chunks from one namespace (other namespaces sharing their content keep it).
+
+        Vectors no namespace refers to any more are deleted from the store.
+
+        Returns:
+            The number of chunks removed.
+        """
+        namespace = _as_namespace(namespace)
+        members = self._members.get(namespace, {})
+        removed = 0
+        unowned: List[str] = []
+        for refid in refids:
+            digest = members.pop(refid, None)
+            if digest is None:
+                continue
+            del self._metadata[(namespace, refid)]
+            self._release(namespace, refid, digest)
+            if digest not in self._owners:
+                unowned.append(digest)
+            removed += 1
+        self.store.delete(unowned)
+        return removed
+
+    def remove_namespace(self, namespace: Namespace) -> int:
+        """Drops a namespace (e.g. a retired release). Returns the number of chunks removed."""
+        members = self._members.pop(namespace, {})
+        for refid, digest in members.items():
+            self._release(namespace, refid, digest)
+            del self._metadata[(namespace, refid)]
+        return len(members)
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Purges vectors no namespace refers to any more and compacts the store.
+
+        Returns:
+            The store's reclaimed counts plus the number of purged vectors.
+        """
+        unowned = [digest for digest in self.store.ids() if digest not in self._owners]
+        purged = self.store.delete(unowned)
+        return {"purged": purged, **self.store.compact()}
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int = 10,
+        namespaces: Optional[Iterable[Namespace | str]] = None,
+        ids: Optional[Iterable[str]] = None,
+        **search_kwargs,
+    ) -> List[NamespacedResult]:
+        """
+        Returns the `k` best distinct contents for the query.
+
+        Args:
+            query: The query embedding.
+            k: Number of results.
+            namespaces: Namespaces (or 'corpus@version' strings) to search;
+                        None federates across all of them.
+            ids: Refids to restrict the search to (e.g. the children of summary hits).
+            **search_kwargs: Passed to `QuantizedVectorStore.search` (rescore, oversample).
+
+        Returns:
+            NamespacedResult objects sorted by descending score; each lists the
+            searched namespaces containing that content.
+        """
+        selected = None if namespaces is None else {_as_namespace(ns) for ns in namespaces}
+        wanted = None if ids is None else set(ids)
+        if wanted is not None:
+            allowed = {
+                members[refid]
+                for ns, members in self._members.items() if selected is None or ns in selected
+                for refid in wanted if refid in members
+            }
+        elif selected is None:
+            allowed = list(self._owners) if len(self._owners) < len(self.store) else None
+        else:
+            allowed = {digest for ns in selected for digest in self._members.get(ns, {}).values()}
+
+        results = []
+        for hit in self.store.search(query, k, allowed_ids=allowed, **search_kwargs):
+            members = sorted(
+                (namespace, refid) for namespace, refid in self._owners.get(hit.id, ())
+                if (selected is None or namespace in selected) and (wanted is None or refid in wanted)
+            )
+            if members:
+                results.append(NamespacedResult(score=hit.score, content_hash=hit.id, members=members))
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        chunks = len(self)
+        unique = len(self._owners)
+        return {
+            "namespaces": [str(ns) for ns in self.namespaces()],
+            "chunks": chunks,
+            "unique_contents": unique,
+            "stored_vectors": len(self.store),
+            "dedup_ratio": chunks / unique if unique else 0.0,
+        }
@@ -0,0 +1,59 @@
+# src/codiculum/vector_store/quantization.py
+"""Compact embedding encodings: Matryoshka truncation, int8 and binary quantization."""
+
+import math
+from array import array
+from operator import mul
+from typing import Optional, Sequence, Tuple
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+
+def normalize(vector: Sequence[float]) -> array:
+    """Returns the L2-normalized vector as float32."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return array("f", vector)
+    return array("f", (x / norm for x in vector))
+
+
+def truncate(vector: Sequence[float], dim: Optional[int]) -> array:
+    """
+    Matryoshka-style truncation: keeps the first `dim` components and re-normalizes.
+
+    Only meaningful for models trained with Matryoshka representation learning
+    (e.g. OpenAI text-embedding-3-*), whose leading dimensions carry most of the signal.
+    """
+    if dim is not None and dim < len(vector):
+        vector = vector[:dim]
+    return normalize(vector)
+
+
+def quantize_int8(vector: Sequence[float]) -> Tuple[array, float]:
+    """Symmetric per-vector scalar quantization to int8. Returns (codes, scale)."""
+    peak = max((abs(x) for x in vector), default=0.0)
+    scale = peak / 127 if peak else 1.0
+    return array("b", (round(x / scale) for x in vector)), scale
+
+
+def int8_score(query: Sequence[float], codes: array, scale: float) -> float:
+    """Asymmetric dot product between a float query and an int8-coded vector."""
+    return scale * sum(map(mul, query, codes))
+
+
+def quantize_binary(vector: Sequence[float]) -> int:
+    """Packs the sign bits of the vector into an int (bit i set when component i > 0)."""
+    bits = 0
+    for i, x in enumerate(vector):
+        if x > 0:
+            bits |= 1 << i
+    return bits
+
+
+def binary_score(query_bits: int, bits: int, dim: int) -> float:
+    """Hamming similarity mapped to [-1, 1] (an approximation of cosine similarity)."""
+    return 1.0 - 2.0 * (query_bits ^ bits).bit_count() / dim
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(map(mul, a, b))
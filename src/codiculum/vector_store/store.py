@@ -0,0 +1,409 @@
+# src/codiculum/vector_store/store.py
+import heapq
+import logging
+import math
+import os
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..chunker.models import Chunk
+from .quantization import (
+    QUANTIZATIONS,
+    binary_score,
+    dot,
+    int8_score,
+    normalize,
+    quantize_binary,
+    quantize_int8,
+    truncate,
+)
+
+logger = logging.getLogger(__name__)
+
+_FLOAT32_BYTES = 4
+# Slots scanned between two checks of a search's cancellation event.
+_CANCEL_CHECK_INTERVAL = 4096
+
+
+class SearchCancelled(Exception):
+    """Raised by a search whose cancellation event was set (e.g. the request timed out)."""
+
+
+@dataclass
+class SearchResult:
+    id: str
+    score: float
+
+
+@dataclass
+class QuantizationReport:
+    quantization: str
+    dim: int
+    search_dim: int
+    count: int
+    k: int
+    compact_bytes: int
+    full_precision_bytes: int
+    recall_compact: float  # recall@k of the compact search alone
+    recall_rescored: float  # recall@k after exact re-scoring of the candidates
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.full_precision_bytes / self.compact_bytes if self.compact_bytes else 0.0
+
+
+class _FullPrecisionFile:
+    """Append-only float32 vector file used to re-score candidates without keeping them in RAM."""
+
+    def __init__(self, path: str | Path, dim: int):
+        self.path = Path(path)
+        self.dim = dim
+        self._record_bytes = dim * _FLOAT32_BYTES
+        self._file = open(self.path, "a+b")
+
+    def append(self, vector: array) -> int:
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        vector.tofile(self._file)
+        return offset
+
+    def size(self) -> int:
+        self._file.flush()
+        return os.fstat(self._file.fileno()).st_size
+
+    def read(self, offset: int) -> array:
+        self._file.flush()
+        self._file.seek(offset)
+        vector = array("f")
+        vector.frombytes(self._file.read(self._record_bytes))
+        return vector
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class QuantizedVectorStore:
+    """
+    Vector store that searches compact embeddings and optionally re-scores exactly.
+
+    Vectors are keyed by the Doxygen refid used in `Chunk.metadata["id"]`.
+    Each embedding is L2-normalized, optionally truncated to `truncate_dim`
+    leading components (Matryoshka), and encoded as:
+    - "none": float32 (4 bytes/dim)
+    - "int8": int8 codes plus a per-vector scale (~1 byte/dim, 4x smaller)
+    - "binary": sign bits (1 bit/dim, 32x smaller)
+
+    Search is a pure-Python linear scan over the compact codes of every
+    stored vector (no ANN structure), so latency grows with the store size.
+    By default only the compact codes are kept. Re-scoring re-ranks the best
+    `k * oversample` candidates by exact cosine similarity against
+    full-precision vectors, kept on disk with `rescore_path` or in RAM with
+    `keep_full_precision` (where they count towards `memory_bytes()`).
+    """
+
+    def __init__(
+        self,
+        quantization: str = "int8",
+        truncate_dim: Optional[int] = None,
+        rescore_path: Optional[str | Path] = None,
+        keep_full_precision: bool = False,
+    ):
+        """
+        Args:
+            quantization: One of "none", "int8" or "binary".
+            truncate_dim: Number of leading dimensions kept for the compact form.
+            rescore_path: File for full-precision vectors used by re-scoring.
+            keep_full_precision: Keep full-precision vectors in memory for re-scoring when no
+                                 rescore_path is given. Without either, re-scoring is disabled
+                                 and only the compact codes are held in RAM.
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+        if truncate_dim is not None and truncate_dim <= 0:
+            raise ValueError("truncate_dim must be positive.")
+        self.quantization = quantization
+        self.truncate_dim = truncate_dim
+        self.dim: Optional[int] = None
+        self._rescore_path = Path(rescore_path) if rescore_path else None
+        self._keep_full_precision = keep_full_precision or self._rescore_path is not None
+
+        self._ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._codes: List = []  # array('f'), array('b') or int per slot
+        self._scales = array("f")  # int8 only
+        self._full: List = []  # array('f') in memory, or file offsets
+        self._full_file: Optional[_FullPrecisionFile] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._slots
+
+    @property
+    def search_dim(self) -> int:
+        if self.dim is None:
+            return 0
+        return min(self.truncate_dim or self.dim, self.dim)
+
+    @property
+    def can_rescore(self) -> bool:
+        return self._keep_full_precision
+
+    def _encode(self, vector: Sequence[float]):
+        compact = truncate(vector, self.truncate_dim)
+        if self.quantization == "int8":
+            return quantize_int8(compact)
+        if self.quantization == "binary":
+            return quantize_binary(compact), None
+        return compact, None
+
+    def _store_full(self, vector: array):
+        if self._rescore_path is not None:
+            if self._full_file is None:
+                self._full_file = _FullPrecisionFile(self._rescore_path, self.dim)
+            return self._full_file.append(vector)
+        return vector if self._keep_full_precision else None
+
+    def _load_full(self, slot: int) -> array:
+        entry = self._full[slot]
+        return self._full_file.read(entry) if self._full_file is not None else entry
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """
+        Inserts or replaces vectors by id.
+
+        Raises:
+            ValueError: If ids and embeddings are misaligned or dimensions differ.
+        """
+        if len(ids) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(ids)} ids.")
+        for item_id, embedding in zip(ids, embeddings):
+            if self.dim is None:
+                self.dim = len(embedding)
+            elif len(embedding) != self.dim:
+                raise ValueError(f"Expected embedding of size {self.dim} for '{item_id}', got {len(embedding)}.")
+            code, scale = self._encode(embedding)
+            full = self._store_full(normalize(embedding))
+            slot = self._slots.get(item_id)
+            if slot is None:
+                slot = len(self._ids)
+                self._slots[item_id] = slot
+                self._ids.append(item_id)
+                self._codes.append(code)
+                self._scales.append(scale or 0.0)
+                self._full.append(full)
+            else:
+                self._codes[slot] = code
+                self._scales[slot] = scale or 0.0
+                self._full[slot] = full
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        """ChunkSink interface: upserts chunk embeddings keyed by `chunk.metadata["id"]`."""
+        self.upsert([chunk.metadata["id"] for chunk in chunks], embeddings)
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Removes vectors by id. Returns the number of ids that were present.
+
+        Deleted slots are unlinked from the id map, so searches skip them
+        immediately, and their vectors are released; the slot entries
+        themselves (id, scale) stay until the store is rebuilt.
+        """
+        removed = 0
+        for item_id in ids:
+            slot = self._slots.pop(item_id, None)
+            if slot is not None:
+                removed += 1
+                self._codes[slot] = None
+                self._full[slot] = None
+        return removed
+
+    def ids(self) -> List[str]:
+        """The ids of all live vectors."""
+        return list(self._slots)
+
+    @property
+    def dead_slots(self) -> int:
+        """Slots left behind by `delete` until the next `compact`."""
+        return len(self._ids) - len(self._slots)
+
+    def disk_bytes(self) -> int:
+        """Size of the full-precision re-scoring file (0 if vectors are kept in memory)."""
+        return self._full_file.size() if self._full_file is not None else 0
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Rebuilds the slot arrays without deleted slots, and rewrites the
+        re-scoring file without deleted or overwritten vectors.
+
+        Search results are unchanged; scans touch only live slots afterwards.
+        Not thread-safe: callers serving searches must hold their index lock.
+
+        Returns:
+            The number of slots and re-scoring file bytes reclaimed.
+        """
+        dead = self.dead_slots
+        disk_before = self.disk_bytes()
+        live = sorted(self._slots.values())
+        self._ids = [self._ids[slot] for slot in live]
+        self._codes = [self._codes[slot] for slot in live]
+        self._scales = array("f", (self._scales[slot] for slot in live))
+        if self._full_file is not None:
+            vectors = (self._full_file.read(self._full[slot]) for slot in live)
+            tmp_path = self._full_file.path.with_name(self._full_file.path.name + ".compact")
+            with open(tmp_path, "wb") as f:
+                offsets = []
+                for vector in vectors:
+                    offsets.append(f.tell())
+                    vector.tofile(f)
+            self._full_file.close()
+            os.replace(tmp_path, self._full_file.path)
+            self._full_file = _FullPrecisionFile(self._full_file.path, self.dim)
+            self._full = offsets
+        else:
+            self._full = [self._full[slot] for slot in live]
+        self._slots = {item_id: slot for slot, item_id in enumerate(self._ids)}
+
+        reclaimed = {"slots": dead, "disk_bytes": disk_before - self.disk_bytes()}
+        logger.info(f"Compacted vector store: reclaimed {reclaimed['slots']} slots, {reclaimed['disk_bytes']} file bytes.")
+        return reclaimed
+
+    def _compact_scores(self, query: Sequence[float], slots: Iterable[int]):
+        compact_query = truncate(query, self.truncate_dim)
+        if self.quantization == "int8":
+            for slot in slots:
+                yield int8_score(compact_query, self._codes[slot], self._scales[slot]), slot
+        elif self.quantization == "binary":
+            query_bits = quantize_binary(compact_query)
+            search_dim = self.search_dim
+            for slot in slots:
+                yield binary_score(query_bits, self._codes[slot], search_dim), slot
+        else:
+            for slot in slots:
+                yield dot(compact_query, self._codes[slot]), slot
+
+    def _live_slots(self, allowed_ids: Optional[Iterable[str]]) -> Iterable[int]:
+        if allowed_ids is None:
+            return self._slots.values()
+        return [self._slots[item_id] for item_id in allowed_ids if item_id in self._slots]
+
+    @staticmethod
+    def _until_cancelled(slots: Iterable[int], cancelled: threading.Event) -> Iterator[int]:
+        for n, slot in enumerate(slots):
+            if n % _CANCEL_CHECK_INTERVAL == 0 and cancelled.is_set():
+                raise SearchCancelled()
+            yield slot
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int = 10,
+        rescore: bool = True,
+        oversample: int = 4,
+        allowed_ids: Optional[Iterable[str]] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> List[SearchResult]:
+        """
+        Returns the `k` most similar ids to the query embedding.
+
+        Args:
+            query: The full-dimension query embedding.
+            k: Number of results.
+            rescore: Re-rank the compact top `k * oversample` by exact cosine
+                     similarity (ignored if full-precision vectors are not kept).
+            oversample: Candidate multiplier used when re-scoring.
+            allowed_ids: Restrict the search to these ids (e.g. the children
+                         of first-stage summary hits).
+            cancelled: Optional event checked during the scan; once set, the
+                       search stops (e.g. its caller timed out).
+
+        Returns:
+            SearchResult objects sorted by descending score.
+
+        Raises:
+            SearchCancelled: If `cancelled` was set before the search finished.
+        """
+        if k <= 0 or not self._slots:
+            return []
+        if len(query) != self.dim:
+            raise ValueError(f"Expected query of size {self.dim}, got {len(query)}.")
+
+        rescore = rescore and self.can_rescore
+        n_candidates = k * max(oversample, 1) if rescore else k
+        slots = self._live_slots(allowed_ids)
+        if cancelled is not None:
+            slots = self._until_cancelled(slots, cancelled)
+        candidates = heapq.nlargest(n_candidates, self._compact_scores(query, slots))
+
+        if rescore:
+            full_query = normalize(query)
+            candidates = heapq.nlargest(k, ((dot(full_query, self._load_full(slot)), slot) for _, slot in candidates))
+        return [SearchResult(id=self._ids[slot], score=score) for score, slot in candidates[:k]]
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes of vector data held in RAM: the compact codes plus any in-memory full vectors."""
+        per_vector = {
+            "none": self.search_dim * _FLOAT32_BYTES,
+            "int8": self.search_dim + _FLOAT32_BYTES,
+            "binary": math.ceil(self.search_dim / 8),
+        }[self.quantization]
+        if self._keep_full_precision and self._rescore_path is None:
+            per_vector += (self.dim or 0) * _FLOAT32_BYTES
+        return per_vector * len(self)
+
+    def full_precision_bytes(self) -> int:
+        """Bytes the same vectors would take as full-dimension float32."""
+        return (self.dim or 0) * _FLOAT32_BYTES * len(self)
+
+    def recall_report(self, queries: Sequence[Sequence[float]], k: int = 10, oversample: int = 4) -> QuantizationReport:
+        """
+        Measures the recall cost of the compact encoding against exact search.
+
+        Exact top-k results are computed by brute force over the full-precision
+        vectors, so the store must keep them (`keep_full_precision` or `rescore_path`).
+
+        Args:
+            queries: Query embeddings to evaluate (e.g. a sample of stored embeddings).
+            k: Cut-off for recall@k.
+            oversample: Candidate multiplier used for the re-scored run.
+
+        Returns:
+            A QuantizationReport with recall and memory figures.
+        """
+        if not self.can_rescore:
+            raise ValueError("recall_report needs full-precision vectors; enable keep_full_precision or rescore_path.")
+        compact_hits = rescored_hits = total = 0
+        for query in queries:
+            full_query = normalize(query)
+            exact = {
+                self._ids[slot]
+                for _, slot in heapq.nlargest(k, ((dot(full_query, self._load_full(s)), s) for s in self._slots.values()))
+            }
+            total += len(exact)
+            compact_hits += len(exact & {r.id for r in self.search(query, k, rescore=False)})
+            rescored_hits += len(exact & {r.id for r in self.search(query, k, rescore=True, oversample=oversample)})
+
+        report = QuantizationReport(
+            quantization=self.quantization,
+            dim=self.dim or 0,
+            search_dim=self.search_dim,
+            count=len(self),
+            k=k,
+            compact_bytes=self.memory_bytes(),
+            full_precision_bytes=self.full_precision_bytes(),
+            recall_compact=compact_hits / total if total else 0.0,
+            recall_rescored=rescored_hits / total if total else 0.0,
+        )
+        logger.info(
+            f"{report.quantization} (dim {report.search_dim}/{report.dim}): {report.compression_ratio:.1f}x smaller, "
+            f"recall@{k} {report.recall_compact:.3f} compact / {report.recall_rescored:.3f} re-scored"
+        )
+        return report
+
+    def close(self) -> None:
+        if self._full_file is not None:
+            self._full_file.close()
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+from codiculum.chunker import Chunk, CompressedChunkStore
+from codiculum.chunker.doc_store import ZLIB_MAX_DICT_SIZE, build_zlib_dictionary
+
+LICENSE = (
+    "//===----------------------------------------------------------------------===//\n"
+    "// Part of the LLVM Project, under the Apache License v2.0 with LLVM Exceptions.\n"
+    "// See https://llvm.org/LICENSE.txt for license information.\n"
+)
+
+
+def _chunk(i: int) -> Chunk:
+    text = (
+        f"File: llvm/include/llvm/ADT/Thing{i % 7}.h\n"
+        f"{LICENSE}"
+        "template <typename T, typename Allocator = std::allocator<T>>\n"
+        f"class Thing{i} : public ThingBase<Thing{i}> {{\n"
+        "public:\n"
+        "  using value_type = T;\n"
+        f"  void process{i}(const T &Value, unsigned Flags = 0);\n"
+        "};\n"
+    )
+    metadata = {"id": f"classThing{i}", "name": f"Thing{i}", "kind": "class", "file_path": f"Thing{i % 7}.h"}
+    return Chunk(text=text, metadata=metadata)
+
+
+CHUNKS = [_chunk(i) for i in range(300)]
+
+
+def test_roundtrip_and_compression(tmp_path: Path):
+    with CompressedChunkStore(tmp_path / "chunks.db") as store:
+        assert store.train(CHUNKS[:100]) > 0
+        store.put_many(CHUNKS)
+        assert len(store) == len(CHUNKS)
+        for chunk in (CHUNKS[0], CHUNKS[123], CHUNKS[-1]):
+            assert store.get(chunk.metadata["id"]) == chunk
+        stats = store.stats()
+    assert stats["compression_ratio"] > 3
+
+
+def test_dictionary_beats_plain_per_chunk_compression(tmp_path: Path):
+    with CompressedChunkStore(tmp_path / "plain.db") as plain:
+        plain.put_many(CHUNKS)
+        plain_bytes = plain.stats()["stored_bytes"]
+    with CompressedChunkStore(tmp_path / "dict.db") as trained:
+        trained.train(CHUNKS[:100])
+        trained.put_many(CHUNKS)
+        assert trained.stats()["stored_bytes"] < plain_bytes / 2
+
+
+def test_reopen_keeps_dictionary_and_codec(tmp_path: Path):
+    path = tmp_path / "chunks.db"
+    with CompressedChunkStore(path) as store:
+        store.train(CHUNKS[:50])
+        store.put_many(CHUNKS[:10])
+        dictionary = store.dictionary
+    with CompressedChunkStore(path, codec="zstd") as store:
+        assert store.codec == "zlib"
+        assert store.dictionary == dictionary
+        assert store["classThing3"] == CHUNKS[3]
+        with pytest.raises(ValueError):
+            store.train(CHUNKS)
+
+
+def test_text_with_nul_bytes_roundtrips(tmp_path: Path):
+    chunk = Chunk(text='const char Sep[] = "a\0b";\0', metadata={"id": "varSep", "note": "x\0y"})
+    with CompressedChunkStore(tmp_path / "chunks.db", cache_size=0) as store:
+        store.put_many([chunk])
+        assert store["varSep"] == chunk
+
+
+def test_lru_cache_and_updates(tmp_path: Path):
+    with CompressedChunkStore(tmp_path / "chunks.db", cache_size=2) as store:
+        store.put_many(CHUNKS[:3])
+        store.get("classThing0")
+        assert store.get("classThing0") is store.get("classThing0")
+        store.get("classThing1")
+        store.get("classThing2")  # evicts classThing0
+        hits = store.cache_hits
+        store.get("classThing0")
+        assert store.cache_hits == hits
+
+        updated = Chunk(text="changed", metadata={"id": "classThing2"})
+        store.put_many([updated])
+        assert store.get("classThing2") == updated
+
+        assert store.delete(["classThing2", "missing"]) == 1
+        assert store.get("classThing2") is None
+        assert "classThing2" not in store
+        with pytest.raises(KeyError):
+            store["classThing2"]
+
+
+def test_zlib_dictionary_is_bounded():
+    records = [f"{LICENSE}line {i}\n".encode() for i in range(20)] * 2000
+    dictionary = build_zlib_dictionary(records, dict_size=10**6)
+    assert 0 < len(dictionary) <= ZLIB_MAX_DICT_SIZE
+    assert LICENSE.encode().split(b"\n")[1] in dictionary
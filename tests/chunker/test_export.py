@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from codiculum.chunker import Chunk, ChunkWriter, open_chunk_table, read_chunk_batches
+
+CHUNKS = [
+    Chunk(
+        text=f"File: a.h\n\nCode:\n```cpp\nint f{i}();\n```",
+        metadata={
+            "id": f"func_{i}",
+            "name": f"f{i}",
+            "kind": "function",
+            "file_path": "a.h",
+            "start_line": i + 1,
+            "end_line": i + 1,
+            "brief_description": "",
+            "detailed_description": "",
+            "template_params": "",
+        },
+    )
+    for i in range(5)
+] + [
+    Chunk(
+        text="File: a.h\nContains 5 elements:",
+        metadata={"id": "file:a.h", "name": "a.h", "kind": "file_summary", "file_path": "a.h",
+                  "children": [f"func_{i}" for i in range(5)]},
+    )
+]
+EMBEDDINGS = [[float(i), 0.5, -1.0] for i in range(len(CHUNKS))]
+
+
+def _roundtrip(path: Path, embeddings=EMBEDDINGS):
+    with ChunkWriter(path) as writer:
+        writer.write_batch(CHUNKS[:4], embeddings[:4] if embeddings else None)
+        writer.write_batch(CHUNKS[4:], embeddings[4:] if embeddings else None)
+    chunks, vectors = [], []
+    for batch_chunks, batch_embeddings in read_chunk_batches(path, batch_size=4):
+        assert len(batch_chunks) <= 4
+        chunks.extend(batch_chunks)
+        vectors.extend(batch_embeddings or [])
+    return chunks, vectors
+
+
+def test_jsonl_roundtrip(tmp_path: Path):
+    chunks, vectors = _roundtrip(tmp_path / "chunks.jsonl")
+    assert chunks == CHUNKS
+    assert vectors == EMBEDDINGS
+
+
+def test_jsonl_without_embeddings(tmp_path: Path):
+    chunks, vectors = _roundtrip(tmp_path / "chunks.jsonl", embeddings=None)
+    assert chunks == CHUNKS
+    assert vectors == []
+
+
+def test_unknown_format(tmp_path: Path):
+    with pytest.raises(ValueError):
+        ChunkWriter(tmp_path / "chunks.csv")
+
+
+@pytest.mark.parametrize("file_name", ["chunks.arrow", "chunks.parquet"])
+def test_arrow_roundtrip(tmp_path: Path, file_name: str):
+    pa = pytest.importorskip("pyarrow")
+    chunks, vectors = _roundtrip(tmp_path / file_name)
+    assert chunks == CHUNKS
+    assert vectors == EMBEDDINGS  # Values are exactly representable in float32.
+
+    table = open_chunk_table(tmp_path / file_name)
+    assert table.num_rows == len(CHUNKS)
+    assert table.schema.field("embedding").type == pa.list_(pa.float32(), 3)
+
+
+def test_arrow_rejects_wrong_embedding_size(tmp_path: Path):
+    pytest.importorskip("pyarrow")
+    with ChunkWriter(tmp_path / "chunks.arrow", embedding_dim=3) as writer:
+        with pytest.raises(ValueError):
+            writer.write_batch(CHUNKS[:1], [[1.0, 2.0]])
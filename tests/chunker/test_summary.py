@@ -0,0 +1,108 @@
+from pathlib import Path
+
+from codiculum.chunker import CodeChunker, SummaryBuilder, build_summary_chunks, expand_summary_hits
+from codiculum.doxygen_parser.models import CodeElement, CodeLocation
+
+ELEMENTS = [
+    CodeElement(
+        id="classllvm_1_1Function",
+        name="llvm::Function",
+        kind="class",
+        language="C++",
+        brief_description="A function in the IR.",
+        location=CodeLocation(file="llvm/IR/Function.h", start_line=2, end_line=3),
+    ),
+    CodeElement(
+        id="classllvm_1_1Argument",
+        name="llvm::Argument",
+        kind="class",
+        language="C++",
+        location=CodeLocation(file="llvm/IR/Function.h", start_line=5, end_line=6),
+    ),
+    CodeElement(
+        id="classmlir_1_1Operation",
+        name="mlir::Operation",
+        kind="class",
+        language="C++",
+        brief_description="Operation is the basic unit of execution.",
+        location=CodeLocation(file="mlir/IR/Operation.h", start_line=1, end_line=2),
+    ),
+]
+
+
+def test_build_summary_chunks_links_children():
+    summaries = build_summary_chunks(ELEMENTS)
+    by_id = {chunk.metadata["id"]: chunk for chunk in summaries}
+
+    assert set(by_id) == {
+        "file:llvm/IR/Function.h",
+        "file:mlir/IR/Operation.h",
+        "namespace:llvm",
+        "namespace:mlir",
+    }
+    file_summary = by_id["file:llvm/IR/Function.h"]
+    assert file_summary.metadata["kind"] == "file_summary"
+    assert file_summary.metadata["children"] == ["classllvm_1_1Function", "classllvm_1_1Argument"]
+    assert "File: llvm/IR/Function.h" in file_summary.text
+    assert "- class llvm::Function: A function in the IR." in file_summary.text
+    assert "- class llvm::Argument" in file_summary.text
+
+    ns_summary = by_id["namespace:mlir"]
+    assert ns_summary.metadata["kind"] == "namespace_summary"
+    assert ns_summary.metadata["file_path"] == "mlir/IR/Operation.h"
+    assert ns_summary.metadata["children"] == ["classmlir_1_1Operation"]
+
+
+def test_build_summary_chunks_truncates_listing():
+    summaries = build_summary_chunks(ELEMENTS[:2], max_chars=60)
+    file_summary = summaries[0]
+    assert "... and" in file_summary.text
+    # Children are still fully linked even when the text listing is cut.
+    assert len(file_summary.metadata["children"]) == 2
+
+
+def test_expand_summary_hits():
+    summaries = build_summary_chunks(ELEMENTS)
+    assert expand_summary_hits(summaries, ["namespace:llvm"]) == {
+        "classllvm_1_1Function",
+        "classllvm_1_1Argument",
+    }
+    assert expand_summary_hits(summaries, ["unknown"]) == set()
+
+
+def test_chunker_include_summaries(tmp_path: Path):
+    source = tmp_path / "llvm" / "IR" / "Function.h"
+    source.parent.mkdir(parents=True)
+    source.write_text("// header\nclass Function {\n};\n\nclass Argument {\n};\n")
+
+    chunker = CodeChunker(src_base_path=tmp_path)
+    chunks = chunker.chunk(ELEMENTS, include_summaries=True)
+
+    kinds = [chunk.metadata["kind"] for chunk in chunks]
+    assert kinds == ["class", "class", "file_summary", "namespace_summary"]
+    # mlir::Operation has no source file, so it is not summarized either.
+    assert chunks[2].metadata["children"] == ["classllvm_1_1Function", "classllvm_1_1Argument"]
+
+
+def test_summary_builder_merges_files_and_labels_class_scopes():
+    nested = CodeElement(
+        id="classllvm_1_1Function_1_1Helper",
+        name="llvm::Function::Helper",
+        kind="class",
+        language="C++",
+        location=CodeLocation(file="llvm/IR/Helper.h", start_line=1, end_line=2),
+    )
+    builder = SummaryBuilder()
+    # One XML file at a time, as the index pipeline feeds it.
+    builder.add([ELEMENTS[0]])
+    builder.add([nested])
+    builder.add([ELEMENTS[1]])
+    by_id = {chunk.metadata["id"]: chunk for chunk in builder.chunks()}
+
+    assert by_id["namespace:llvm"].metadata["children"] == ["classllvm_1_1Function", "classllvm_1_1Argument"]
+    assert by_id["namespace:llvm"].metadata["file_path"] == "llvm/IR/Function.h"
+    scope = by_id["class:llvm::Function"]
+    assert scope.metadata["kind"] == "class_summary"
+    assert scope.text.startswith("Class: llvm::Function")
+    assert scope.metadata["children"] == ["classllvm_1_1Function_1_1Helper"]
+    assert "namespace:llvm::Function" not in by_id
@@ -0,0 +1,112 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from codiculum.chunker import CodeChunker
+from codiculum.doxygen_parser import BulkParser, Quarantine, parse_doxygen_xml_file, read_doxygen_xml_file
+from codiculum.indexing import build_index
+
+CLASS = """  <compounddef id="classns_1_1C{n}" kind="class" language="C++">
+    <compoundname>ns::C{n}</compoundname>
+    <briefdescription><para>Class {n}.</para></briefdescription>
+    <detaileddescription><para>{detail}</para></detaileddescription>
+    <location file="c.h" line="{n}" bodyfile="c.h" bodystart="{n}" bodyend="{n}"/>
+  </compounddef>
+"""
+
+
+def _xml(path: Path, classes, detail: str = "Details.") -> Path:
+    path.write_text("<doxygen>\n" + "".join(CLASS.format(n=n, detail=detail) for n in classes) + "</doxygen>\n")
+    return path
+
+
+@pytest.fixture
+def files(tmp_path: Path):
+    good = _xml(tmp_path / "good.xml", [1, 2])
+    truncated = tmp_path / "truncated.xml"
+    truncated.write_text(_xml(tmp_path / "tmp.xml", [3, 4]).read_text()[:-60])
+    garbage = tmp_path / "garbage.xml"
+    garbage.write_bytes(b"\x00\x01 not xml at all")
+    return good, truncated, garbage, tmp_path / "missing.xml"
+
+
+def test_huge_text_nodes_are_parsed(tmp_path: Path):
+    path = _xml(tmp_path / "huge.xml", [1], detail="x" * 11_000_000)  # Beyond libxml2's 10 MB text limit.
+    (element,) = read_doxygen_xml_file(str(path))
+    assert len(element.detailed_description) == 11_000_000
+    assert len(parse_doxygen_xml_file(str(path))) == 1
+
+
+def test_failures_are_quarantined_and_retried(files, tmp_path: Path):
+    good, truncated, garbage, missing = files
+    quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+    with BulkParser(workers=2, timeout=30, quarantine=quarantine) as parser:
+        results = dict(parser.parse_many([good, truncated, garbage, missing]))
+        assert [e.name for e in results[str(good)]] == ["ns::C1", "ns::C2"]
+        assert [e.name for e in results[str(truncated)]] == ["ns::C3"]  # Recovered up to the damage.
+        assert results[str(garbage)] == [] and results[str(missing)] == []
+        assert parser.stats.parsed == 2 and parser.stats.recovered == 1
+        assert parser.stats.failed == {"syntax": 1, "io": 1}
+
+        reloaded = Quarantine(tmp_path / "quarantine.jsonl")
+        assert [(f.xml_file, f.kind) for f in reloaded.entries()] == [(str(garbage), "syntax"), (str(missing), "io")]
+
+        _xml(missing, [5])
+        assert dict(parser.retry_quarantined()) == {str(missing): parser.parse_file(missing)}
+        assert str(missing) not in quarantine and quarantine.get(str(garbage)).attempts == 2
+        assert parser.stats.resolved == 1
+        assert list(parser.retry_quarantined(max_attempts=2)) == []
+
+
+def test_dead_idle_worker_is_replaced(files, tmp_path: Path):
+    good = files[0]
+    quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+    with BulkParser(workers=1, quarantine=quarantine) as parser:
+        assert len(parser(good)) == 2
+        (worker,) = parser._idle.queue
+        worker.process.kill()  # E.g. OOM-killed while idle.
+        worker.process.join(5)
+        assert len(parser(good)) == 2
+        assert len(quarantine) == 0 and parser.stats.failed == {}
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_timeout_replaces_the_stuck_worker(files, tmp_path: Path):
+    good = files[0]
+    stuck = tmp_path / "stuck.xml"
+    os.mkfifo(stuck)  # Opening it blocks forever: no writer.
+    quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+    with BulkParser(workers=1, timeout=0.5, quarantine=quarantine) as parser:
+        assert parser(stuck) == []
+        assert quarantine.get(str(stuck)).kind == "timeout"
+        assert len(parser(good)) == 2
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs Linux address-space accounting")
+def test_memory_cap(tmp_path: Path):
+    path = _xml(tmp_path / "big.xml", [1], detail="y" * 60_000_000)
+    with open("/proc/self/statm") as f:
+        address_space = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+    # Forked workers start from this process's address space, which the cap is computed from.
+    parser = BulkParser(workers=1, memory_limit=address_space + 40 * 2**20, quarantine=quarantine, mp_context="fork")
+    with parser:
+        assert parser(path) == []
+    assert quarantine.get(str(path)).kind in ("memory", "crash")
+
+
+def test_bulk_parser_as_pipeline_parse_fn(files, tmp_path: Path):
+    good, truncated, garbage, _ = files
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "c.h").write_text("\n".join(f"class C{n} {{}};" for n in range(1, 6)) + "\n")
+    ids = []
+    sink = type("Sink", (), {"add": lambda self, chunks, embeddings: ids.extend(c.metadata["id"] for c in chunks)})()
+    quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+    with BulkParser(workers=2, quarantine=quarantine) as parser:
+        stats = build_index([good, garbage, truncated], CodeChunker(src), lambda texts: [[1.0]] * len(texts), sink,
+                            parse_fn=parser)
+    assert stats.files_processed == 3
+    assert sorted(ids) == ["classns_1_1C1", "classns_1_1C2", "classns_1_1C3"]
+    assert [f.xml_file for f in quarantine.entries()] == [str(garbage)]
@@ -0,0 +1,86 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from codiculum.cli import main
+from codiculum.doxygen_parser import RefidOffsetIndex, scan_element_spans
+
+SAMPLE_XML = Path(__file__).parent / "test_data" / "sample_doxygen.xml"
+
+CLASS = """  <compounddef id="classns_1_1C{n}" kind="class" language="C++">
+    <compoundname>ns::C{n}</compoundname>
+    <briefdescription><para>Class number {n} &lt;T&gt;.</para></briefdescription>
+    <location file="c.h" line="{n}" bodyfile="c.h" bodystart="{n}" bodyend="{n}"/>
+  </compounddef>
+"""
+
+
+@pytest.fixture
+def big_xml(tmp_path: Path) -> Path:
+    path = tmp_path / "namespacens.xml"
+    path.write_text("<doxygen>\n" + "".join(CLASS.format(n=n) for n in range(1, 3001)) + "</doxygen>\n")
+    return path
+
+
+def test_scan_nested_spans():
+    spans = {span.refid: span for span in scan_element_spans(SAMPLE_XML)}
+    assert set(spans) == {"sample_8h", "sample_8h_1a1", "classSampleClass", "classSampleClass_1a2"}
+    assert spans["sample_8h"].tag == "compounddef" and spans["sample_8h"].kind == "file"
+    data = SAMPLE_XML.read_bytes()
+    member = etree.fromstring(data[spans["classSampleClass_1a2"].start:spans["classSampleClass_1a2"].end])
+    assert member.findtext("name") == "sample_method"
+    outer = spans["classSampleClass"]
+    assert outer.start < spans["classSampleClass_1a2"].start < spans["classSampleClass_1a2"].end < outer.end
+
+
+def test_load_single_element(tmp_path: Path, big_xml: Path):
+    with RefidOffsetIndex(tmp_path / "offsets.db") as index:
+        assert index.build([big_xml]) == 1
+        assert len(index) == 3000
+        start = time.perf_counter()
+        element = index.load_element("classns_1_1C2500", corpus="demo")
+        elapsed = time.perf_counter() - start
+        assert element.name == "ns::C2500"
+        assert element.brief_description == "Class number 2500 <T>."
+        assert element.corpus == "demo"
+        assert element.location.start_line == 2500
+        assert elapsed < 0.05
+        assert index.lookup("classns_1_1C2500").size < 400
+        assert index.load_element("missing") is None
+        assert index.build([big_xml]) == 0  # Unchanged files are not re-scanned.
+
+    # The index persists across processes.
+    with RefidOffsetIndex(tmp_path / "offsets.db") as index:
+        assert "classns_1_1C1" in index
+
+
+def test_changed_file_is_rescanned(tmp_path: Path, big_xml: Path):
+    with RefidOffsetIndex(tmp_path / "offsets.db") as index:
+        index.build([big_xml])
+        big_xml.write_text("<doxygen>\n<!-- shifted -->\n" + CLASS.format(n=7) + "</doxygen>\n")
+        assert index.load_element("classns_1_1C7").name == "ns::C7"
+        assert len(index) == 1
+
+
+def test_rewrite_with_same_size_and_mtime_is_detected(tmp_path: Path, big_xml: Path):
+    with RefidOffsetIndex(tmp_path / "offsets.db") as index:
+        index.build([big_xml])
+        st = big_xml.stat()
+        # Swap C1 and C2: same size, mtime restored, so only the span's own id reveals the change.
+        text = big_xml.read_text()
+        first, second = CLASS.format(n=1), CLASS.format(n=2)
+        big_xml.write_text(text.replace(first + second, second + first))
+        os.utime(big_xml, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert index.load_element("classns_1_1C1").name == "ns::C1"
+        assert index.lookup("classns_1_1C1").start > index.lookup("classns_1_1C2").start
+
+
+def test_cli_show(tmp_path: Path, big_xml: Path, capsys):
+    offsets = str(tmp_path / "offsets.db")
+    assert main(["show", "classns_1_1C3", "--xml-dir", str(tmp_path), "--offsets", offsets]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith('<compounddef id="classns_1_1C3"') and "ns::C3<" in out
+    assert main(["show", "nope", "--xml-dir", str(tmp_path), "--offsets", offsets]) == 1
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+from codiculum.chunker import Chunk, ChunkWriter
+from codiculum.cli import main
+from codiculum.embedding import HashingEmbedder
+from codiculum.evaluation import (
+    EvalQuestion,
+    VectorRetriever,
+    evaluate,
+    format_report,
+    generate_questions,
+    load_questions,
+    save_questions,
+)
+from codiculum.vector_store import QuantizedVectorStore
+
+CHUNKS = [
+    Chunk(text="class Function", metadata={"id": "f", "name": "llvm::Function", "kind": "class",
+                                           "brief_description": "A function in the IR."}),
+    Chunk(text="class Operation", metadata={"id": "o", "name": "mlir::Operation", "kind": "class",
+                                            "brief_description": ""}),
+    Chunk(text="summary", metadata={"id": "file:a.h", "name": "a.h", "kind": "file_summary"}),
+]
+
+
+class FixedRetriever:
+    def __init__(self, answers):
+        self.answers = answers
+
+    def search(self, query, k):
+        return self.answers[query][:k]
+
+
+def test_generate_questions_and_roundtrip(tmp_path: Path):
+    questions = generate_questions(CHUNKS)
+    assert questions == [
+        EvalQuestion("Where is llvm::Function defined?", ["f"]),
+        EvalQuestion("Which class a function in the IR?", ["f"]),
+        EvalQuestion("Where is mlir::Operation defined?", ["o"]),
+    ]
+    save_questions(questions, tmp_path / "q.jsonl")
+    assert load_questions(tmp_path / "q.jsonl") == questions
+
+
+def test_recall_and_mrr():
+    questions = [EvalQuestion("a", ["x"]), EvalQuestion("b", ["y"]), EvalQuestion("c", ["z"])]
+    retriever = FixedRetriever({"a": ["x", "q"], "b": ["q", "y"], "c": ["q", "w"]})
+    [report] = evaluate({"fixed": retriever}, questions, k=2)
+    assert report.recall_at_k == pytest.approx(2 / 3)
+    assert report.mrr == pytest.approx((1 + 0.5 + 0) / 3)
+    assert report.index_bytes is None
+    assert report.p50_ms <= report.p95_ms
+
+
+def test_vector_retrievers_side_by_side():
+    embedder = HashingEmbedder(dim=64)
+    retrievers = {}
+    for quantization in ("none", "binary"):
+        store = QuantizedVectorStore(quantization=quantization, keep_full_precision=False)
+        store.add(CHUNKS, embedder([c.text for c in CHUNKS]))
+        retrievers[quantization] = VectorRetriever(store, embedder, rescore=False)
+    reports = evaluate(retrievers, generate_questions(CHUNKS), k=1)
+    assert reports[0].recall_at_k == 1.0
+    assert reports[1].index_bytes * 32 == reports[0].index_bytes
+    table = format_report(reports)
+    assert table.splitlines()[0].split() == ["config", "recall@1", "MRR", "p50", "ms", "p95", "ms", "index", "MB"]
+    assert len(table.splitlines()) == 4
+
+
+def test_cli_evaluate(tmp_path: Path, capsys):
+    with ChunkWriter(tmp_path / "chunks.jsonl") as writer:
+        writer.write_batch(CHUNKS)
+    assert main(["evaluate", str(tmp_path / "chunks.jsonl"), "--k", "1", "--quantization", "none", "int8"]) == 0
+    out = capsys.readouterr().out
+    assert "3 questions over 3 chunks" in out
+    assert "int8/no-rescore" in out
+
+
+def test_cli_evaluate_checks_the_embedding_dimension(tmp_path: Path, capsys):
+    embeddings = HashingEmbedder(dim=8)([c.text for c in CHUNKS])
+    with ChunkWriter(tmp_path / "chunks.jsonl") as writer:
+        writer.write_batch(CHUNKS, embeddings)
+    assert main(["evaluate", str(tmp_path / "chunks.jsonl"), "--k", "1"]) == 1
+    assert "8-dim embeddings" in capsys.readouterr().err
+    assert main(["evaluate", str(tmp_path / "chunks.jsonl"), "--k", "1", "--dim", "8"]) == 0
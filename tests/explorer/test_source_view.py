@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import pytest
+
+from codiculum.explorer import LineIndex, get_source_window
+
+
+@pytest.fixture
+def big_source(tmp_path: Path) -> Path:
+    path = tmp_path / "big.cpp"
+    path.write_text("".join(f"line {n}\n" for n in range(1, 1001)))
+    return path
+
+
+def test_line_index_reads_ranges(big_source: Path):
+    index = LineIndex(big_source)
+    assert index.line_count == 1000
+    assert index.read_lines(1, 2) == ["line 1", "line 2"]
+    assert index.read_lines(999, 2000) == ["line 999", "line 1000"]
+    with pytest.raises(ValueError):
+        index.read_lines(5, 4)
+
+
+def test_line_index_without_trailing_newline(tmp_path: Path):
+    path = tmp_path / "small.cpp"
+    path.write_text("a\r\nb")
+    index = LineIndex(path)
+    assert index.line_count == 2
+    assert index.read_lines(1, 2) == ["a", "b"]
+
+
+def test_window_is_centered_on_chunk(big_source: Path):
+    window = get_source_window(big_source, 500, 509, page_size=50)
+    assert (window.start_line, window.end_line, window.total_lines) == (480, 529, 1000)
+    assert window.lines[20] == "line 500"
+    assert window.numbered_text().splitlines()[0] == "480  line 480"
+
+
+def test_window_paging_and_clamping(big_source: Path):
+    next_page = get_source_window(big_source, 500, 509, page_offset=1, page_size=50)
+    assert next_page.start_line == 530
+    first = get_source_window(big_source, 3, 4, page_size=50)
+    assert first.start_line == 1 and not first.has_previous and first.has_next
+    last = get_source_window(big_source, 990, 1000, page_offset=3, page_size=50)
+    assert (last.start_line, last.end_line) == (951, 1000)
+    assert not last.has_next
+
+
+def test_window_cache_sees_file_changes(big_source: Path):
+    assert get_source_window(big_source, 1, 1, page_size=10).total_lines == 1000
+    big_source.write_text("only line\n")
+    assert get_source_window(big_source, 1, 1, page_size=10).lines == ["only line"]
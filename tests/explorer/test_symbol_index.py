@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from codiculum.doxygen_parser.models import CodeElement
+from codiculum.explorer import SymbolIndex
+
+INDEX_XML = """<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygenindex version="1.9.1">
+  <compound refid="classllvm_1_1Function" kind="class"><name>llvm::Function</name>
+    <member refid="classllvm_1_1Function_1a01" kind="function"><name>getEntryBlock</name></member>
+    <member refid="classllvm_1_1Function_1a02" kind="function"><name>arg_size</name></member>
+  </compound>
+  <compound refid="classllvm_1_1FunctionPass" kind="class"><name>llvm::FunctionPass</name></compound>
+  <compound refid="classmlir_1_1Operation" kind="class"><name>mlir::Operation</name></compound>
+  <compound refid="Function_8h" kind="file"><name>Function.h</name>
+    <member refid="Function_8h_1a03" kind="define"><name>LLVM_FUNCTION_H</name></member>
+  </compound>
+</doxygenindex>
+"""
+
+
+def _index(tmp_path: Path) -> SymbolIndex:
+    index_xml = tmp_path / "index.xml"
+    index_xml.write_text(INDEX_XML)
+    return SymbolIndex.from_doxygen_index(index_xml)
+
+
+def test_from_doxygen_index_qualifies_members(tmp_path: Path):
+    index = _index(tmp_path)
+    assert len(index) == 7
+    symbol = index.search("llvm::function::getentry", fuzzy=False)[0]
+    assert symbol.name == "llvm::Function::getEntryBlock"
+    assert symbol.xml_file_name == "classllvm_1_1Function.xml"
+    # File members are not qualified with the file name.
+    assert index.search("LLVM_FUNCTION_H")[0].refid == "Function_8h_1a03"
+
+
+def test_prefix_search_matches_unqualified_suffix(tmp_path: Path):
+    index = _index(tmp_path)
+    names = [s.name for s in index.search("Function", fuzzy=False)]
+    assert names == [
+        "llvm::Function",
+        "Function.h",
+        "llvm::FunctionPass",
+        "llvm::Function::arg_size",
+        "llvm::Function::getEntryBlock",
+    ]
+    assert [s.name for s in index.search("function", limit=1, fuzzy=False)] == ["llvm::Function"]
+
+
+def test_fuzzy_search_fills_remaining_slots(tmp_path: Path):
+    index = _index(tmp_path)
+    assert index.search("Opration", fuzzy=False) == []
+    assert index.search("Opration")[0].name == "mlir::Operation"
+
+
+def test_from_elements_and_kind_filter(tmp_path: Path):
+    index = SymbolIndex.from_elements(
+        [CodeElement(id="classA", name="ns::A", kind="class", language="C++")]
+    )
+    assert index.search("a")[0].compound_refid == "classA"
+
+    index_xml = tmp_path / "index.xml"
+    index_xml.write_text(INDEX_XML)
+    classes_only = SymbolIndex.from_doxygen_index(index_xml, kinds={"class"})
+    assert len(classes_only) == 3
+    assert index.search("") == []
+
+
+def test_typeahead_only_offers_parsed_kinds(tmp_path: Path):
+    from codiculum.doxygen_parser import PARSED_KINDS
+
+    index_xml = tmp_path / "index.xml"
+    index_xml.write_text(INDEX_XML)
+    # As the explorer app builds it: selecting a member or file would find no parsed element.
+    index = SymbolIndex.from_doxygen_index(index_xml, kinds=set(PARSED_KINDS))
+    offered = index.search("function") + index.search("getEntryBlock") + index.search("LLVM_FUNCTION_H")
+    assert offered and {symbol.kind for symbol in offered} <= PARSED_KINDS
+    assert "Function.h" not in {symbol.name for symbol in offered}
+    assert [s.name for s in index.search("function", fuzzy=False)] == ["llvm::Function", "llvm::FunctionPass"]
@@ -0,0 +1,120 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from codiculum.chunker import Chunk, ChunkWriter, CodeChunker, CompressedChunkStore, read_chunk_batches
+from codiculum.cli import main
+from codiculum.embedding import HashingEmbedder
+from codiculum.indexing import compact_chunk_file, compact_index, live_chunk_ids
+from codiculum.vector_store import QuantizedVectorStore
+
+EMBED = HashingEmbedder(dim=32)
+
+
+def _chunks(n: int) -> List[Chunk]:
+    return [Chunk(text=f"class C{i} {{ void f{i}(); }};", metadata={"id": f"classC{i}"}) for i in range(n)]
+
+
+def test_compact_index_purges_stale_ids_everywhere(tmp_path: Path):
+    chunks = _chunks(40)
+    store = QuantizedVectorStore(rescore_path=tmp_path / "full.f32")
+    store.add(chunks, EMBED([c.text for c in chunks]))
+    with CompressedChunkStore(tmp_path / "chunks.db") as chunk_store:
+        chunk_store.put_many(chunks)
+        live = {f"classC{i}" for i in range(30)} | {"classNew"}
+
+        report = compact_index(store, live, [chunk_store], k=5)
+
+        assert report.stored_before == 40 and report.stale == 10 and report.stored_after == 30
+        assert report.slots_reclaimed == 10
+        assert report.memory_bytes_after == report.memory_bytes_before * 3 // 4
+        assert report.disk_bytes_reclaimed >= 10 * 32 * 4
+        assert report.latency_before_ms is not None and report.latency_after_ms is not None
+        assert "Purged 10/40 stale chunks" in str(report)
+        assert sorted(chunk_store.ids()) == sorted(store.ids())
+    store.close()
+
+
+def test_compact_index_purges_chunk_store_records_without_vectors(tmp_path: Path):
+    chunks = _chunks(10)
+    store = QuantizedVectorStore()
+    store.add(chunks[:5], EMBED([c.text for c in chunks[:5]]))
+    live = {f"classC{i}" for i in range(4)} | {"classC9"}
+    with CompressedChunkStore(tmp_path / "chunks.db") as chunk_store:
+        chunk_store.put_many(chunks)
+        report = compact_index(store, live, [chunk_store])
+        assert report.stale == 1 and report.chunk_store_stale == 5
+        assert sorted(chunk_store.ids()) == sorted(live)
+
+
+def test_compact_index_refuses_mass_purge():
+    chunks = _chunks(10)
+    store = QuantizedVectorStore()
+    store.add(chunks, EMBED([c.text for c in chunks]))
+    with pytest.raises(ValueError, match="refusing"):
+        compact_index(store, {"classC0"})
+    assert len(store) == 10
+    assert compact_index(store, {"classC0"}, max_stale_fraction=1.0).stored_after == 1
+
+
+def test_compact_chunk_file(tmp_path: Path):
+    chunks = _chunks(5)
+    path = tmp_path / "chunks.jsonl"
+    with ChunkWriter(path) as writer:
+        writer.write_batch(chunks, EMBED([c.text for c in chunks]))
+    assert compact_chunk_file(path, {"classC1", "classC3"}) == 3
+    (kept, embeddings), = read_chunk_batches(path)
+    assert [c.metadata["id"] for c in kept] == ["classC1", "classC3"] and len(embeddings) == 2
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_cli_compact(tmp_path: Path, capsys):
+    src, xml_dir = tmp_path / "src", tmp_path / "xml"
+    src.mkdir()
+    xml_dir.mkdir()
+    (src / "c.h").write_text("class C0 {};\n")
+    (xml_dir / "classC0.xml").write_text(
+        '<doxygen><compounddef id="classC0" kind="class" language="C++"><compoundname>C0</compoundname>'
+        '<location file="c.h" line="1" bodyfile="c.h" bodystart="1" bodyend="1"/></compounddef></doxygen>'
+    )
+    chunks = _chunks(3)
+    path = tmp_path / "chunks.jsonl"
+    with ChunkWriter(path) as writer:
+        writer.write_batch(chunks)
+    with CompressedChunkStore(tmp_path / "chunks.db") as chunk_store:
+        chunk_store.put_many(chunks)
+    args = ["compact", str(path), str(xml_dir), "--src-base", str(src), "--chunk-store", str(tmp_path / "chunks.db")]
+
+    assert main(args) == 1
+    assert "refusing to purge" in capsys.readouterr().err
+    assert main(args + ["--max-stale-fraction", "1"]) == 0
+    assert "Purged 2/3 stale chunks" in capsys.readouterr().out
+    (kept, _), = read_chunk_batches(path)
+    assert [c.metadata["id"] for c in kept] == ["classC0"]
+    with CompressedChunkStore(tmp_path / "chunks.db") as chunk_store:
+        assert chunk_store.ids() == ["classC0"]
+
+
+def _class_xml(name: str, source: str = "c.h") -> str:
+    return (
+        f'<doxygen><compounddef id="class{name}" kind="class" language="C++"><compoundname>{name}</compoundname>'
+        f'<location file="{source}" line="1" bodyfile="{source}" bodystart="1" bodyend="1"/></compounddef></doxygen>'
+    )
+
+
+def test_live_ids_survive_corrupt_xml_and_missing_sources(tmp_path: Path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "c.h").write_text("class A {};\n")
+    (tmp_path / "classA.xml").write_text(_class_xml("A"))
+    (tmp_path / "classB.xml").write_text(_class_xml("B")[:-30])  # Half-written.
+    (tmp_path / "classC.xml").write_text(_class_xml("C", source="gone.h"))
+    live = live_chunk_ids(sorted(tmp_path.glob("*.xml")), CodeChunker(src))
+    assert live == {"classA", "classB", "classC"}
+
+    chunks = [Chunk(text=name, metadata={"id": f"class{name}"}) for name in "ABCD"]
+    store = QuantizedVectorStore()
+    store.add(chunks, EMBED([c.text for c in chunks]))
+    assert compact_index(store, live).stale == 1
+    assert sorted(store.ids()) == ["classA", "classB", "classC"]
@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from codiculum.indexing import CorpusVersion, load_corpora
+
+
+def test_load_corpora(tmp_path: Path):
+    config = tmp_path / "corpora.json"
+    config.write_text(json.dumps([
+        {"corpus": "llvm-project", "version": "18.x", "src_base": "llvm-18"},
+        {"corpus": "llvm-project", "version": 19, "src_base": "llvm-19", "xml_dir": "xml-19"},
+    ]))
+    assert load_corpora(config) == [
+        CorpusVersion("llvm-project", "18.x", tmp_path / "llvm-18", tmp_path / "llvm-18" / "output" / "xml"),
+        CorpusVersion("llvm-project", "19", tmp_path / "llvm-19", tmp_path / "xml-19"),
+    ]
+
+
+def test_load_corpora_rejects_bad_entries(tmp_path: Path):
+    config = tmp_path / "corpora.json"
+    config.write_text(json.dumps([{"corpus": "a", "src_base": "a"}]))
+    with pytest.raises(ValueError, match="missing"):
+        load_corpora(config)
+    config.write_text(json.dumps([{"corpus": "a", "version": "1", "src_base": "a"}] * 2))
+    with pytest.raises(ValueError, match="Duplicate"):
+        load_corpora(config)
@@ -0,0 +1,95 @@
+import sqlite3
+from pathlib import Path
+
+from codiculum.indexing import order_by_importance, reference_counts_from_sqlite, reference_counts_from_xml
+from codiculum.indexing.importance import compound_id
+
+SCHEMA_PATH = Path(__file__).parents[2] / "setup" / "schema_dump.sql"
+
+MEMBER = "classllvm_1_1Function_1a" + "0" * 32
+
+
+def _make_doxygen_db(path: Path) -> None:
+    schema = SCHEMA_PATH.read_text().replace("CREATE TABLE sqlite_sequence(name,seq);", "")
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    refids = ["classllvm_1_1Value", "classllvm_1_1Function", MEMBER, "classllvm_1_1Argument"]
+    conn.executemany("INSERT INTO refid (rowid, refid) VALUES (?, ?)", list(enumerate(refids, 1)))
+    # Value is a base of Function and Argument; Function::member is referenced twice.
+    conn.executemany(
+        "INSERT INTO compoundref (base_rowid, derived_rowid, prot, virt) VALUES (?, ?, 0, 0)",
+        [(1, 2), (1, 4)],
+    )
+    conn.executemany(
+        "INSERT INTO xrefs (src_rowid, dst_rowid, context) VALUES (?, ?, 'inline')",
+        [(4, 3), (1, 3), (4, 2)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_compound_id():
+    assert compound_id(MEMBER) == "classllvm_1_1Function"
+    assert compound_id("classllvm_1_1Function") == "classllvm_1_1Function"
+
+
+def test_reference_counts_from_sqlite(tmp_path: Path):
+    db_path = tmp_path / "doxygen_sqlite3.db"
+    _make_doxygen_db(db_path)
+    counts = reference_counts_from_sqlite(db_path)
+    assert counts == {"classllvm_1_1Value": 2, "classllvm_1_1Function": 1, MEMBER: 2}
+
+
+def test_reference_counts_from_xml(tmp_path: Path):
+    xml = tmp_path / "classllvm_1_1Function.xml"
+    xml.write_text(f"""<doxygen>
+  <compounddef id="classllvm_1_1Function" kind="class">
+    <derivedcompoundref refid="classllvm_1_1X">X</derivedcompoundref>
+    <sectiondef kind="public-func">
+      <memberdef kind="function" id="{MEMBER}">
+        <referencedby refid="a">a</referencedby>
+        <referencedby refid="b">b</referencedby>
+      </memberdef>
+    </sectiondef>
+  </compounddef>
+</doxygen>""")
+    counts = reference_counts_from_xml([xml, tmp_path / "missing.xml"])
+    assert counts == {"classllvm_1_1Function": 1, MEMBER: 2}
+
+
+def test_order_by_importance():
+    files = [
+        "xml/classllvm_1_1Argument.xml",
+        "xml/classllvm_1_1Function.xml",
+        "xml/classllvm_1_1Unused.xml",
+        "xml/classllvm_1_1Value.xml",
+    ]
+    counts = {"classllvm_1_1Value": 2, "classllvm_1_1Function": 1, MEMBER: 2}
+    assert order_by_importance(files, counts) == [
+        "xml/classllvm_1_1Function.xml",
+        "xml/classllvm_1_1Value.xml",
+        "xml/classllvm_1_1Argument.xml",
+        "xml/classllvm_1_1Unused.xml",
+    ]
+
+
+def test_index_cli_order_importance(tmp_path: Path):
+    from codiculum.chunker import read_chunk_batches
+    from codiculum.cli import main
+
+    src, xml_dir = tmp_path / "src", tmp_path / "xml"
+    src.mkdir()
+    xml_dir.mkdir()
+    (src / "c.h").write_text("class A {};\nclass B {};\n")
+    for line, name, derived in ((1, "A", 0), (2, "B", 2)):
+        refs = "".join(f'<derivedcompoundref refid="classD{i}">D{i}</derivedcompoundref>' for i in range(derived))
+        (xml_dir / f"class{name}.xml").write_text(
+            f'<doxygen><compounddef id="class{name}" kind="class" language="C++"><compoundname>{name}</compoundname>'
+            f'{refs}<location file="c.h" line="{line}" bodyfile="c.h" bodystart="{line}" bodyend="{line}"/>'
+            "</compounddef></doxygen>"
+        )
+
+    out = tmp_path / "out"
+    assert main(["index", str(xml_dir), "--src-base", str(src), "--output-dir", str(out), "--order", "importance"]) == 0
+    (chunks, _), = read_chunk_batches(out / "shard-00000-of-00001.jsonl")
+    assert [chunk.metadata["id"] for chunk in chunks] == ["classB", "classA"]
@@ -0,0 +1,93 @@
+import sqlite3
+from pathlib import Path
+
+from codiculum.chunker import CodeChunker
+from codiculum.doxygen_parser.models import CodeElement, CodeLocation
+from codiculum.indexing import IncludeGraph
+
+SCHEMA_PATH = Path(__file__).parents[2] / "setup" / "schema_dump.sql"
+
+FILE_XML = """<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygen version="1.9.1">
+  <compounddef id="{refid}" kind="file" language="C++">
+    <compoundname>{name}</compoundname>
+    {includes}
+    <location file="include/llvm/IR/{name}"/>
+  </compounddef>
+</doxygen>
+"""
+
+# Function.h includes Value.h and Type.h; Value.h already includes Type.h.
+HEADERS = {
+    "Function.h": ["Value.h", "Type.h", "<vector>"],
+    "Value.h": ["Type.h"],
+    "Type.h": [],
+}
+
+
+def _write_xml(tmp_path: Path):
+    files = []
+    for name, includes in HEADERS.items():
+        tags = "".join(
+            f'<includes local="no">{inc[1:-1]}</includes>' if inc.startswith("<")
+            else f'<includes refid="{inc.replace(".", "_8")}" local="yes">llvm/IR/{inc}</includes>'
+            for inc in includes
+        )
+        path = tmp_path / f"{name.replace('.', '_8')}.xml"
+        path.write_text(FILE_XML.format(refid=name.replace(".", "_8"), name=name, includes=tags))
+        files.append(path)
+    return files
+
+
+def test_closure_and_minimal_includes_from_xml(tmp_path: Path):
+    graph = IncludeGraph.from_xml(_write_xml(tmp_path))
+    function_h = "include/llvm/IR/Function.h"
+    assert graph.closure(function_h) == {"include/llvm/IR/Value.h", "include/llvm/IR/Type.h", "vector"}
+    assert graph.minimal_includes(function_h) == ("llvm/IR/Value.h", "vector")
+    graph.minimal_includes(function_h)
+    assert graph.minimal_includes.cache_info().hits == 1
+
+
+def test_cycles_and_depth_bound():
+    edges = {"a.h": ["b.h"], "b.h": ["a.h", "c.h"], "c.h": ["d.h"]}
+    assert IncludeGraph(edges).closure("a.h") == {"b.h", "c.h", "d.h"}
+    assert IncludeGraph(edges, max_depth=2).closure("a.h") == {"b.h", "c.h"}
+    # Mutually including headers are both kept.
+    cyclic = IncludeGraph({"x.h": ["a.h", "b.h"], "a.h": ["b.h"], "b.h": ["a.h"]})
+    assert cyclic.minimal_includes("x.h") == ("a.h", "b.h")
+
+
+def test_from_sqlite(tmp_path: Path):
+    db_path = tmp_path / "doxygen_sqlite3.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_PATH.read_text().replace("CREATE TABLE sqlite_sequence(name,seq);", ""))
+    paths = [("include/llvm/IR/Function.h", 1), ("include/llvm/IR/Value.h", 1), ("include/llvm/IR/Type.h", 1),
+             ("vector", 0)]
+    conn.executemany("INSERT INTO path (rowid, type, local, found, name) VALUES (?, 1, 1, ?, ?)",
+                     [(rowid, found, name) for rowid, (name, found) in enumerate(paths, 1)])
+    conn.executemany("INSERT INTO includes (local, src_id, dst_id) VALUES (1, ?, ?)",
+                     [(1, 2), (1, 3), (1, 4), (2, 3)])
+    conn.commit()
+    conn.close()
+
+    graph = IncludeGraph.from_sqlite(db_path)
+    function_h = "include/llvm/IR/Function.h"
+    assert graph.direct(function_h) == ("include/llvm/IR/Value.h", "include/llvm/IR/Type.h", "vector")
+    # Spelled like the <includes> text `from_xml` keeps.
+    from_xml = IncludeGraph.from_xml(_write_xml(tmp_path))
+    assert graph.minimal_includes(function_h) == from_xml.minimal_includes(function_h)
+    assert graph.minimal_includes(function_h) == ("llvm/IR/Value.h", "vector")
+    rooted = IncludeGraph.from_sqlite(db_path, include_roots=["include/llvm"])
+    assert rooted.minimal_includes(function_h) == ("IR/Value.h", "vector")
+
+
+def test_chunks_list_their_includes(tmp_path: Path):
+    (tmp_path / "a.cpp").write_text("int f() { return 1; }\n")
+    graph = IncludeGraph({"a.cpp": ["a.h", "b.h"], "a.h": ["b.h"]})
+    element = CodeElement(id="f", name="f", kind="function", language="C++",
+                          location=CodeLocation(file="a.cpp", start_line=1, end_line=1))
+    [chunk] = CodeChunker(tmp_path, include_graph=graph).chunk([element])
+    assert chunk.metadata["includes"] == ["a.h"]
+    assert chunk.text.splitlines()[:2] == ["File: a.cpp", "Includes: a.h"]
+    [plain] = CodeChunker(tmp_path).chunk([element])
+    assert "includes" not in plain.metadata
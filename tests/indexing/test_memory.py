@@ -0,0 +1,166 @@
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from codiculum.chunker import Chunk, CodeChunker
+from codiculum.doxygen_parser.models import CodeElement, CodeLocation
+from codiculum.indexing import MemoryGovernor, approx_size, build_index, current_rss, parse_size
+
+
+class DictSink:
+    def __init__(self):
+        self.items: Dict[str, List[float]] = {}
+        self.batches: List[List[str]] = []
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        self.batches.append([chunk.metadata["id"] for chunk in chunks])
+        for chunk, embedding in zip(chunks, embeddings):
+            self.items[chunk.metadata["id"]] = embedding
+
+
+def fake_embed(texts: List[str]) -> List[List[float]]:
+    return [[float(len(text))] for text in texts]
+
+
+class FakeRss:
+    def __init__(self, value: int):
+        self.value = value
+
+    def __call__(self) -> int:
+        return self.value
+
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("2k") == 2048
+    assert parse_size("1.5GiB") == 3 * 2**29
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_approx_size_grows_with_text():
+    small = CodeElement(id="a", name="a", kind="class", language="C++")
+    huge = CodeElement(id="b", name="b", kind="class", language="C++", detailed_description="x" * 100_000)
+    assert approx_size(huge) - approx_size(small) >= 100_000
+    assert approx_size(Chunk(text="y" * 1000, metadata={"id": "c"})) > 1000
+
+
+def test_current_rss_is_plausible():
+    rss = current_rss()
+    assert rss is None or rss > 1 << 20
+
+
+def test_governor_throttles_and_recovers():
+    governor = MemoryGovernor(1000, batch_size=64, max_workers=4, rss_fn=FakeRss(100))
+    assert governor.adjust() is False
+    assert governor.batch_size == 80 and governor.workers == 2
+
+    governor.reserve(800)
+    assert governor.adjust() is True
+    assert governor.batch_size == 40 and governor.workers == 1
+    assert len(governor.throttle_events) == 1
+
+    # Usage no longer rising: the last throttle is given time to work.
+    for _ in range(20):
+        assert governor.adjust() is False
+    assert governor.batch_size == 40
+
+    governor.reserve(50)  # Still rising: throttle again.
+    assert governor.adjust() is True
+    assert governor.batch_size == 20
+
+    governor.release(300)  # Between the water marks: hold steady.
+    governor.adjust()
+    assert governor.batch_size == 20
+
+    governor.release(550)
+    for _ in range(40):
+        governor.adjust()
+    assert governor.batch_size == governor.max_batch_size and governor.workers == 4
+    assert "2 throttles" in governor.report()
+
+
+def test_rss_growth_throttles_while_estimates_stay_small():
+    rss = FakeRss(100)
+    governor = MemoryGovernor(1000, batch_size=64, rss_fn=rss)
+    governor.reserve(10)
+    rss.value = 900  # Memory the estimates miss (e.g. lxml trees).
+    assert governor.adjust() is True and governor.batch_size == 32
+    assert governor.throttle_events[-1].rss == 900
+    assert governor.adjust() is False and governor.batch_size == 32  # Not rising any more.
+    rss.value = 950
+    assert governor.adjust() is True and governor.batch_size == 16
+    assert governor.batch_bytes == 1  # No headroom left under the high-water mark.
+    assert governor.peak_rss == 950
+
+
+def test_throttle_warnings_are_rate_limited(caplog):
+    governor = MemoryGovernor(1000, batch_size=1024, rss_fn=FakeRss(900))
+    with caplog.at_level("WARNING", logger="codiculum.indexing.memory"):
+        for _ in range(5):
+            governor.reserve(10)
+            assert governor.adjust() is True
+    assert len(governor.throttle_events) == 5
+    assert len(caplog.records) == 1
+
+
+def test_batch_byte_cap_tracks_headroom():
+    rss = FakeRss(500)
+    governor = MemoryGovernor(1000, high_water=0.8, rss_fn=rss)
+    governor.adjust()
+    assert governor.batch_bytes == 150
+    assert governor.should_flush(1, 150)
+    assert not governor.should_flush(0, 150)
+    assert not governor.should_flush(1, 149)
+
+
+@pytest.fixture
+def corpus(tmp_path: Path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.h").write_text("\n".join(f"int f{i}();" for i in range(40)) + "\n")
+    elements = {
+        f"file{n}.xml": [
+            CodeElement(
+                id=f"file{n}_{i}",
+                name=f"f{n * 4 + i}",
+                kind="function",
+                language="C++",
+                # One huge compound among many small ones.
+                detailed_description="z" * 400_000 if (n, i) == (3, 0) else None,
+                location=CodeLocation(file="a.h", start_line=n * 4 + i + 1, end_line=n * 4 + i + 1),
+            )
+            for i in range(4)
+        ]
+        for n in range(10)
+    }
+    return src, elements
+
+
+def test_build_index_with_governor(corpus):
+    src, elements = corpus
+    sink = DictSink()
+    governor = MemoryGovernor(10**6, batch_size=8, max_workers=3, rss_fn=FakeRss(200_000))
+    stats = build_index(
+        sorted(elements), CodeChunker(src), fake_embed, sink, parse_fn=elements.__getitem__, governor=governor
+    )
+    assert len(sink.items) == 40 and stats.chunks_stored == 40 and stats.files_processed == 10
+    # The huge chunk exceeds the byte cap and closes its batch early.
+    huge_batch = next(batch for batch in sink.batches if "file3_0" in batch)
+    assert huge_batch[-1] == "file3_0" and len(huge_batch) < governor.batch_size
+    assert governor.in_flight_bytes == 0
+    # Only the huge compound, held with its chunk while the batch is stored, crosses the high-water mark.
+    assert stats.throttles == 1 and governor.throttle_events[0].in_flight_bytes > 400_000
+
+
+def test_build_index_throttles_under_pressure(corpus):
+    src, elements = corpus
+    sink = DictSink()
+    governor = MemoryGovernor(10**6, batch_size=16, max_workers=2, rss_fn=FakeRss(950_000))
+    stats = build_index(
+        sorted(elements), CodeChunker(src), fake_embed, sink, parse_fn=elements.__getitem__, governor=governor
+    )
+    assert len(sink.items) == 40 and max(map(len, sink.batches)) <= 16
+    assert stats.throttles == len(governor.throttle_events) > 0
+    assert governor.batch_size < 16 and governor.workers == 1
@@ -0,0 +1,169 @@
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from codiculum.chunker import SUMMARY_KINDS, Chunk, CodeChunker, SummaryBuilder
+from codiculum.doxygen_parser.models import CodeElement, CodeLocation
+from codiculum.indexing import IndexCheckpoint, build_index
+from codiculum.indexing.checkpoint import chunk_key
+
+
+class DictSink:
+    """In-memory sink that upserts by chunk id."""
+
+    def __init__(self):
+        self.items: Dict[str, List[float]] = {}
+        self.add_calls = 0
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        self.add_calls += 1
+        for chunk, embedding in zip(chunks, embeddings):
+            self.items[chunk.metadata["id"]] = embedding
+
+
+def fake_embed(texts: List[str]) -> List[List[float]]:
+    return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def corpus(tmp_path: Path):
+    """Five XML 'files', each mapping to three one-line elements in one source file."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.h").write_text("\n".join(f"int f{i}();" for i in range(15)) + "\n")
+
+    xml_files = [f"file{n}.xml" for n in range(5)]
+    elements = {
+        xml: [
+            CodeElement(
+                id=f"{xml}_{i}",
+                name=f"f{n * 3 + i}",
+                kind="function",
+                language="C++",
+                location=CodeLocation(file="a.h", start_line=n * 3 + i + 1, end_line=n * 3 + i + 1),
+            )
+            for i in range(3)
+        ]
+        for n, xml in enumerate(xml_files)
+    }
+    return tmp_path, xml_files, elements
+
+
+def test_build_index_without_checkpoint(corpus):
+    base, xml_files, elements = corpus
+    sink = DictSink()
+    stats = build_index(
+        xml_files, CodeChunker(base / "src"), fake_embed, sink, batch_size=4, parse_fn=elements.__getitem__
+    )
+    assert len(sink.items) == 15
+    assert stats.files_processed == 5
+    assert stats.chunks_stored == 15
+    assert stats.batches == 4
+
+
+def test_build_index_resumes_after_crash(corpus):
+    base, xml_files, elements = corpus
+    chunker = CodeChunker(base / "src")
+    sink = DictSink()
+    calls = {"n": 0}
+
+    def flaky_embed(texts):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise RuntimeError("embedding API outage")
+        return fake_embed(texts)
+
+    with IndexCheckpoint(base / "ckpt.sqlite") as checkpoint:
+        with pytest.raises(RuntimeError):
+            build_index(xml_files, chunker, flaky_embed, sink, checkpoint=checkpoint,
+                        batch_size=4, parse_fn=elements.__getitem__)
+        # Two batches of four chunks made it; the first two files are complete.
+        assert len(checkpoint.stored_chunk_ids()) == 8
+        assert checkpoint.processed_files() == {"file0.xml", "file1.xml"}
+
+    parsed: List[str] = []
+
+    def tracking_parse(xml):
+        parsed.append(xml)
+        return elements[xml]
+
+    with IndexCheckpoint(base / "ckpt.sqlite") as checkpoint:
+        stats = build_index(xml_files, chunker, fake_embed, sink, checkpoint=checkpoint,
+                            batch_size=4, parse_fn=tracking_parse)
+        assert checkpoint.processed_files() == set(xml_files)
+
+    assert parsed == ["file2.xml", "file3.xml", "file4.xml"]
+    assert stats.files_skipped == 2
+    assert stats.chunks_skipped == 2  # file2 chunks stored before the crash
+    assert stats.chunks_stored == 7
+    assert len(sink.items) == 15
+
+
+def test_parse_workers_parse_ahead_without_governor(corpus):
+    base, xml_files, elements = corpus
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def slow_parse(xml_file: str) -> List[CodeElement]:
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return elements[xml_file]
+
+    sink = DictSink()
+    stats = build_index(xml_files, CodeChunker(base / "src"), fake_embed, sink, parse_fn=slow_parse, parse_workers=3)
+    assert stats.chunks_stored == 15 and list(sink.items) == [f"{xml}_{i}" for xml in xml_files for i in range(3)]
+    assert peak[0] > 1
+
+
+def test_checkpoint_keys_chunks_by_corpus_version(tmp_path: Path):
+    import sqlite3
+
+    db = tmp_path / "ckpt.sqlite"
+    with sqlite3.connect(db) as conn:  # a checkpoint written before keys carried the corpus version
+        conn.execute("CREATE TABLE stored_chunks (id TEXT PRIMARY KEY NOT NULL, xml_file TEXT NOT NULL)")
+        conn.execute("INSERT INTO stored_chunks VALUES ('classA', 'a.xml')")
+    conn.close()
+
+    with IndexCheckpoint(db) as checkpoint:
+        assert checkpoint.stored_chunk_ids() == {("", "", "classA")}
+        chunks = [Chunk("class A {};", {"id": "classA", "corpus": "llvm", "version": v}) for v in ("18.x", "19.x")]
+        checkpoint.commit_batch([(chunk_key(chunk), "a.xml") for chunk in chunks], ["a.xml"])
+        assert checkpoint.stored_chunk_ids() == {("", "", "classA"), ("llvm", "18.x", "classA"),
+                                                 ("llvm", "19.x", "classA")}
+
+
+def test_summaries_cover_the_whole_parse_across_files_and_resumes(corpus):
+    base, xml_files, elements = corpus
+    for file_elements in elements.values():
+        for element in file_elements:
+            element.name = f"llvm::{element.name}"
+    chunker = CodeChunker(base / "src")
+    stored: Dict[str, Chunk] = {}
+
+    class ChunkSink:
+        def add(self, chunks, embeddings):
+            stored.update((chunk.metadata["id"], chunk) for chunk in chunks)
+
+    def dying_embed(texts):
+        if len(stored) >= 4:
+            raise RuntimeError("killed")
+        return fake_embed(texts)
+
+    with IndexCheckpoint(base / "ckpt.sqlite") as checkpoint:
+        with pytest.raises(RuntimeError):
+            build_index(xml_files, chunker, dying_embed, ChunkSink(), checkpoint=checkpoint, batch_size=4,
+                        parse_fn=elements.__getitem__, summaries=SummaryBuilder())
+        build_index(xml_files, chunker, fake_embed, ChunkSink(), checkpoint=checkpoint, batch_size=4,
+                    parse_fn=elements.__getitem__, summaries=SummaryBuilder())
+
+    # One summary per scope and file, listing the children of every XML file (including those resumed past).
+    summaries = {item_id: chunk for item_id, chunk in stored.items() if chunk.metadata["kind"] in SUMMARY_KINDS}
+    assert sorted(summaries) == ["file:a.h", "namespace:llvm"]
+    assert len(summaries["namespace:llvm"].metadata["children"]) == 15
+    assert len(summaries["file:a.h"].metadata["children"]) == 15
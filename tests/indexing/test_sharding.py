@@ -0,0 +1,124 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from codiculum.chunker import CodeChunker
+from codiculum.chunker.export import read_chunk_batches
+from codiculum.indexing import IndexCheckpoint, build_shard, merge_shards, parse_shard_spec, select_shard, shard_for
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+CLASS_XML = """<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygen version="1.9.1">
+  <compounddef id="{refid}" kind="class" language="C++">
+    <compoundname>ns::{name}</compoundname>
+    <briefdescription><para>The {name} class.</para></briefdescription>
+    <location file="{name}.h" line="1" bodyfile="{name}.h" bodystart="1" bodyend="3"/>
+  </compounddef>
+</doxygen>
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path: Path):
+    src, xml = tmp_path / "src", tmp_path / "xml"
+    src.mkdir()
+    xml.mkdir()
+    for n in range(12):
+        name = f"Widget{n}"
+        (src / f"{name}.h").write_text(f"class {name} {{\n  int value{n};\n}};\n")
+        (xml / f"classns_1_1{name}.xml").write_text(CLASS_XML.format(refid=f"classns_1_1{name}", name=name))
+    return tmp_path
+
+
+def _index(base: Path, out: Path, *extra: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "codiculum", "index", str(base / "xml"), "--src-base", str(base / "src"),
+         "--output-dir", str(out), "--dim", "32", *extra],
+        cwd=SRC_DIR,
+    )
+
+
+def _rows(path: Path):
+    return {
+        chunk.metadata["id"]: (chunk.text, embedding)
+        for chunks, embeddings in read_chunk_batches(path)
+        for chunk, embedding in zip(chunks, embeddings)
+    }
+
+
+def test_partitioning_is_stable_and_complete():
+    files = [f"/a/classX{n}.xml" for n in range(50)]
+    shards = [select_shard(files, i, 4) for i in range(4)]
+    assert sorted(sum(shards, [])) == sorted(files)
+    # Keyed on the file name, not the checkout path.
+    assert select_shard([f.replace("/a/", "/b/c/") for f in files], 1, 4) == [
+        f.replace("/a/", "/b/c/") for f in shards[1]
+    ]
+    assert shard_for("classllvm_1_1Function.xml", 8) == shard_for("classllvm_1_1Function.xml", 8)
+    assert parse_shard_spec("2/8") == (2, 8)
+    for bad in ("8/8", "x", "1/2/3"):
+        with pytest.raises(ValueError):
+            parse_shard_spec(bad)
+
+
+def test_sharded_processes_merge_to_single_process_build(corpus: Path):
+    workers = [_index(corpus, corpus / "shards", "--shard", f"{i}/3") for i in range(3)]
+    single = _index(corpus, corpus / "single")
+    assert all(worker.wait(timeout=60) == 0 for worker in workers + [single])
+
+    merged = merge_shards(corpus / "shards", corpus / "merged.jsonl")
+    merge_shards(corpus / "single", corpus / "single.jsonl")
+
+    assert merged["num_shards"] == 3
+    assert merged["files"] == 12 and merged["chunks"] == 12
+    assert sum(shard["chunks"] for shard in merged["shards"]) == 12
+    assert json.loads((corpus / "merged.jsonl.manifest.json").read_text())["sha256"] == merged["sha256"]
+    assert _rows(corpus / "merged.jsonl") == _rows(corpus / "single.jsonl")
+
+
+def test_merge_rejects_missing_or_corrupt_shards(corpus: Path):
+    assert all(_index(corpus, corpus / "shards", "--shard", f"{i}/2").wait(timeout=60) == 0 for i in range(2))
+    shard = corpus / "shards" / "shard-00001-of-00002.jsonl"
+    shard.write_text(shard.read_text() + "\n")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        merge_shards(corpus / "shards", corpus / "merged.jsonl")
+
+    (corpus / "shards" / "shard-00001-of-00002.jsonl.manifest.json").unlink()
+    with pytest.raises(ValueError, match=r"Missing shards \[1\]"):
+        merge_shards(corpus / "shards", corpus / "merged.jsonl")
+
+
+@pytest.mark.parametrize("format", ["jsonl", "parquet"])
+def test_killed_shard_build_resumes_from_checkpoint(corpus: Path, format: str):
+    xml_files = sorted((corpus / "xml").glob("*.xml"))
+    chunker = CodeChunker(corpus / "src")
+    embedded: list = []
+
+    def embed(texts):
+        embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def dying_embed(texts):
+        if len(embedded) >= 4:
+            raise RuntimeError("killed")  # after two batches
+        return embed(texts)
+
+    with IndexCheckpoint(corpus / "shard.ckpt") as checkpoint:
+        with pytest.raises(RuntimeError, match="killed"):
+            build_shard(xml_files, 1, 2, corpus / "out", chunker, dying_embed, format=format, batch_size=2,
+                        checkpoint=checkpoint)
+        assert len(list((corpus / "out" / f"shard-00001-of-00002.{format}.parts").iterdir())) == 2
+
+        manifest = build_shard(xml_files, 1, 2, corpus / "out", chunker, embed, format=format, batch_size=2,
+                               checkpoint=checkpoint)
+        assert not checkpoint.processed_files() and not checkpoint.stored_chunk_ids()
+
+    shard_files = select_shard(xml_files, 1, 2)
+    assert len(embedded) == len(shard_files)  # no chunk was embedded twice
+    build_shard(xml_files, 1, 2, corpus / "ref", chunker, embed, format=format)
+    assert manifest.files == manifest.chunks == len(shard_files)
+    assert _rows(corpus / "out" / manifest.chunk_file) == _rows(corpus / "ref" / manifest.chunk_file)
+    assert not (corpus / "out" / f"{manifest.chunk_file}.parts").exists()
@@ -0,0 +1,157 @@
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from codiculum.chunker import Chunk, CodeChunker
+from codiculum.indexing import (
+    IncrementalIndexer,
+    InotifyWatcher,
+    PollingWatcher,
+    create_watcher,
+    wait_for_changes,
+    watch,
+)
+
+CLASS_XML = """<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygen version="1.9.1">
+  <compounddef id="class{name}" kind="class" language="C++">
+    <compoundname>{name}</compoundname>
+    <location file="{name}.h" line="1" bodyfile="{name}.h" bodystart="1" bodyend="2"/>
+  </compounddef>
+</doxygen>
+"""
+
+
+class RecordingSink:
+    def __init__(self):
+        self.items: Dict[str, str] = {}
+        self.embedded: List[str] = []
+
+    def add(self, chunks: List[Chunk], embeddings: List[List[float]]) -> None:
+        for chunk in chunks:
+            self.items[chunk.metadata["id"]] = chunk.text
+            self.embedded.append(chunk.metadata["id"])
+
+    def delete(self, ids: List[str]) -> int:
+        return sum(self.items.pop(item_id, None) is not None for item_id in ids)
+
+
+@pytest.fixture
+def tree(tmp_path: Path):
+    xml, src = tmp_path / "xml", tmp_path / "src"
+    xml.mkdir()
+    src.mkdir()
+    for name in ("Alpha", "Beta"):
+        (src / f"{name}.h").write_text(f"class {name} {{\n}};\n")
+        (xml / f"class{name}.xml").write_text(CLASS_XML.format(name=name))
+    sink = RecordingSink()
+    indexer = IncrementalIndexer(xml, CodeChunker(src), lambda texts: [[0.0]] * len(texts), sink)
+    return xml, src, indexer, sink
+
+
+def test_incremental_updates(tree):
+    xml, src, indexer, sink = tree
+    stats = indexer.index_all()
+    assert (stats.xml_files, stats.chunks_embedded) == (2, 2)
+
+    # A source edit re-chunks only the XML files pointing into it.
+    (src / "Alpha.h").write_text("class Alpha {\n  int x; };\n")
+    assert indexer.affected_xml_files([src / "Alpha.h", src / "Unknown.h"]) == {str(xml / "classAlpha.xml")}
+    stats = indexer.apply([src / "Alpha.h"])
+    assert stats.chunks_embedded == 1 and "int x;" in sink.items["classAlpha"]
+
+    # Regenerated but identical XML is not re-embedded.
+    assert indexer.apply([xml / "classBeta.xml"]).chunks_unchanged == 1
+    assert sink.embedded == ["classAlpha", "classBeta", "classAlpha"]
+
+    (xml / "classBeta.xml").unlink()
+    assert indexer.apply([xml / "classBeta.xml"]).chunks_deleted == 1
+    assert set(sink.items) == {"classAlpha"}
+    assert indexer.affected_xml_files([src / "Beta.h"]) == set()
+
+
+def test_half_written_and_moved_xml_keep_their_chunks(tree):
+    xml, src, indexer, sink = tree
+    indexer.index_all()
+
+    # Caught mid-write: the file is skipped instead of deleting classAlpha.
+    full = (xml / "classAlpha.xml").read_text()
+    (xml / "classAlpha.xml").write_text(full[: len(full) // 2])
+    stats = indexer.apply([xml / "classAlpha.xml"])
+    assert (stats.xml_files_failed, stats.chunks_deleted) == (1, 0)
+    assert set(sink.items) == {"classAlpha", "classBeta"}
+
+    # classAlpha moves, unchanged, into another XML file: neither deleted nor re-embedded,
+    # whether both files are in one update (old one first) or the new one was applied before.
+    (xml / "classAlpha.xml").unlink()
+    (xml / "group.xml").write_text(full)
+    stats = indexer.apply([xml / "classAlpha.xml", xml / "group.xml"])
+    assert (stats.chunks_deleted, stats.chunks_embedded) == (0, 0)
+    (xml / "group.xml").rename(xml / "other.xml")
+    indexer.apply([xml / "other.xml"])
+    assert indexer.apply([xml / "group.xml"]).chunks_deleted == 0
+    assert set(sink.items) == {"classAlpha", "classBeta"}
+    assert sink.embedded == ["classAlpha", "classBeta"]
+
+
+def test_polling_watcher_and_debounce(tmp_path: Path):
+    watcher = PollingWatcher([tmp_path], interval=0.01, suffixes={".xml"})
+    assert watcher.poll(timeout=0.05) == set()
+
+    def burst():
+        for n in range(3):
+            (tmp_path / f"f{n}.xml").write_text("x")
+            (tmp_path / "ignored.txt").write_text("x")
+            time.sleep(0.02)
+
+    writer = threading.Thread(target=burst)
+    writer.start()
+    changed = wait_for_changes(watcher, quiet_period=0.2, max_delay=2.0, timeout=2.0)
+    writer.join()
+    assert changed == {tmp_path / f"f{n}.xml" for n in range(3)}
+
+    (tmp_path / "f0.xml").unlink()
+    assert watcher.poll(timeout=1.0) == {tmp_path / "f0.xml"}
+
+
+def test_inotify_watcher(tmp_path: Path):
+    try:
+        watcher = InotifyWatcher([tmp_path])
+    except OSError as e:
+        pytest.skip(f"inotify unavailable: {e}")
+    try:
+        (tmp_path / "a.h").write_text("x")
+        assert watcher.poll(timeout=2.0) == {tmp_path / "a.h"}
+        (tmp_path / "sub").mkdir()
+        assert watcher.poll(timeout=0.2) == set()
+        (tmp_path / "sub" / "b.h").write_text("x")
+        assert watcher.poll(timeout=2.0) == {tmp_path / "sub" / "b.h"}
+        (tmp_path / "a.h").unlink()
+        assert watcher.poll(timeout=2.0) == {tmp_path / "a.h"}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_loop_applies_changes(tree, use_inotify):
+    xml, src, indexer, sink = tree
+    indexer.index_all()
+    watcher = create_watcher([xml, src], use_inotify=use_inotify, poll_interval=0.02)
+    updated = threading.Event()
+    stop = threading.Event()
+    loop = threading.Thread(
+        target=watch, args=(indexer, watcher, 0.05, 1.0, stop), kwargs={"on_update": lambda *_: updated.set()}
+    )
+    loop.start()
+    try:
+        time.sleep(0.05)
+        (src / "Beta.h").write_text("class Beta {\n  void run(); };\n")
+        assert updated.wait(timeout=5.0)
+        assert "void run();" in sink.items["classBeta"]
+    finally:
+        stop.set()
+        loop.join()
+        watcher.close()
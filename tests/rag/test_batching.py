@@ -0,0 +1,66 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+from codiculum.rag import EmbeddingBatcher
+
+
+class RecordingEmbedder:
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    async def __call__(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_one_call():
+    embedder = RecordingEmbedder()
+
+    async def run():
+        batcher = EmbeddingBatcher(embedder.__call__, max_wait=0.01)
+        results = await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 11)))
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert results == [[float(n)] for n in range(1, 11)]
+    assert len(embedder.calls) == 1
+    assert (batcher.requests, batcher.batches) == (10, 1)
+
+
+def test_max_batch_size_flushes_early_and_dedupes():
+    embedder = RecordingEmbedder()
+
+    async def run():
+        # A long window: only the size limit can trigger the first flush quickly.
+        batcher = EmbeddingBatcher(embedder.__call__, max_wait=10, max_batch_size=4)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(batcher.embed(t) for t in ["a", "a", "bb", "ccc"]))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [[1.0], [1.0], [2.0], [3.0]]
+    assert embedder.calls == [["a", "bb", "ccc"]]
+    assert elapsed < 1
+
+
+def test_sync_embed_fn_and_errors_propagate():
+    def failing(texts):
+        raise RuntimeError("API outage")
+
+    async def run():
+        ok = EmbeddingBatcher(lambda texts: [[0.0] for _ in texts], max_wait=0)
+        assert await ok.embed("q") == [0.0]
+        batcher = EmbeddingBatcher(failing, max_wait=0.001)
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        EmbeddingBatcher(lambda texts: texts, max_batch_size=0)
@@ -0,0 +1,105 @@
+import asyncio
+
+from codiculum.chunker import Chunk
+from codiculum.rag import EchoLLM, build_packed_prompt, merge_overlapping, pack_context, stream_answer
+from codiculum.rag.synthesis import ContextBlock, estimate_tokens
+
+
+def _chunk(chunk_id: str, file_path, start, end, text=None) -> Chunk:
+    return Chunk(
+        text=text or f"code of {chunk_id}",
+        metadata={"id": chunk_id, "file_path": file_path, "start_line": start, "end_line": end},
+    )
+
+
+def test_merge_drops_contained_and_joins_partial_overlaps():
+    scored = [
+        (_chunk("member", "a.h", 12, 14), 0.9),
+        (_chunk("class", "a.h", 10, 30), 0.5),
+        (_chunk("tail", "a.h", 25, 40), 0.4),
+        (_chunk("other", "b.h", 12, 14), 0.3),
+        (_chunk("summary", None, None, None), 0.2),
+    ]
+    blocks = merge_overlapping(scored)
+    assert [block.ids for block in blocks] == [["class", "member", "tail"], ["other"], ["summary"]]
+    merged = blocks[0]
+    assert (merged.file_path, merged.start_line, merged.end_line) == ("a.h", 10, 40)
+    assert merged.score == 0.9
+    # The member's code is already part of the class chunk.
+    assert merged.text == "code of class\n\ncode of tail"
+
+
+def test_merge_trims_partial_overlaps_to_uncovered_lines():
+    def code_chunk(chunk_id: str, start: int, end: int) -> Chunk:
+        code = "\n".join(f"line {n}" for n in range(start, end + 1))
+        return _chunk(chunk_id, "a.h", start, end, text=f"File: a.h\nBrief: {chunk_id}\n\nCode:\n```cpp\n{code}\n```")
+
+    [merged] = merge_overlapping([(code_chunk("first", 1, 5), 0.9), (code_chunk("second", 4, 7), 0.8)])
+    _, second = merged.text.split("\n\nFile:")
+    assert [line for line in merged.text.splitlines() if line.startswith("line")] == [f"line {n}" for n in range(1, 8)]
+    assert second.startswith(" a.h\nBrief: second") and second.endswith("```cpp\nline 6\nline 7\n```")
+
+
+def test_pack_context_is_greedy_by_score():
+    blocks = [
+        ContextBlock(text="x" * 400, score=0.9, ids=["big"]),
+        ContextBlock(text="x" * 800, score=0.8, ids=["bigger"]),
+        ContextBlock(text="x" * 40, score=0.1, ids=["small"]),
+    ]
+    assert estimate_tokens("x" * 400) == 101
+    packed = pack_context(blocks, token_budget=150)
+    assert [block.ids for block in packed] == [["big"], ["small"]]
+
+
+def test_pack_context_falls_back_to_members_of_an_oversized_merge():
+    scored = [
+        (_chunk("member", "a.h", 12, 14, text="m" * 40), 0.9),
+        (_chunk("inner", "a.h", 12, 13, text="i" * 40), 0.7),
+        (_chunk("class", "a.h", 10, 300, text="c" * 2000), 0.5),
+        (_chunk("other", "b.h", 1, 2, text="o" * 40), 0.3),
+    ]
+    blocks = merge_overlapping(scored)
+    assert [block.ids for block in blocks] == [["class", "member", "inner"], ["other"]]
+    # The merged block (class text) is over budget, but its best member still beats "other";
+    # "inner" adds nothing once "member" is packed.
+    packed = pack_context(blocks, token_budget=30)
+    assert [block.ids for block in packed] == [["member"], ["other"]]
+    assert packed[0].source() == {"ids": ["member"], "file_path": "a.h", "start_line": 12, "end_line": 14}
+
+
+def test_merge_keeps_corpus_versions_apart():
+    def versioned(chunk_id: str, version: str) -> Chunk:
+        chunk = _chunk(chunk_id, "a.h", 10, 20)
+        chunk.metadata.update(corpus="llvm", version=version)
+        return chunk
+
+    blocks = merge_overlapping([(versioned("old", "18.x"), 0.9), (versioned("new", "19.x"), 0.8)])
+    assert [block.ids for block in blocks] == [["old"], ["new"]]
+    assert blocks[1].source()["version"] == "19.x"
+
+
+def test_build_packed_prompt_and_streaming():
+    scored = [(_chunk("class", "a.h", 1, 9, text="class Foo {};"), 1.0), (_chunk("member", "a.h", 2, 3), 0.5)]
+    prompt, packed = build_packed_prompt("What is Foo?", scored, token_budget=100)
+    assert "class Foo {};" in prompt
+    assert "code of member" not in prompt
+    assert prompt.rstrip().endswith("Question: What is Foo?\nAnswer:")
+    assert packed[0].source() == {"ids": ["class", "member"], "file_path": "a.h", "start_line": 1, "end_line": 9}
+
+    async def collect():
+        return [token async for token in stream_answer(EchoLLM(max_chars=20), "one two three four five six")]
+
+    tokens = asyncio.run(collect())
+    assert len(tokens) > 1
+    assert "".join(tokens) == "one two three four f"
+
+
+def test_stream_answer_falls_back_to_complete():
+    class CompleteOnly:
+        async def complete(self, prompt: str) -> str:
+            return "whole answer"
+
+    async def collect():
+        return [token async for token in stream_answer(CompleteOnly(), "p")]
+
+    assert asyncio.run(collect()) == ["whole answer"]
@@ -0,0 +1,251 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from codiculum.chunker import Chunk
+from codiculum.chunker.export import ChunkWriter
+from codiculum.cli import main
+from codiculum.embedding import HashingEmbedder
+from codiculum.rag import EchoLLM
+from codiculum.service import QueryService, ServiceConfig, stream_query
+from codiculum.vector_store import NamespacedIndex, QuantizedVectorStore
+
+NAMES = ["llvm::Function", "llvm::BasicBlock", "mlir::Operation", "mlir::Region", "llvm::Module"]
+CHUNKS = {
+    f"id{i}": Chunk(
+        text=f"File: f{i}.h\nBrief: {name}\n\nCode:\n```cpp\nclass {name.split('::')[1]} {{}};\n```",
+        metadata={"id": f"id{i}", "name": name, "kind": "class", "file_path": f"f{i}.h",
+                  "start_line": 1, "end_line": 1},
+    )
+    for i, name in enumerate(NAMES)
+}
+
+
+class SlowLLM:
+    async def complete(self, prompt: str) -> str:
+        await asyncio.sleep(1)
+        return "too late"
+
+
+def _make_service(llm=None, **config) -> QueryService:
+    embedder = HashingEmbedder(dim=64)
+    store = QuantizedVectorStore(quantization="int8")
+    store.add(list(CHUNKS.values()), embedder([c.text for c in CHUNKS.values()]))
+    return QueryService(store, CHUNKS, embedder, llm=llm, config=ServiceConfig(port=0, **config))
+
+
+async def _request(port: int, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, response_body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(response_body)
+
+
+def test_search_and_query_under_concurrency():
+    async def run():
+        service = _make_service(llm=EchoLLM())
+        await service.start()
+        try:
+            responses = await asyncio.gather(
+                *(_request(service.port, "POST", "/search", {"query": "mlir Operation", "k": 2}) for _ in range(40))
+            )
+            query_status, query_body = await _request(service.port, "POST", "/query", {"query": "What is a Region?"})
+            _, stats = await _request(service.port, "GET", "/stats")
+        finally:
+            await service.close()
+        return responses, query_status, query_body, stats, service
+
+    responses, query_status, query_body, stats, service = asyncio.run(run())
+
+    for status, body in responses:
+        assert status == 200
+        assert body["results"][0]["name"] == "mlir::Operation"
+        assert len(body["results"]) == 2
+    # Concurrent query embeddings were coalesced.
+    assert service.batcher.batches < service.batcher.requests
+
+    assert query_status == 200
+    assert "Question: What is a Region?" in query_body["answer"]
+    assert "text" not in query_body["sources"][0]
+
+    search_latency = stats["latency"]["/search"]
+    assert search_latency["count"] == 40
+    assert search_latency["p50_ms"] <= search_latency["p99_ms"]
+
+
+def test_errors_timeouts_and_overload():
+    async def run():
+        service = _make_service(llm=SlowLLM(), request_timeout=0.05, max_concurrency=1, max_queue=0)
+        await service.start()
+        try:
+            bad = await _request(service.port, "POST", "/search", {"k": 2})
+            missing = await _request(service.port, "GET", "/nope")
+            wrong_method = await _request(service.port, "GET", "/search")
+            timed_out = await _request(service.port, "POST", "/query", {"query": "x"})
+
+            service.config.request_timeout = 5
+            slow = asyncio.create_task(_request(service.port, "POST", "/query", {"query": "x"}))
+            await asyncio.sleep(0.1)
+            overloaded = await _request(service.port, "POST", "/search", {"query": "x"})
+            slow.cancel()
+        finally:
+            await service.close()
+        return bad, missing, wrong_method, timed_out, overloaded
+
+    bad, missing, wrong_method, timed_out, overloaded = asyncio.run(run())
+    assert bad[0] == 400
+    assert missing[0] == 404
+    assert wrong_method[0] == 405
+    assert timed_out[0] == 504
+    assert overloaded[0] == 503
+
+
+def test_query_without_llm_is_not_implemented():
+    service = _make_service()
+    status, body = asyncio.run(service.dispatch("POST", "/query", b'{"query": "x"}'))
+    assert status == 501
+    assert "error" in body
+
+
+def test_streaming_query():
+    async def run():
+        service = _make_service(llm=EchoLLM(max_chars=200))
+        await service.start()
+        try:
+            base_url = f"http://127.0.0.1:{service.port}"
+            events = await asyncio.to_thread(lambda: list(stream_query(base_url, "mlir Operation", k=2)))
+            _, stats = await _request(service.port, "GET", "/stats")
+        finally:
+            await service.close()
+        return events, stats
+
+    events, stats = asyncio.run(run())
+    assert events[0]["sources"][0]["ids"] == ["id2"]
+    tokens = [event["token"] for event in events if "token" in event]
+    assert len(tokens) > 1
+    assert "".join(tokens).startswith("You are answering questions")
+    assert events[-1] == {"done": True}
+    assert stats["latency"]["/query:first_token"]["count"] == 1
+    assert stats["latency"]["/query"]["count"] == 1
+
+
+def test_live_index_updates():
+    service = _make_service()
+    new = Chunk(text="class Dialect {};", metadata={"id": "new", "name": "mlir::Dialect", "kind": "class"})
+    service.add([new], service._embed_fn([new.text]))
+    hits = asyncio.run(service.search("Dialect", 1))
+    assert hits[0]["id"] == "new" and hits[0]["name"] == "mlir::Dialect"
+    assert service.delete(["new", "id0"]) == 2
+    hits = asyncio.run(service.search("Dialect", 10))
+    assert {hit["id"] for hit in hits} == {"id1", "id2", "id3", "id4"}
+
+
+def test_namespaced_service_scopes_by_corpus_and_version():
+    embedder = HashingEmbedder(dim=64)
+    index = NamespacedIndex(QuantizedVectorStore(quantization="int8"))
+    for version in ("18.x", "19.x"):
+        chunks = [Chunk(chunk.text, dict(chunk.metadata, corpus="llvm", version=version)) for chunk in CHUNKS.values()]
+        index.add(chunks, embedder([chunk.text for chunk in chunks]))
+    service = QueryService(index, {}, embedder, llm=EchoLLM(), config=ServiceConfig(port=0))
+
+    async def run():
+        await service.start()
+        try:
+            both = await _request(service.port, "POST", "/search", {"query": "Region", "k": 1})
+            scoped = await _request(service.port, "POST", "/search", {"query": "Region", "version": "19.x"})
+            unknown = await _request(service.port, "POST", "/search", {"query": "Region", "corpus": "gcc"})
+            query = await _request(service.port, "POST", "/query", {"query": "Region", "k": 1, "version": "18.x"})
+            return both, scoped, unknown, query
+        finally:
+            await service.close()
+
+    both, scoped, unknown, query = asyncio.run(run())
+    # Both versions share the content, so it is stored and returned once.
+    assert len(index.store) == len(CHUNKS)
+    assert both[1]["results"][0]["id"] == "id3"
+    assert both[1]["results"][0]["namespaces"] == ["llvm@18.x", "llvm@19.x"]
+    assert {hit["version"] for hit in scoped[1]["results"]} == {"19.x"}
+    assert unknown[0] == 400
+    assert query[1]["sources"][0]["version"] == "18.x"
+
+    assert service.delete(["id3"], namespace="llvm@18.x") == 1
+    hits = asyncio.run(service.search("Region", 1))
+    assert hits[0]["id"] == "id3" and hits[0]["namespaces"] == ["llvm@19.x"]
+    assert service.compact(["id3"], namespace="llvm@19.x")["purged"] == len(CHUNKS) - 1
+    assert index.ids("llvm@19.x") == ["id3"] and service.stats()["chunks"] == len(CHUNKS)
+
+
+def test_compact_purges_stale_chunks():
+    service = _make_service()
+    service.chunks = dict(service.chunks)
+    stored = sorted(service.store.ids())
+    live = stored[:2]
+    assert service.compact(live) == {"purged": len(stored) - 2, "slots": len(stored) - 2, "disk_bytes": 0}
+    assert sorted(service.chunks) == live and sorted(service.store.ids()) == live
+    hits = asyncio.run(service.search("anything", 10))
+    assert {hit["id"] for hit in hits} <= set(live)
+
+
+def test_serve_refuses_embeddings_of_another_dimension(tmp_path: Path, capsys):
+    path = tmp_path / "chunks.jsonl"
+    chunks = list(CHUNKS.values())
+    with ChunkWriter(path) as writer:
+        writer.write_batch(chunks, HashingEmbedder(dim=8)([c.text for c in chunks]))
+    assert main(["serve", str(path), "--port", "0"]) == 1
+    assert "8-dim embeddings" in capsys.readouterr().err
+
+
+def test_summary_first_search_restricts_to_children_of_top_summaries():
+    from codiculum.chunker import build_summary_chunks
+    from codiculum.doxygen_parser.models import CodeElement, CodeLocation
+
+    elements = [
+        CodeElement(id=f"id{i}", name=name, kind="class", language="C++", brief_description=f"The {name} class.",
+                    location=CodeLocation(file=f"f{i}.h", start_line=1, end_line=1))
+        for i, name in enumerate(NAMES)
+    ]
+    summaries = [chunk for chunk in build_summary_chunks(elements) if chunk.metadata["kind"] == "namespace_summary"]
+    embedder = HashingEmbedder(dim=64)
+    store = QuantizedVectorStore(quantization="none")
+    service = QueryService(store, {}, embedder, config=ServiceConfig(summary_first=True, summary_k=1))
+    everything = list(CHUNKS.values()) + summaries
+    service.add(everything, embedder([chunk.text for chunk in everything]))
+
+    hits = asyncio.run(service.search("namespace mlir Operation Region", 5))
+    # Only the children of the best summary (namespace mlir) are candidates.
+    assert {hit["id"] for hit in hits} == {"id2", "id3"}
+
+
+def test_timed_out_search_is_cancelled_and_slow_clients_get_408():
+    service = _make_service(request_timeout=0.05)
+    scans = []
+    search_index = service._search_index
+    service._search_index = lambda *args, **kwargs: scans.append(args) or search_index(*args, **kwargs)
+
+    async def run():
+        await service.start()
+        try:
+            with service._index_lock:  # a long write (or scan) holds the index
+                timed_out = await service.dispatch("POST", "/search", b'{"query": "Region"}')
+            await asyncio.sleep(0.05)
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            writer.write(b"POST /search HTTP/1.1\r\nContent-Length: 10\r\n\r\n{")  # body never completes
+            await writer.drain()
+            slow_body = await reader.read()
+            writer.close()
+        finally:
+            await service.close()
+        return timed_out, slow_body
+
+    timed_out, slow_body = asyncio.run(run())
+    assert timed_out[0] == 504
+    assert scans == []  # the abandoned search stopped instead of scanning once the lock was free
+    assert slow_body.startswith(b"HTTP/1.1 408")
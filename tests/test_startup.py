@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parents[1] / "src"
+
+# Modules that take seconds to import and must only be loaded on first use.
+HEAVY_MODULES = ["llama_index", "chromadb", "openai", "streamlit", "pyarrow", "numpy"]
+
+# Generous compared to the ~50 ms measured locally, to stay stable on slow CI boxes.
+IMPORT_BUDGET_SECONDS = 0.5
+
+_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import codiculum.doxygen_parser, codiculum.chunker, codiculum.indexing, codiculum.explorer, codiculum.cli
+elapsed = time.perf_counter() - start
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(elapsed)
+print(",".join(heavy))
+"""
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        cwd=SRC_DIR,
+        check=True,
+    )
+
+
+def test_core_imports_are_fast_and_light():
+    # Take the best of a few runs so a single cold-cache run does not fail the test.
+    timings = []
+    for _ in range(3):
+        elapsed, heavy = _run("-c", _PROBE).stdout.split("\n")[:2]
+        timings.append(float(elapsed))
+        assert heavy == "", f"Heavy backends imported eagerly: {heavy}"
+    assert min(timings) < IMPORT_BUDGET_SECONDS, f"Core import took {min(timings):.3f}s"
+
+
+def test_cli_help_runs():
+    result = _run("-m", "codiculum", "--help")
+    assert "usage: codiculum" in result.stdout
+
+
+def test_importing_chunker_does_not_configure_logging():
+    result = _run("-c", "import logging, codiculum.chunker; print(len(logging.getLogger().handlers))")
+    assert result.stdout.strip() == "0"
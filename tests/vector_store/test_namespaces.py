@@ -0,0 +1,119 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from codiculum.chunker import Chunk, CodeChunker
+from codiculum.doxygen_parser.models import CodeElement, CodeLocation
+from codiculum.embedding import HashingEmbedder
+from codiculum.vector_store import Namespace, NamespacedIndex, QuantizedVectorStore
+
+LLVM_18 = Namespace("llvm-project", "18.x")
+LLVM_19 = Namespace("llvm-project", "19.x")
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.embedder = HashingEmbedder(dim=64)
+        self.texts: List[str] = []
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        self.texts.extend(texts)
+        return self.embedder(texts)
+
+
+def _chunks(version: str, bodies: dict) -> List[Chunk]:
+    return [
+        Chunk(text=f"class {name} {{ {body} }};", metadata={"id": f"class{name}", "name": name,
+                                                           "corpus": "llvm-project", "version": version})
+        for name, body in bodies.items()
+    ]
+
+
+@pytest.fixture
+def index():
+    index = NamespacedIndex(QuantizedVectorStore(quantization="none"))
+    embed = CountingEmbedder()
+    v18 = {"Function": "BasicBlock blocks", "Module": "Function functions", "Value": "Type type"}
+    v19 = dict(v18, Value="Type type; Use uses", Region="Block blocks")
+    assert index.index_chunks(_chunks("18.x", v18), embed) == 3
+    assert index.index_chunks(_chunks("19.x", v19), embed) == 2
+    return index, embed
+
+
+def test_unchanged_chunks_are_embedded_and_stored_once(index):
+    index, embed = index
+    assert len(embed.texts) == 5
+    assert index.stats() == {
+        "namespaces": ["llvm-project@18.x", "llvm-project@19.x"],
+        "chunks": 7,
+        "unique_contents": 5,
+        "stored_vectors": 5,
+        "dedup_ratio": 7 / 5,
+    }
+    assert index.get_chunk(LLVM_19, "classModule").metadata["version"] == "19.x"
+    assert index.get_chunk(LLVM_18, "classRegion") is None
+
+
+def test_scoped_and_federated_search(index):
+    index, embed = index
+    query = embed.embedder(["Block blocks"])[0]
+
+    federated = index.search(query, k=5)
+    assert federated[0].id == "classRegion"
+    assert federated[0].namespaces == [LLVM_19]
+    shared = next(r for r in federated if r.id == "classFunction")
+    assert shared.namespaces == [LLVM_18, LLVM_19]
+
+    scoped = index.search(query, k=5, namespaces=["llvm-project@18.x"])
+    assert {r.id for r in scoped} == {"classFunction", "classModule", "classValue"}
+    assert all(r.namespaces == [LLVM_18] for r in scoped)
+
+
+def test_upsert_and_namespace_removal(index):
+    index, embed = index
+    index.index_chunks(_chunks("18.x", {"Value": "Type type; Use uses"}), embed)
+    assert len(embed.texts) == 5  # The 19.x content is reused.
+    assert index.stats()["unique_contents"] == 4
+
+    assert index.remove_namespace(LLVM_18) == 3
+    query = embed.embedder(["BasicBlock blocks"])[0]
+    assert all(r.namespaces == [LLVM_19] for r in index.search(query, k=10))
+
+    with pytest.raises(ValueError, match="Missing embedding"):
+        index.add(_chunks("20.x", {"New": "x"}), [None])
+
+
+def test_delete_is_scoped_to_one_namespace(index):
+    index, embed = index
+    assert index.delete(["classFunction", "classValue", "classMissing"], LLVM_18) == 2
+    assert index.ids(LLVM_18) == ["classModule"]
+    # classFunction's content is still owned by 19.x; 18.x's old classValue content is gone.
+    assert index.get_chunk(LLVM_19, "classFunction") is not None
+    assert len(index.store) == 4 and index.stats()["unique_contents"] == 4
+
+
+def test_build_pipeline_embeds_only_new_content(tmp_path: Path):
+    from codiculum.indexing import build_index
+
+    (tmp_path / "a.h").write_text("class A {};\nclass B {};\n")
+    elements = [
+        CodeElement(id=f"class{n}", name=n, kind="class", language="C++",
+                    location=CodeLocation(file="a.h", start_line=i + 1, end_line=i + 1))
+        for i, n in enumerate("AB")
+    ]
+    index, embed = NamespacedIndex(), CountingEmbedder()
+    for version in ("1.0", "1.1"):
+        chunker = CodeChunker(tmp_path, corpus="demo", version=version)
+        build_index(["a.xml"], chunker, index.dedup_embed_fn(embed), index, parse_fn=lambda _: elements)
+    assert len(embed.texts) == 2
+    assert index.namespaces() == [Namespace("demo", "1.0"), Namespace("demo", "1.1")]
+    assert index.get_chunk(Namespace("demo", "1.1"), "classB").metadata["corpus"] == "demo"
+
+
+def test_compact_purges_unowned_content(index):
+    index, embed = index
+    index.remove_namespace(LLVM_18)
+    assert len(index.store) == 5
+    assert index.compact() == {"purged": 1, "slots": 1, "disk_bytes": 0}
+    assert len(index.store) == 4 and index.stats()["unique_contents"] == 4
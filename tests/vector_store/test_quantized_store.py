@@ -0,0 +1,131 @@
+import random
+import threading
+from pathlib import Path
+
+import pytest
+
+from codiculum.chunker import Chunk
+from codiculum.vector_store import QuantizedVectorStore, SearchCancelled
+
+DIM = 64
+
+
+def _random_vectors(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [[rng.gauss(0, 1) for _ in range(DIM)] for _ in range(n)]
+
+
+VECTORS = _random_vectors(200)
+IDS = [f"classllvm_1_1C{i}" for i in range(len(VECTORS))]
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8", "binary"])
+def test_search_finds_exact_match(quantization: str):
+    store = QuantizedVectorStore(quantization=quantization, keep_full_precision=True)
+    store.upsert(IDS, VECTORS)
+    results = store.search(VECTORS[42], k=3)
+    assert results[0].id == IDS[42]
+    assert results[0].score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_memory_ratios():
+    ratios = {}
+    for quantization in ("none", "int8", "binary"):
+        store = QuantizedVectorStore(quantization=quantization, keep_full_precision=False)
+        store.upsert(IDS, VECTORS)
+        ratios[quantization] = store.full_precision_bytes() / store.memory_bytes()
+    assert ratios["none"] == 1
+    assert ratios["int8"] == pytest.approx(4 * DIM / (DIM + 4))
+    assert ratios["binary"] == 32
+
+    truncated = QuantizedVectorStore(quantization="binary", truncate_dim=32, keep_full_precision=False)
+    truncated.upsert(IDS, VECTORS)
+    assert truncated.full_precision_bytes() / truncated.memory_bytes() == 64
+
+    # Full-precision vectors kept in RAM for re-scoring are part of the footprint.
+    in_memory = QuantizedVectorStore(quantization="binary", keep_full_precision=True)
+    in_memory.upsert(IDS, VECTORS)
+    assert in_memory.memory_bytes() == len(IDS) * (DIM // 8 + 4 * DIM)
+
+    # By default only the codes are kept.
+    default = QuantizedVectorStore(quantization="binary")
+    default.upsert(IDS, VECTORS)
+    assert not default.can_rescore and default.memory_bytes() == len(IDS) * DIM // 8
+
+
+def test_recall_report_rescoring_recovers_recall(tmp_path: Path):
+    store = QuantizedVectorStore(quantization="binary", rescore_path=tmp_path / "full.f32")
+    store.upsert(IDS, VECTORS)
+    queries = _random_vectors(10, seed=99)
+    report = store.recall_report(queries, k=5, oversample=8)
+    store.close()
+
+    assert report.count == 200
+    assert report.compression_ratio == 32
+    assert 0 < report.recall_compact < 1
+    assert report.recall_rescored > report.recall_compact
+    # int8 is close to exact even without re-scoring.
+    int8_store = QuantizedVectorStore(quantization="int8", keep_full_precision=True)
+    int8_store.upsert(IDS, VECTORS)
+    assert int8_store.recall_report(queries, k=5).recall_compact >= 0.9
+
+
+def test_upsert_replaces_and_add_uses_chunk_ids():
+    store = QuantizedVectorStore(quantization="int8")
+    chunks = [Chunk(text="a", metadata={"id": "a"}), Chunk(text="b", metadata={"id": "b"})]
+    store.add(chunks, VECTORS[:2])
+    store.add(chunks[:1], [VECTORS[5]])
+    assert len(store) == 2
+    assert store.search(VECTORS[5], k=1)[0].id == "a"
+
+
+def test_allowed_ids_and_validation():
+    store = QuantizedVectorStore(quantization="int8", keep_full_precision=False)
+    store.upsert(IDS, VECTORS)
+    assert not store.can_rescore
+    results = store.search(VECTORS[0], k=5, allowed_ids=[IDS[3], IDS[4], "unknown"])
+    assert {r.id for r in results} == {IDS[3], IDS[4]}
+    with pytest.raises(ValueError):
+        store.search([1.0, 2.0])
+    with pytest.raises(ValueError):
+        store.upsert(["x"], [[1.0]])
+    with pytest.raises(ValueError):
+        QuantizedVectorStore(quantization="pq")
+
+
+def test_search_stops_once_cancelled():
+    store = QuantizedVectorStore(quantization="int8")
+    store.upsert(IDS, VECTORS)
+    cancelled = threading.Event()
+    assert store.search(VECTORS[0], k=1, cancelled=cancelled)[0].id == IDS[0]
+    cancelled.set()
+    with pytest.raises(SearchCancelled):
+        store.search(VECTORS[0], k=1, cancelled=cancelled)
+
+
+def test_delete_hides_vectors_and_allows_reinsert():
+    store = QuantizedVectorStore(quantization="int8")
+    store.upsert(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    assert store.delete(["a", "missing"]) == 1
+    assert "a" not in store and len(store) == 1
+    assert [r.id for r in store.search([1.0, 0.0], k=2)] == ["b"]
+    store.upsert(["a"], [[1.0, 0.0]])
+    assert store.search([1.0, 0.0], k=1)[0].id == "a"
+
+
+def test_compact_reclaims_deleted_slots_and_file_space(tmp_path: Path):
+    store = QuantizedVectorStore(quantization="int8", rescore_path=tmp_path / "full.f32")
+    store.upsert(IDS, VECTORS)
+    store.upsert(IDS[:10], VECTORS[:10])  # Overwritten vectors stay in the append-only file.
+    store.delete(IDS[100:])
+    before = [(r.id, r.score) for r in store.search(VECTORS[5], k=5)]
+    assert store.dead_slots == 100
+
+    reclaimed = store.compact()
+    assert reclaimed["slots"] == 100
+    assert reclaimed["disk_bytes"] == 110 * DIM * 4
+    assert store.dead_slots == 0 and sorted(store.ids()) == sorted(IDS[:100])
+    assert [(r.id, r.score) for r in store.search(VECTORS[5], k=5)] == before
+    store.upsert(["new"], [VECTORS[150]])
+    assert store.search(VECTORS[150], k=1)[0].id == "new"
+    store.close()